@@ -1,13 +1,23 @@
 # built-in
 import subprocess
 import json
+import sqlite3
 import re
-from threading import Thread
+import mmap
+import struct
+import hashlib
+import zlib
+import csv
+from array import array
+from sys import byteorder
+from threading import Thread, Lock, Event, get_ident
+from queue import Queue, Empty, Full
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from datetime import timedelta, datetime
-from shutil import rmtree
-from os import walk, mkdir, remove, listdir, getcwd, rmdir, rename
-from os.path import isdir, isfile
+from shutil import rmtree, copyfile
+from os import mkdir, makedirs, remove, replace, listdir, getcwd, rmdir, rename, cpu_count, stat, scandir, utime, link, fsync, sep
+from os.path import isdir, isfile, join
 from time import time, sleep
 from math import ceil, gcd
 from typing import TypedDict
@@ -18,9 +28,17 @@ from alive_progress import alive_bar
 from playsound import playsound
 from PIL import Image
 import psutil
+import numpy as np
 from colorama import init
 init()
 
+# optional dependencies
+try:
+    # faster json decode, accept bytes
+    from orjson import loads as jsonLoads
+except ImportError:
+    jsonLoads = json.loads
+
 
 
 # from VideoScripy import *
@@ -28,10 +46,16 @@ __all__ = [
     'colorAnsi', 'printC',
     # dict class
     'GPUInfo', 'ProcAsyncReturn',
+    # record class
+    'Record', 'StreamInfo', 'VideoInfo',
     # dict class
-    'StreamInfo', 'FrameByte', 'VideoInfo',
+    'FrameByte', 'FrameGop', 'ScanDiff',
     # enum class
     'VideoProcess',
+    # probe class
+    'ProbeCache', 'ContainerProbe',
+    # frame class
+    'FrameCache',
     # main object
     'VideoScripy',
     
@@ -72,23 +96,112 @@ class ProcAsyncReturn(TypedDict):
     returnCode : int
     stdout: str
 
-class StreamInfo(TypedDict):
+class Record():
+    """
+    Slotted record with dict style access, base of StreamInfo and VideoInfo.\n
+    Keys in __slots__ are catalog fields, other keys are per-job scratch fields
+    kept apart in a dict, created at first use and emptied by clearScratch().
+    """
+    __slots__ = ("scratch",)
+    FIELDS = frozenset()
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        cls.FIELDS = frozenset(cls.__slots__)
+
+    def __init__(self, **fields) -> None:
+        self.scratch = None
+        for key, value in fields.items():
+            self[key] = value
+
+    def __getitem__(self, key:str):
+        if key in self.FIELDS:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        if self.scratch is None:
+            raise KeyError(key)
+        return self.scratch[key]
+
+    def __setitem__(self, key:str, value) -> None:
+        if key in self.FIELDS:
+            setattr(self, key, value)
+        else:
+            if self.scratch is None:
+                self.scratch = {}
+            self.scratch[key] = value
+
+    def __delitem__(self, key:str) -> None:
+        if key in self.FIELDS:
+            try:
+                delattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        elif self.scratch is None:
+            raise KeyError(key)
+        else:
+            del self.scratch[key]
+
+    def __contains__(self, key:str) -> bool:
+        if key in self.FIELDS:
+            return hasattr(self, key)
+        return self.scratch is not None and key in self.scratch
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({dict(self.items())})'
+
+    def get(self, key:str, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self) -> list[str]:
+        keys = [key for key in self.__slots__ if hasattr(self, key)]
+        if self.scratch is not None:
+            keys += list(self.scratch)
+        return keys
+
+    def items(self) -> list[tuple]:
+        return [(key, self[key]) for key in self.keys()]
+
+    def clearScratch(self) -> None:
+        """
+        Remove per-job scratch fields.
+        """
+        self.scratch = None
+
+class StreamInfo(Record):
     index : int
     codec_type : str
     codec_name : str
     selected : bool
     language: str
     title: str
+    __slots__ = (
+        "index", "codec_type", "codec_name", "selected", "language", "title",
+    )
 
 class FrameByte(TypedDict):
-    # picture timestamp
-    pts_time : datetime
-    # size in byte
-    size : int
-
-class VideoInfo(TypedDict):
+    # picture timestamp in second, float64 array
+    pts_time : np.ndarray
+    # size in byte, int array
+    size : np.ndarray
+
+class FrameGop(TypedDict):
+    # keyframe picture timestamp in second, float64 array
+    pts_time : np.ndarray
+    # number of packets, int array
+    length : np.ndarray
+    # size in byte, int array
+    size : np.ndarray
+
+class VideoInfo(Record):
     """
-    VideoScripy.vList typing
+    VideoScripy.vList element, catalog fields are slotted,
+    process parameters (compressBitRateParam, getFramesOutputPath ...)
+    are per-job scratch fields
     """
     type: str
     path: str
@@ -102,8 +215,32 @@ class VideoInfo(TypedDict):
     nbFrames: int
     streams : list[StreamInfo]
     fileSize : int
-    frameBytePerPacket : list[FrameByte]
-    frameBytePerSecond : list[FrameByte]
+    # file modification time in ns, at scan
+    modifiedTime : int
+    frameBytePerPacket : FrameByte
+    frameBytePerSecond : FrameByte
+    # group of pictures, starting at each keyframe
+    frameGop : FrameGop
+    # peak bit rate in bit/s per window, packet size percentiles in byte
+    frameStats : dict[str, int]
+    # error bounds of a sampled frame(), not set if whole file scanned
+    frameEstimate : dict[str, float]
+    # WebUI selection
+    selected : bool
+    __slots__ = (
+        "type", "path", "name", "duration", "bitRate", "quality",
+        "width", "height", "fps", "nbFrames", "streams", "fileSize",
+        "modifiedTime", "frameBytePerPacket", "frameBytePerSecond", "frameGop",
+        "frameStats", "frameEstimate", "selected",
+    )
+
+class ScanDiff(TypedDict):
+    """
+    VideoScripy.rescanVideo() return typing
+    """
+    added : list[VideoInfo]
+    removed : list[VideoInfo]
+    modified : list[VideoInfo]
 
 class VideoProcess(Enum):
     """
@@ -119,6 +256,795 @@ class VideoProcess(Enum):
 
 
 
+class ProbeCache():
+    """
+    On-disk SQLite cache of probed VideoInfo fields,
+    keyed by file path, file size and modification time
+
+    Attributes:
+        dbPath (str):
+            SQLite database file path
+
+        sizeLimit (int):
+            maximum number of cached files,
+            least recently used ones are removed first
+
+        hits (int):
+            number of lookup found valid since creation or resetStats()
+
+        misses (int):
+            number of lookup not found or outdated since creation or resetStats()
+    """
+
+    def __init__(self, dbPath:str, sizeLimit:int=100_000) -> None:
+        self.dbPath = dbPath
+        self.sizeLimit = sizeLimit
+        self.hits = 0
+        self.misses = 0
+
+        # shared by WebUI callbacks threads
+        self.lock = Lock()
+        self.db = sqlite3.connect(dbPath, check_same_thread=False)
+        self.db.execute(
+            'CREATE TABLE IF NOT EXISTS probe ('
+            ' path TEXT PRIMARY KEY,'
+            ' size INTEGER,'
+            ' mtime INTEGER,'
+            ' info TEXT,'
+            ' lastUsed REAL'
+            ')'
+        )
+        self.db.execute(
+            'CREATE INDEX IF NOT EXISTS probeLastUsed ON probe (lastUsed)'
+        )
+        self.db.commit()
+
+    def get(self, path:str, size:int, mtime:int) -> dict:
+        """
+        Return cached info of path, None if not cached or size/mtime changed.
+
+        Parameters:
+            path (str):
+                file path
+
+            size (int):
+                file size in byte
+
+            mtime (int):
+                file modification time in ns
+        """
+        with self.lock:
+            row = self.db.execute(
+                'SELECT size, mtime, info FROM probe WHERE path = ?',
+                (path,)
+            ).fetchone()
+
+            if row is None or row[0] != size or row[1] != mtime:
+                self.misses += 1
+                return None
+
+            self.db.execute(
+                'UPDATE probe SET lastUsed = ? WHERE path = ?',
+                (time(), path)
+            )
+            self.hits += 1
+
+        return json.loads(row[2])
+
+    def set(self, path:str, size:int, mtime:int, info:dict) -> None:
+        """
+        Cache info of path, replace existing one.\n
+        Call commit() to write it on disk.
+
+        Parameters:
+            path (str):
+                file path
+
+            size (int):
+                file size in byte
+
+            mtime (int):
+                file modification time in ns
+
+            info (dict):
+                json serializable info
+        """
+        with self.lock:
+            self.db.execute(
+                'INSERT OR REPLACE INTO probe VALUES (?, ?, ?, ?, ?)',
+                (path, size, mtime, json.dumps(info), time())
+            )
+
+    def commit(self) -> None:
+        """
+        Remove least recently used files over sizeLimit, then write changes on disk.
+        """
+        with self.lock:
+            self.db.execute(
+                'DELETE FROM probe WHERE path IN ('
+                ' SELECT path FROM probe ORDER BY lastUsed DESC LIMIT -1 OFFSET ?'
+                ')',
+                (self.sizeLimit,)
+            )
+            self.db.commit()
+
+    def invalidate(self, path:str=None) -> None:
+        """
+        Remove cached info of path.
+
+        Parameters:
+            path (str):
+                file path, None to empty the whole cache
+        """
+        with self.lock:
+            if path is None:
+                self.db.execute('DELETE FROM probe')
+            else:
+                self.db.execute('DELETE FROM probe WHERE path = ?', (path,))
+            self.db.commit()
+
+    def resetStats(self) -> None:
+        """
+        Reset hits and misses counters.
+        """
+        self.hits = 0
+        self.misses = 0
+
+    def printStats(self) -> None:
+        """
+        Print hits, misses counters and number of cached files.
+        """
+        with self.lock:
+            cached = self.db.execute('SELECT COUNT(*) FROM probe').fetchone()[0]
+        printC(
+            f'Probe cache : {self.hits} hit | {self.misses} miss | '
+            f'{cached}/{self.sizeLimit} cached',
+            "blue"
+        )
+
+
+
+class FrameCache():
+    """
+    On-disk cache of frame() results, one uncompressed .npz per file,
+    named after file path hash, valid while file size and modification time are unchanged
+
+    Attributes:
+        dirPath (str):
+            cache folder path
+
+        sizeLimit (int):
+            disk quota in byte,
+            least recently used files are removed first
+    """
+
+    # second, age of an orphan .tmp file to be removed
+    TEMP_MAX_AGE = 3600
+
+    def __init__(self, dirPath:str, sizeLimit:int=1 << 30) -> None:
+        self.dirPath = dirPath
+        self.sizeLimit = sizeLimit
+
+        # shared by frame() threads
+        self.lock = Lock()
+        makedirs(dirPath, exist_ok=True)
+
+    def _cachePath(self, path:str) -> str:
+        """
+        Return cache file path of path.
+
+        Parameters:
+            path (str):
+                file path
+        """
+        name = hashlib.sha1(path.encode("utf-8")).hexdigest()
+        return str(Path(self.dirPath) / f"{name}.npz")
+
+    def has(self, path:str, size:int, mtime:int) -> bool:
+        """
+        Return True if path has valid cached arrays, without loading them.
+
+        Parameters:
+            path (str):
+                file path
+
+            size (int):
+                file size in byte
+
+            mtime (int):
+                file modification time in ns
+        """
+        try:
+            with np.load(self._cachePath(path)) as npz:
+                return npz["identity"].tolist() == [size, mtime]
+        except (OSError, ValueError, KeyError):
+            return False
+
+    def get(self, path:str, size:int, mtime:int, prefix:str="") -> dict[str, np.ndarray]:
+        """
+        Return cached arrays of path, None if not cached or size/mtime changed.
+
+        Parameters:
+            path (str):
+                file path
+
+            size (int):
+                file size in byte
+
+            mtime (int):
+                file modification time in ns
+
+            prefix (str):
+                only load arrays whose name starts with it
+        """
+        cachePath = self._cachePath(path)
+        try:
+            with np.load(cachePath) as npz:
+                if npz["identity"].tolist() != [size, mtime]:
+                    return None
+                arrays = {
+                    key: npz[key] for key in npz.files
+                    if key != "identity" and key.startswith(prefix)
+                }
+        except (OSError, ValueError, KeyError):
+            return None
+
+        # mark as recently used
+        try:
+            utime(cachePath)
+        except OSError:
+            pass
+        return arrays
+
+    def set(self, path:str, size:int, mtime:int, arrays:dict[str, np.ndarray]) -> None:
+        """
+        Cache arrays of path, replace existing one,
+        then remove least recently used files over sizeLimit.
+
+        Parameters:
+            path (str):
+                file path
+
+            size (int):
+                file size in byte
+
+            mtime (int):
+                file modification time in ns
+
+            arrays ({str: np.ndarray}):
+                arrays to cache, "identity" is reserved
+        """
+        cachePath = self._cachePath(path)
+        # write aside then rename, a reader never sees a partial file
+        tempPath = f"{cachePath}.{id(arrays)}.tmp"
+        try:
+            with open(tempPath, "wb") as file:
+                np.savez(file, identity=np.array([size, mtime], dtype=np.int64), **arrays)
+            replace(tempPath, cachePath)
+        finally:
+            # not renamed on failure, full disk or killed write
+            if isfile(tempPath):
+                try:
+                    remove(tempPath)
+                except OSError:
+                    pass
+
+        with self.lock:
+            self._evict()
+
+    def _evict(self) -> None:
+        """
+        Remove .tmp files left by an interrupted set() older than TEMP_MAX_AGE,
+        then least recently used files until cache fits in sizeLimit.
+        """
+        entries = []
+        for entry in scandir(self.dirPath):
+            if entry.name.endswith((".npz", ".tmp")):
+                try:
+                    entryStat = entry.stat()
+                except OSError:
+                    continue
+                if entry.name.endswith(".npz"):
+                    entries.append((entryStat.st_mtime, entryStat.st_size, entry.path))
+                # a recent one may be written by another set()
+                elif time() - entryStat.st_mtime >= self.TEMP_MAX_AGE:
+                    try:
+                        remove(entry.path)
+                    except OSError:
+                        pass
+
+        total = sum(entry[1] for entry in entries)
+        for _, entrySize, entryPath in sorted(entries):
+            if total <= self.sizeLimit:
+                break
+            try:
+                remove(entryPath)
+            except OSError:
+                continue
+            total -= entrySize
+
+    def invalidate(self, path:str=None) -> None:
+        """
+        Remove cached arrays of path.
+
+        Parameters:
+            path (str):
+                file path, None to empty the whole cache
+        """
+        if path is None:
+            paths = [entry.path for entry in scandir(self.dirPath) if entry.name.endswith(".npz")]
+        else:
+            paths = [self._cachePath(path)]
+        for cachePath in paths:
+            try:
+                remove(cachePath)
+            except OSError:
+                pass
+
+
+
+class ContainerProbe():
+    """
+    In-process MP4 and Matroska header reader, alternative to ffprobe.\n
+    Read only moov box or EBML Segment Info/Tracks/Tags with memory-mapped file,
+    and return the subset of ffprobe json output read by VideoScripy._setVideoInfo().\n
+    Return None on unknown or odd files, to fall back to ffprobe.
+    """
+
+    # mp4 sample entry type : codec_name
+    MP4_CODECS = {
+        b'avc1': "h264", b'avc3': "h264",
+        b'hvc1': "hevc", b'hev1': "hevc",
+        b'av01': "av1", b'vp09': "vp9", b'mp4v': "mpeg4",
+        b'ac-3': "ac3", b'ec-3': "eac3",
+        b'Opus': "opus", b'fLaC': "flac", b'alac': "alac",
+        b'tx3g': "mov_text", b'wvtt': "webvtt",
+    }
+    # mp4 esds objectTypeIndication : codec_name
+    MP4_AUDIO_OBJECTS = {
+        0x40: "aac", 0x66: "aac", 0x67: "aac", 0x68: "aac",
+        0x69: "mp3", 0x6B: "mp3",
+    }
+    # mp4 handler type : codec_type
+    MP4_HANDLERS = {
+        b'vide': "video", b'soun': "audio",
+        b'sbtl': "subtitle", b'subt': "subtitle", b'text': "subtitle",
+        b'tmcd': "data",
+    }
+    # matroska TrackType : codec_type
+    MKV_TRACK_TYPES = {1: "video", 2: "audio", 0x11: "subtitle"}
+    # matroska CodecID : codec_name
+    MKV_CODECS = {
+        "V_MPEG4/ISO/AVC": "h264", "V_MPEGH/ISO/HEVC": "hevc",
+        "V_AV1": "av1", "V_VP9": "vp9", "V_VP8": "vp8",
+        "V_MPEG2": "mpeg2video", "V_MPEG4/ISO/ASP": "mpeg4",
+        "A_AC3": "ac3", "A_EAC3": "eac3", "A_DTS": "dts",
+        "A_OPUS": "opus", "A_VORBIS": "vorbis", "A_FLAC": "flac",
+        "A_MPEG/L3": "mp3", "A_MPEG/L2": "mp2", "A_TRUEHD": "truehd",
+        "S_TEXT/UTF8": "subrip", "S_TEXT/ASS": "ass", "S_TEXT/SSA": "ass",
+        "S_TEXT/WEBVTT": "webvtt", "S_HDMV/PGS": "hdmv_pgs_subtitle",
+        "S_VOBSUB": "dvd_subtitle", "S_DVBSUB": "dvb_subtitle",
+    }
+
+    @classmethod
+    def probe(cls, path:str) -> dict:
+        """
+        Return {"format":{...}, "streams":[...]} as ffprobe json output,
+        None if not supported.
+
+        Parameters:
+            path (str):
+                .mp4 or .mkv file path
+        """
+        try:
+            with open(path, "rb") as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    size = len(mm)
+                    if mm[:4] == b'\x1a\x45\xdf\xa3':
+                        probe = cls._probeMkv(mm)
+                    else:
+                        probe = cls._probeMp4(mm)
+
+            # same format entries as ffprobe
+            duration = float(probe["format"]["duration"])
+            if duration <= 0:
+                return None
+            probe["format"]["size"] = str(size)
+            probe["format"]["bit_rate"] = str(int(size*8/duration))
+        # any unexpected layout falls back to ffprobe
+        except Exception:
+            return None
+        return probe
+
+
+    # mp4
+    @staticmethod
+    def _boxes(mm:mmap.mmap, start:int, end:int):
+        """
+        Yield (type, data start, data end) of each box between start and end.
+        """
+        offset = start
+        while offset + 8 <= end:
+            size, boxType = struct.unpack_from('>I4s', mm, offset)
+            header = 8
+            if size == 1:
+                size = struct.unpack_from('>Q', mm, offset+8)[0]
+                header = 16
+            elif size == 0:
+                size = end - offset
+            if size < header or offset + size > end:
+                raise ValueError("truncated box")
+            yield boxType, offset+header, offset+size
+            offset += size
+
+    @classmethod
+    def _findBox(cls, mm:mmap.mmap, start:int, end:int, boxType:bytes, required:bool=False) -> tuple[int, int]:
+        """
+        Return (data start, data end) of first child box of boxType, None if not found.\n
+        Raise ValueError instead if required.
+        """
+        for childType, childStart, childEnd in cls._boxes(mm, start, end):
+            if childType == boxType:
+                return childStart, childEnd
+        if required:
+            raise ValueError(f'no {boxType.decode("latin-1")} box')
+        return None
+
+    @classmethod
+    def _probeMp4(cls, mm:mmap.mmap) -> dict:
+        # QuickTime hdlr name is a pascal string
+        isom = True
+        moov = None
+        for boxType, start, end in cls._boxes(mm, 0, len(mm)):
+            if boxType == b'ftyp':
+                isom = mm[start:start+4] != b'qt  '
+            elif boxType == b'moov':
+                moov = (start, end)
+            elif boxType == b'moof':
+                raise ValueError("fragmented")
+        if moov is None:
+            raise ValueError("no moov")
+        # cover art is listed as stream by ffprobe
+        if mm.find(b'covr', *moov) != -1:
+            raise ValueError("cover art")
+
+        formatDuration = None
+        streams = []
+        for boxType, start, end in cls._boxes(mm, *moov):
+            if boxType == b'mvhd':
+                if mm[start] == 1:
+                    timescale, duration = struct.unpack_from('>IQ', mm, start+20)
+                else:
+                    timescale, duration = struct.unpack_from('>II', mm, start+12)
+                if timescale == 0:
+                    raise ValueError("zero timescale")
+                formatDuration = duration/timescale
+            elif boxType == b'mvex':
+                raise ValueError("fragmented")
+            elif boxType == b'trak':
+                streams.append(cls._probeMp4Track(mm, start, end, isom, len(streams)))
+        if formatDuration is None:
+            raise ValueError("no mvhd")
+
+        return {
+            "format": {"duration": str(formatDuration)},
+            "streams": streams,
+        }
+
+    @classmethod
+    def _probeMp4Track(cls, mm:mmap.mmap, start:int, end:int, isom:bool, index:int) -> dict:
+        # QuickTime chapter track are not listed by ffprobe
+        tref = cls._findBox(mm, start, end, b'tref')
+        if tref is not None and cls._findBox(mm, *tref, b'chap') is not None:
+            raise ValueError("chapter track")
+
+        # stz2 compact sample sizes are not read
+        mdia = cls._findBox(mm, start, end, b'mdia', required=True)
+        mdhd = cls._findBox(mm, *mdia, b'mdhd', required=True)
+        hdlr = cls._findBox(mm, *mdia, b'hdlr', required=True)
+        minf = cls._findBox(mm, *mdia, b'minf', required=True)
+        stbl = cls._findBox(mm, *minf, b'stbl', required=True)
+        stsd = cls._findBox(mm, *stbl, b'stsd', required=True)
+        stts = cls._findBox(mm, *stbl, b'stts', required=True)
+        stsz = cls._findBox(mm, *stbl, b'stsz', required=True)
+
+        stream = {"index": index, "tags": {}}
+
+        # timescale, duration and language
+        mdhdStart = mdhd[0]
+        if mm[mdhdStart] == 1:
+            timescale, duration, language = struct.unpack_from('>IQH', mm, mdhdStart+20)
+        else:
+            timescale, duration, language = struct.unpack_from('>IIH', mm, mdhdStart+12)
+        if timescale == 0:
+            raise ValueError("zero timescale")
+        language &= 0x7FFF
+        if language >= 0x400 and language != 0x7FFF:
+            stream["tags"]["language"] = "".join(
+                chr(0x60 + (language >> shift & 0x1F)) for shift in (10, 5, 0)
+            )
+        elif language == 0:
+            # old Macintosh language code
+            stream["tags"]["language"] = "eng"
+        elif language != 0x7FFF:
+            raise ValueError("Macintosh language code")
+        stream["duration"] = str(duration/timescale)
+
+        # codec type and title
+        handler = mm[hdlr[0]+8:hdlr[0]+12]
+        stream["codec_type"] = cls.MP4_HANDLERS[handler]
+        title = mm[hdlr[0]+24:hdlr[1]].split(b'\x00')[0]
+        if title:
+            if not isom and title[0] == len(title) - 1:
+                title = title[1:]
+            stream["tags"]["handler_name"] = title.decode("utf-8", "replace")
+
+        # codec of first sample entry
+        entryStart = stsd[0]+8
+        entrySize, entryType = struct.unpack_from('>I4s', mm, entryStart)
+        if entryType == b'mp4a':
+            esds = mm.find(b'esds', entryStart, entryStart+entrySize)
+            if esds == -1:
+                raise ValueError("no esds")
+            stream["codec_name"] = cls._mp4AudioObject(mm, esds+8)
+        elif entryType == b'tmcd':
+            # ffprobe give no codec_name to timecode
+            stream["codec_tag_string"] = "tmcd"
+        else:
+            stream["codec_name"] = cls.MP4_CODECS[entryType]
+
+        if stream["codec_type"] == "video":
+            stream["width"], stream["height"] = struct.unpack_from('>HH', mm, entryStart+32)
+
+            # most used sample delta as frame rate
+            deltas = {}
+            entryCount = struct.unpack_from('>I', mm, stts[0]+4)[0]
+            for sampleCount, sampleDelta in struct.iter_unpack(
+                '>II', mm[stts[0]+8:stts[0]+8+entryCount*8]
+            ):
+                deltas[sampleDelta] = deltas.get(sampleDelta, 0) + sampleCount
+            sampleDelta = max(deltas, key=deltas.get)
+            if sampleDelta == 0:
+                raise ValueError("no sample delta")
+            stream["r_frame_rate"] = f'{timescale}/{sampleDelta}'
+
+        # frame count and bit rate
+        sampleSize, sampleCount = struct.unpack_from('>II', mm, stsz[0]+4)
+        if sampleSize == 0:
+            sizes = array('I', mm[stsz[0]+12:stsz[0]+12+sampleCount*4])
+            if byteorder == "little":
+                sizes.byteswap()
+            streamSize = sum(sizes)
+        else:
+            streamSize = sampleSize * sampleCount
+        stream["nb_frames"] = str(sampleCount)
+        if duration > 0:
+            stream["bit_rate"] = str(streamSize * 8 * timescale // duration)
+
+        return stream
+
+    @staticmethod
+    def _mp4AudioObject(mm:mmap.mmap, offset:int) -> str:
+        """
+        Return codec_name from esds objectTypeIndication, offset after esds version/flags.
+        """
+        def readDescriptor(offset:int) -> tuple[int, int]:
+            # tag, then size coded in 1 to 4 bytes
+            tag = mm[offset]
+            offset += 1
+            for _ in range(4):
+                byte = mm[offset]
+                offset += 1
+                if not byte & 0x80:
+                    break
+            return tag, offset
+
+        tag, offset = readDescriptor(offset)
+        if tag != 0x03:
+            raise ValueError("no ES_Descriptor")
+        flags = mm[offset+2]
+        offset += 3
+        if flags & 0x80:
+            offset += 2
+        if flags & 0x40:
+            offset += 1 + mm[offset]
+        if flags & 0x20:
+            offset += 2
+        tag, offset = readDescriptor(offset)
+        if tag != 0x04:
+            raise ValueError("no DecoderConfigDescriptor")
+        return ContainerProbe.MP4_AUDIO_OBJECTS[mm[offset]]
+
+
+    # matroska
+    @staticmethod
+    def _vint(mm:mmap.mmap, offset:int, isSize:bool) -> tuple[int, int]:
+        """
+        Return (value, next offset) of EBML variable size integer,
+        value is None for unknown size.
+        """
+        first = mm[offset]
+        length = 1
+        mask = 0x80
+        while not first & mask:
+            mask >>= 1
+            length += 1
+            if length > 8:
+                raise ValueError("wrong vint")
+        # element id keep its length marker
+        value = first & (mask-1) if isSize else first
+        for byte in mm[offset+1:offset+length]:
+            value = value << 8 | byte
+        if isSize and value == (1 << 7*length) - 1:
+            value = None
+        return value, offset+length
+
+    @classmethod
+    def _elements(cls, mm:mmap.mmap, start:int, end:int):
+        """
+        Yield (id, data start, data end) of each element between start and end.
+        """
+        offset = start
+        while offset < end:
+            elementId, offset = cls._vint(mm, offset, False)
+            size, offset = cls._vint(mm, offset, True)
+            # unknown size, till parent end
+            elementEnd = end if size is None else offset+size
+            if elementEnd > end:
+                raise ValueError("truncated element")
+            yield elementId, offset, elementEnd
+            offset = elementEnd
+
+    @staticmethod
+    def _uint(mm:mmap.mmap, start:int, end:int) -> int:
+        return int.from_bytes(mm[start:end], "big")
+
+    @staticmethod
+    def _string(mm:mmap.mmap, start:int, end:int) -> str:
+        return mm[start:end].split(b'\x00')[0].decode("utf-8", "replace")
+
+    @classmethod
+    def _probeMkv(cls, mm:mmap.mmap) -> dict:
+        # EBML header, then Segment
+        elements = cls._elements(mm, 0, len(mm))
+        elementId, start, end = next(elements)
+        for childId, childStart, childEnd in cls._elements(mm, start, end):
+            # DocType
+            if childId == 0x4282 and cls._string(mm, childStart, childEnd) not in ["matroska", "webm"]:
+                raise ValueError("not matroska")
+        elementId, segmentStart, segmentEnd = next(elements)
+        if elementId != 0x18538067:
+            raise ValueError("no Segment")
+
+        info = tracks = tags = None
+        seeks = {}
+        for elementId, start, end in cls._elements(mm, segmentStart, segmentEnd):
+            # SeekHead
+            if elementId == 0x114D9B74:
+                for seekElementId, seekStart, seekEnd in cls._elements(mm, start, end):
+                    # Seek, not Void padding
+                    if seekElementId != 0x4DBB:
+                        continue
+                    seek = {}
+                    for seekId, valueStart, valueEnd in cls._elements(mm, seekStart, seekEnd):
+                        seek[seekId] = cls._uint(mm, valueStart, valueEnd)
+                    if 0x53AB in seek and 0x53AC in seek:
+                        seeks[seek[0x53AB]] = segmentStart + seek[0x53AC]
+            elif elementId == 0x1549A966:
+                info = (start, end)
+            elif elementId == 0x1654AE6B:
+                tracks = (start, end)
+            elif elementId == 0x1254C367:
+                tags = (start, end)
+            # Attachments are listed as stream by ffprobe
+            elif elementId == 0x1941A469:
+                raise ValueError("attachments")
+            # first Cluster, the rest is found by SeekHead
+            elif elementId == 0x1F43B675:
+                break
+
+        if 0x1941A469 in seeks:
+            raise ValueError("attachments")
+        if info is None:
+            info = cls._seekElement(mm, seeks, 0x1549A966, segmentEnd)
+        if tracks is None:
+            tracks = cls._seekElement(mm, seeks, 0x1654AE6B, segmentEnd)
+        if tags is None and 0x1254C367 in seeks:
+            tags = cls._seekElement(mm, seeks, 0x1254C367, segmentEnd)
+
+        # duration
+        timecodeScale = 1_000_000
+        duration = None
+        for elementId, start, end in cls._elements(mm, *info):
+            if elementId == 0x2AD7B1:
+                timecodeScale = cls._uint(mm, start, end)
+            elif elementId == 0x4489:
+                duration = struct.unpack('>f' if end-start == 4 else '>d', mm[start:end])[0]
+        if duration is None:
+            raise ValueError("no Duration")
+
+        # tags by TrackUID
+        trackTags = {}
+        if tags is not None:
+            for tagElementId, tagStart, tagEnd in cls._elements(mm, *tags):
+                # Tag
+                if tagElementId != 0x7373:
+                    continue
+                trackUid = 0
+                simpleTags = {}
+                for elementId, start, end in cls._elements(mm, tagStart, tagEnd):
+                    # Targets
+                    if elementId == 0x63C0:
+                        for targetId, valueStart, valueEnd in cls._elements(mm, start, end):
+                            if targetId == 0x63C5:
+                                trackUid = cls._uint(mm, valueStart, valueEnd)
+                    # SimpleTag
+                    elif elementId == 0x67C8:
+                        simpleTag = {}
+                        for valueId, valueStart, valueEnd in cls._elements(mm, start, end):
+                            simpleTag[valueId] = cls._string(mm, valueStart, valueEnd)
+                        if (0x45A3 in simpleTag and 0x4487 in simpleTag
+                            and simpleTag.get(0x447A, "und") == "und"):
+                            simpleTags[simpleTag[0x45A3]] = simpleTag[0x4487]
+                trackTags.setdefault(trackUid, {}).update(simpleTags)
+
+        streams = []
+        for trackElementId, trackStart, trackEnd in cls._elements(mm, *tracks):
+            # TrackEntry
+            if trackElementId != 0xAE:
+                continue
+            track = {0x22B59C: "eng"}
+            for elementId, start, end in cls._elements(mm, trackStart, trackEnd):
+                if elementId in [0x86, 0x22B59C]:
+                    track[elementId] = cls._string(mm, start, end)
+                elif elementId in [0x83, 0x73C5, 0x23E383]:
+                    track[elementId] = cls._uint(mm, start, end)
+                elif elementId == 0x22B59D:
+                    raise ValueError("LanguageBCP47")
+                # Video
+                elif elementId == 0xE0:
+                    for videoId, videoStart, videoEnd in cls._elements(mm, start, end):
+                        if videoId in [0xB0, 0xBA]:
+                            track[videoId] = cls._uint(mm, videoStart, videoEnd)
+
+            stream = {
+                "index": len(streams),
+                "codec_type": cls.MKV_TRACK_TYPES[track[0x83]],
+                "tags": dict(trackTags.get(track.get(0x73C5), {})),
+            }
+            codecId = track[0x86]
+            if codecId.startswith("A_AAC"):
+                stream["codec_name"] = "aac"
+            else:
+                stream["codec_name"] = cls.MKV_CODECS[codecId]
+            if track[0x22B59C] != "und":
+                stream["tags"]["language"] = track[0x22B59C]
+            if stream["codec_type"] == "video":
+                stream["width"] = track[0xB0]
+                stream["height"] = track[0xBA]
+                if track[0x23E383] == 0:
+                    raise ValueError("no DefaultDuration")
+                stream["r_frame_rate"] = f'1000000000/{track[0x23E383]}'
+            streams.append(stream)
+
+        return {
+            "format": {"duration": str(duration*timecodeScale/1e9)},
+            "streams": streams,
+        }
+
+    @classmethod
+    def _seekElement(cls, mm:mmap.mmap, seeks:dict, elementId:int, segmentEnd:int) -> tuple[int, int]:
+        """
+        Return (data start, data end) of top level element found by SeekHead.
+        """
+        for foundId, start, end in cls._elements(mm, seeks[elementId], segmentEnd):
+            if foundId != elementId:
+                raise ValueError("wrong SeekPosition")
+            return start, end
+        raise ValueError("element not found")
+
+
+
 class VideoScripy():
     """
     Class for video processesing
@@ -134,9 +1060,12 @@ class VideoScripy():
         vType ([str]):
             supported video type are .mp4 and .mkv
         
-        folderSkip ([str]):
+        folderSkip ({str}):
             self generated folders, skiped when scanning
 
+        scanWorkers (int):
+            maximum number of folders scanned at once
+
         COMPRESS_TOLERENCE (float):
             do not compress if compressdBitRate * COMPRESS_TOLERENCE < bitRate
 
@@ -146,6 +1075,61 @@ class VideoScripy():
         proc (subprocess.Popen):
             running video process : ffmpeg, Real-ESRGAN, or Ifrnet
         
+        probeWorkers (int):
+            maximum number of ffprobe running at once, default to core count
+        
+        probeCache (ProbeCache):
+            cache of probed info, None to always probe
+        
+        probeBackend (str):
+            "ffprobe", or "native" to read mp4/mkv headers with ContainerProbe,
+            falling back to ffprobe on unsupported files
+        
+        frameWorkers (int):
+            maximum number of frame() packet scans running at once
+        
+        frameCache (FrameCache):
+            cache of frame() results, None to always scan
+        
+        frameSampleRatio (float):
+            part of the duration read by frame() sampled mode
+        
+        upscaleTool (str):
+            upscaler executable, called with realesrgan-ncnn-vulkan arguments
+        
+        upscaleStreaming (bool):
+            upscale() pipes frames from decoder to encoder by batch of upscaleBatchSize,
+            instead of writing all frames on disk
+        
+        upscaleBatchSize (int):
+            number of frames on disk per batch in streaming upscale
+        
+        upscaleDedup (bool):
+            upscale() upscales consecutive duplicate frames once,
+            then links them back before encoding, not for streaming or segments
+        
+        dedupThreshold (int):
+            perceptual hash bits that may differ between duplicate frames,
+            0 for same frame file only
+        
+        segmentSeconds (float):
+            upscale() and interpolate() process keyframe aligned segments of about this duration
+            one after another, frames of one segment only are on disk, None to process whole video
+        
+        frameBatchSize (int):
+            upscale() and interpolate() frames per run, each completed run is journaled,
+            a stopped process resumes after its last completed run
+        
+        stageDepths ([int]):
+            upscaleStaged() and interpolateStaged() videos processed at once
+            in get frames, upscale or interpolate and encode stage
+        
+        previewWorkers (int):
+            maximum number of preview() videos processed at once
+        
+        previewMaxSize (int):
+            preview() grid longest side in pixel, tiles are downscaled to fit, None for no limit
+        
         killed (bool):
             indicate that kill video process is done
         
@@ -169,15 +1153,67 @@ class VideoScripy():
         self.aType = ["mp3", "m4a", "aac", "wav"]
         self.sType = ["smi", "srt"]
         self.scanType = self.vType + self.pType + self.aType + self.sType
-        self.folderSkip = [p.name for p in VideoProcess]
+        self.folderSkip = {p.name for p in VideoProcess}
+        # folder scan is I/O bound, mostly network waiting on NAS
+        self.scanWorkers = min(32, (cpu_count() or 1) + 4)
         self.COMPRESS_TOLERENCE = 0.1
 
         self.proc:subprocess.Popen = None
         self.killed = False
         self.stop_threads = False
         self.procAsync:list[subprocess.Popen] = []
+        self.probeWorkers = cpu_count() or 1
+        self.probeBackend = "ffprobe"
+        self.probeCache = ProbeCache(str(Path(__file__).parent / "probeCache.db"))
+        # packet scan is mostly I/O and demux
+        self.frameWorkers = min(4, cpu_count() or 1)
+        # shorter frame() window is not worth its seek
+        self.FRAME_WINDOW_MIN = 60
+        self.frameCache = FrameCache(str(Path(__file__).parent / "frameCache"))
+        # frame() results, cached as "<key>.<field>" arrays
+        self.FRAME_CACHE_KEYS = ["frameBytePerPacket", "frameBytePerSecond", "frameGop"]
+        # frameStats peak bit rate windows in second, packet size percentiles
+        self.FRAME_PEAK_WINDOWS = [1, 5, 30]
+        self.FRAME_PERCENTILES = [50, 95, 99]
+        # part of the duration read by a sampled frame()
+        self.frameSampleRatio = 0.02
+        # ffprobe -show_entries, read by _setVideoInfo()
+        # tags are case insensitive, handler_name also shows mkv HANDLER_NAME
+        self.PROBE_ENTRIES = (
+            'format=size,duration,bit_rate'
+            ':stream=index,codec_type,codec_name,codec_tag_string'
+            ',width,height,r_frame_rate,duration,bit_rate,nb_frames'
+            ':stream_tags=language,handler_name'
+        )
+        self.PROBE_CACHE_KEYS = [
+            "type", "duration", "bitRate", "quality", "width", "height",
+            "fps", "nbFrames", "streams", "fileSize",
+        ]
 
         self.EXIT_CODE_FILE_NAME = "exitCode.txt"
+        # cmd.exe maximum command length
+        self.CMD_LENGTH_LIMIT = 8191
+        # 4K grid, 4x4 of 4K source would be 15360x8640
+        self.previewMaxSize = 3840
+        # any realesrgan-ncnn-vulkan compatible executable
+        self.upscaleTool = "realesrgan-ncnn-vulkan.exe"
+        self.upscaleStreaming = False
+        self.upscaleBatchSize = 64
+        self.upscaleDedup = False
+        self.dedupThreshold = 0
+        # perceptual hash of a frame is DEDUP_HASH_SIZE x DEDUP_HASH_SIZE bits
+        self.DEDUP_HASH_SIZE = 16
+        # frame hashing is decode and disk bound
+        self.dedupWorkers = cpu_count() or 1
+        self.segmentSeconds = None
+        self.frameBatchSize = 1000
+        # interpolation of a batch last frames needs the next ones
+        self.INTERPOLATE_OVERLAP = 2
+        # get frames is CPU and disk bound, upscale and interpolate GPU bound
+        self.stageDepths = [1, 1, 1]
+        self.staging = False
+        # each preview ffmpeg decodes all its tiles
+        self.previewWorkers = max(1, (cpu_count() or 1) // 2)
         
         self.h265 = False
         self.gpu = False
@@ -338,12 +1374,14 @@ class VideoScripy():
     
     def getVideo(self, folderDepthLimit:int=0) -> bool:
         """
-        Set attribute vList's path and name by os.walk().\n
+        Set attribute vList's path and name by walking folders with _scanFolder()
+        in self.scanWorkers threads.\n
+        Too deep and self generated folders are pruned before being walked.\n
         Return false if self.path do not exist anymore.
 
         Parameters:
             folderDepthLimit (int):
-                limit the scan depth
+                limit the scan depth, -1 for no limit
         """
         
         # empty video list
@@ -354,207 +1392,457 @@ class VideoScripy():
             printC(f'Path "{self.path}" do not exist', "red")
             return False
 
-        for root, _, files in walk(self.path):
-            # get current root's depth
-            currentDepth = len(root.replace(self.path,"").split("\\"))-1
+        processTime = time()
 
-            # skip too deep folder
-            if currentDepth > folderDepthLimit and folderDepthLimit != -1:
-                continue
-            # skip folder
-            skip = False
-            for folderSkip in self.folderSkip:
-                if Path(root).name == folderSkip:
-                    printC(f'Self generated folder "{folderSkip}" skiped', "yellow")
-                    skip = True
-                    break
-            if skip:
-                continue
+        # ended folder scans with their depth, wait() on every pending scan is quadratic
+        scanned:Queue = Queue()
+        with ThreadPoolExecutor(max_workers=self.scanWorkers) as executor:
+            def scan(folder:str, depth:int, scanSubFolder:bool) -> None:
+                executor.submit(self._scanFolder, folder, scanSubFolder).add_done_callback(
+                    lambda future: scanned.put((future, depth))
+                )
 
-            # get videos
-            for file in files:
-                # skip not supported type
-                fileFormat = file.split(".")[-1].lower()
-                if fileFormat not in self.scanType:
-                    continue
-                # check &
-                if "&" in root+"\\"+file:
-                    printC(f'"&" must not used in path or file name', "yellow")
-                    printC(f'Skipped "{file}"', "yellow")
-                    continue
-                self.vList.append({
-                    "type" : fileFormat,
-                    "path" : root+"\\"+file,
-                    "name" : (root+"\\"+file).replace(self.path+'\\','').replace('\\','__')
-                })
-            
-            # stop scan for perfomance
-            if folderDepthLimit == 0:
-                break
+            scan(self.path, 0, folderDepthLimit != 0)
+            pending = 1
+            while pending:
+                future, depth = scanned.get()
+                pending -= 1
+                depth += 1
+                videos, folders = future.result()
+                self.vList.extend(videos)
+
+                # prune too deep folder
+                scanDeeper = folderDepthLimit == -1 or depth < folderDepthLimit
+                for folder in folders:
+                    scan(folder, depth, scanDeeper)
+                pending += len(folders)
         
         # order by name
         self.vList.sort(key= lambda video: video['name'])
 
+        processTime = time() - processTime
+        processTime = timedelta(seconds=processTime)
+        print(f"Scan took : {str(processTime)[:-3]}")
+
         return True
-    
-    def getVideoInfo(self) -> None:
+
+    def _scanFolder(self, root:str, scanSubFolder:bool=True) -> tuple[list[VideoInfo], list[str]]:
         """
-        Set attributes vList's stream and video properties with ffprobe asynchronously
+        Scan one folder with os.scandir(), without going deeper.\n
+        Return its supported files as VideoInfo with type, path, name,
+        fileSize and modifiedTime, and its sub folders except self generated ones.
+
+        Parameters:
+            root (str):
+                folder path
+
+            scanSubFolder (bool):
+                False to not return sub folders
         """
-    
-        # run probe
-        for video in self.vList:
-            command = (
-                f' ffprobe'
-                f' -i "{video["path"]}"'
-                f' -show_format'
-                f' -show_streams'
-                f' -of json'
-            )
-            self._runProcAsync(command)
+        videos:list[VideoInfo] = []
+        folders:list[str] = []
 
-        # wait and retrieve results
-        results = self._runProcAsyncWait()
-        for index in range(len(results)-1,-1,-1):
-            if results[index]['returnCode'] != 0:
-                printC(f'FFprobe error, remove {self.vList[index]["name"]}', "red")
-                # delete errored video
-                self.vList.pop(index)
-                results.pop(index)
-            else:
-                # convert stdout to json format
-                results[index] = (
-                    json.loads(results[index]['stdout'].decode('utf-8'))
-                )
+        try:
+            entries = list(scandir(root))
+        except OSError:
+            printC(f'Can not scan "{root}"', "yellow")
+            return videos, folders
 
-        # get info
-        for videoIndex in range(len(self.vList)-1,-1,-1):
+        for entry in entries:
+            path = root+sep+entry.name
             try:
-                streamInfo:list[StreamInfo] = []
-                videoStream = []
-                # get stream info
-                for stream in results[videoIndex]['streams']:
-
-                    # some subtitle dont has codec_name (mov_text)
-                    try :
-                        codecName = stream["codec_name"]
-                    except:
-                        codecName = stream["codec_tag_string"]
-                    
-                    # mkv video stream dont has language tags, needs to be initialized
-                    try :
-                        tagLanguage = stream["tags"]["language"]
-                    except:
-                        tagLanguage = "und"
-                        
-                    # use handler_name as title
-                    try :
-                        # mp4
-                        tagTitle = stream["tags"]["handler_name"]
-                    except:
-                        try:
-                            # mkv
-                            tagTitle = stream["tags"]["HANDLER_NAME"]
-                        except:
-                            # others (png)
-                            tagTitle = ""
-
-                    streamInfo.append({
-                        "index": int(stream["index"]),
-                        "codec_type": stream["codec_type"],
-                        "codec_name": codecName,
-                        "selected": True,
-                        "language": tagLanguage,
-                        "title": tagTitle,
-                    })
+                isFolder = entry.is_dir()
+            except OSError:
+                continue
 
-                    if stream['codec_type'] == 'video':
-                        videoStream.append(stream)
-                
-                # write info
-                self.vList[videoIndex]['streams'] = streamInfo
-                self.vList[videoIndex]['fileSize'] = int(results[videoIndex]['format']['size'])
-                # video
-                if self.vList[videoIndex]["type"] in self.vType:
-                    # # warn more than 1 video stream
-                    # if len(videoStream) > 1:
-                    #     printC(
-                    #         f'More than 1 video stream found in "{self.vList[videoIndex]["name"]}", '
-                    #         f'only the first will be processed', "yellow"
-                    #     )
-                    try:
-                        videoStream = videoStream[0]
-                        self.vList[videoIndex]['width'] = int(videoStream['width'])
-                        self.vList[videoIndex]['height'] = int(videoStream['height'])
-                        num, denom = videoStream['r_frame_rate'].split('/')
-                        self.vList[videoIndex]['fps'] = round(float(num)/float(denom),2)
+            if isFolder:
+                if not scanSubFolder:
+                    continue
+                # skip folder
+                if entry.name in self.folderSkip:
+                    printC(f'Self generated folder "{entry.name}" skiped', "yellow")
+                # do not follow link, as os.walk()
+                elif not entry.is_symlink():
+                    folders.append(path)
+                continue
+
+            # skip not supported type
+            fileFormat = entry.name.split(".")[-1].lower()
+            if fileFormat not in self.scanType:
+                continue
+            # check &
+            if "&" in path:
+                printC(f'"&" must not used in path or file name', "yellow")
+                printC(f'Skipped "{entry.name}"', "yellow")
+                continue
+
+            # stat is free from scandir on Windows
+            try:
+                fileStat = entry.stat()
+            except OSError:
+                continue
+
+            videos.append(VideoInfo(
+                type = fileFormat,
+                path = path,
+                name = path.replace(self.path+sep,'').replace(sep,'__'),
+                fileSize = fileStat.st_size,
+                modifiedTime = fileStat.st_mtime_ns,
+            ))
+
+        return videos, folders
+    
+    def rescanVideo(self, folderDepthLimit:int=0, previous:list[VideoInfo]=None) -> ScanDiff:
+        """
+        Incremental getVideo() and getVideoInfo(), only new and modified files are probed,
+        unchanged files keep their previous VideoInfo.\n
+        Set attribute vList, ordered by name.\n
+        Return added, removed and modified videos compared to previous,
+        None if self.path do not exist anymore.
+
+        Parameters:
+            folderDepthLimit (int):
+                limit the scan depth
+
+            previous ([VideoInfo]):
+                last scanned videos, None to use vList
+        """
+        if previous is None:
+            previous = self.vList
+        previousVideos = {video["path"]: video for video in previous}
+
+        if not self.getVideo(folderDepthLimit):
+            return None
+
+        diff:ScanDiff = {"added":[], "removed":[], "modified":[]}
+        vList:list[VideoInfo] = []
+        replaced:dict[str, VideoInfo] = {}
+        for video in self.vList:
+            previousVideo = previousVideos.pop(video["path"], None)
+            if previousVideo is None:
+                diff["added"].append(video)
+            elif (
+                self._getFileStat(video)
+                != (previousVideo.get("fileSize"), previousVideo.get("modifiedTime"))
+            ):
+                diff["modified"].append(video)
+                replaced[video["path"]] = previousVideo
+            else:
+                video = previousVideo
+            vList.append(video)
+        diff["removed"] = list(previousVideos.values())
+
+        # probe changed videos only
+        self.vList = diff["added"] + diff["modified"]
+        self.getVideoInfo()
+        probed = {id(video) for video in self.vList}
+
+        # errored new video is not added, errored modified video is removed
+        errored = set()
+        for video in diff["added"] + diff["modified"]:
+            if id(video) not in probed:
+                errored.add(id(video))
+                if video["path"] in replaced:
+                    diff["removed"].append(replaced[video["path"]])
+        diff["added"] = [video for video in diff["added"] if id(video) not in errored]
+        diff["modified"] = [video for video in diff["modified"] if id(video) not in errored]
+        self.vList = [video for video in vList if id(video) not in errored]
+
+        printC(
+            f'{len(diff["added"])} added | '
+            f'{len(diff["removed"])} removed | '
+            f'{len(diff["modified"])} modified',
+            "blue"
+        )
+        return diff
+
+    def getVideoInfo(self) -> None:
+        """
+        Set attributes vList's stream and video properties with ffprobe asynchronously,
+        at most self.probeWorkers ffprobe run at once.\n
+        Files unchanged since their last probe are read from self.probeCache.\n
+        Mp4/mkv headers are read by ContainerProbe if self.probeBackend is "native".
+        """
+        for _ in self.iterVideoInfo():
+            pass
+
+    def iterVideoInfo(self):
+        """
+        Same as getVideoInfo(), but yield each VideoInfo as soon as its info is set,
+        cached first then in probe completion order, errored ones are not yielded.\n
+        Errored videos are removed from vList once exhausted.
+        """
+
+        # read cached info, probe the others
+        toProbe:list[VideoInfo] = []
+        for video in self.vList:
+            if self._loadVideoInfo(video):
+                yield video
+            else:
+                toProbe.append(video)
+
+        # read mp4/mkv headers in-process, ffprobe the others
+        if self.probeBackend == "native":
+            toNativeProbe = [video for video in toProbe if video["type"] in self.vType]
+            nativeProbed = set()
+            with ThreadPoolExecutor(max_workers=self.probeWorkers) as executor:
+                futures = {
+                    executor.submit(ContainerProbe.probe, video["path"]): video
+                    for video in toNativeProbe
+                }
+                for future in as_completed(futures):
+                    video = futures[future]
+                    probe = future.result()
+                    if probe is not None and self._setVideoInfo(video, probe):
+                        self._saveVideoInfo(video)
+                        nativeProbed.add(id(video))
+                        yield video
+            toProbe = [video for video in toProbe if id(video) not in nativeProbed]
+    
+        # run probe, only ask entries read by _setVideoInfo()
+        commands = []
+        for video in toProbe:
+            command = (
+                f' ffprobe'
+                f' -i "{video["path"]}"'
+                f' -show_entries {self.PROBE_ENTRIES}'
+                f' -of json=compact=1'
+            )
+            commands.append(command)
+
+        # retrieve results as each probe ends
+        errored = set()
+        for index, result in self._runProcPoolIter(commands):
+            video = toProbe[index]
+            if result['returnCode'] != 0:
+                printC(f'FFprobe error, remove {video["name"]}', "red")
+                errored.add(id(video))
+                continue
+
+            # convert stdout to json format
+            probe = jsonLoads(result['stdout'])
+
+            if self._setVideoInfo(video, probe):
+                self._saveVideoInfo(video)
+                yield video
+            else:
+                errored.add(id(video))
+
+        # delete errored video
+        if errored:
+            self.vList = [video for video in self.vList if id(video) not in errored]
+
+        print(f"Get {len(self.vList)} file info")
+
+        if self.probeCache is not None:
+            self.probeCache.commit()
+            self.probeCache.printStats()
+
+    def _setVideoInfo(self, video:VideoInfo, probe:dict) -> bool:
+        """
+        Set video's stream and video properties from ffprobe json output.\n
+        Return False if info can not be get.
+
+        Parameters:
+            video (VideoInfo):
+                element of vList
+
+            probe (dict):
+                ffprobe json output, with at least self.PROBE_ENTRIES
+        """
+        try:
+            streamInfo:list[StreamInfo] = []
+            videoStream = []
+            # get stream info
+            for stream in probe['streams']:
+
+                # some subtitle dont has codec_name (mov_text)
+                try :
+                    codecName = stream["codec_name"]
+                except:
+                    codecName = stream["codec_tag_string"]
+                
+                # mkv video stream dont has language tags, needs to be initialized
+                try :
+                    tagLanguage = stream["tags"]["language"]
+                except:
+                    tagLanguage = "und"
+                    
+                # use handler_name as title
+                try :
+                    # mp4
+                    tagTitle = stream["tags"]["handler_name"]
+                except:
+                    try:
+                        # mkv
+                        tagTitle = stream["tags"]["HANDLER_NAME"]
                     except:
-                        printC(
-                            f'"{self.vList[videoIndex]["name"]}" typed as video but has no video content',
-                            "yellow"
-                        )
-                        self.vList[videoIndex]["type"] = "other"
-                # mp4
-                if self.vList[videoIndex]["type"] == "mp4":
-                    self.vList[videoIndex]['duration'] = timedelta(seconds=float(videoStream['duration']))
-                    self.vList[videoIndex]['bitRate'] = int(videoStream['bit_rate'])
-                    self.vList[videoIndex]['nbFrames'] = int(videoStream['nb_frames'])
-                    self.vList[videoIndex]["quality"] = round(
-                        self.vList[videoIndex]['bitRate']
-                        /(self.vList[videoIndex]['width']*self.vList[videoIndex]["height"]),1
-                    )
-                # mkv
-                elif self.vList[videoIndex]["type"] == "mkv":
-                    self.vList[videoIndex]['duration'] = timedelta(seconds=float(results[videoIndex]['format']['duration']))
-                    self.vList[videoIndex]['bitRate'] = int(results[videoIndex]['format']['bit_rate'])
-                    self.vList[videoIndex]['nbFrames'] = ceil(
-                        self.vList[videoIndex]['fps'] 
-                        * self.vList[videoIndex]['duration'].total_seconds()
-                    )
-                    self.vList[videoIndex]["quality"] = round(
-                        self.vList[videoIndex]['bitRate']
-                        /(self.vList[videoIndex]['width']*self.vList[videoIndex]["height"]),1
-                    )
-                # picture
-                elif self.vList[videoIndex]["type"] in self.pType:
-                    self.vList[videoIndex]['duration'] = timedelta(seconds=0)
-                    self.vList[videoIndex]['bitRate'] = 0
-                    self.vList[videoIndex]['nbFrames'] = 1
-                    self.vList[videoIndex]['width'] = int(videoStream[0]['width'])
-                    self.vList[videoIndex]['height'] = int(videoStream[0]['height'])
-                    self.vList[videoIndex]['fps'] = 1.0
-                    self.vList[videoIndex]["quality"] = 0.0
-                # audio
-                elif self.vList[videoIndex]["type"] in self.aType:
-                    self.vList[videoIndex]['duration'] = timedelta(seconds=float(results[videoIndex]['format']['duration']))
-                    self.vList[videoIndex]['bitRate'] = int(results[videoIndex]['format']['bit_rate'])
-                    self.vList[videoIndex]['nbFrames'] = 0
-                    self.vList[videoIndex]['width'] = 0
-                    self.vList[videoIndex]['height'] = 0
-                    self.vList[videoIndex]['fps'] = 0.0
-                    self.vList[videoIndex]["quality"] = 0.0
-                # subtitle and other
-                elif self.vList[videoIndex]["type"] in self.sType + ["other"]:
-                    self.vList[videoIndex]['duration'] = timedelta(seconds=0)
-                    self.vList[videoIndex]['bitRate'] = 0
-                    self.vList[videoIndex]['nbFrames'] = 0
-                    self.vList[videoIndex]['width'] = 0
-                    self.vList[videoIndex]['height'] = 0
-                    self.vList[videoIndex]['fps'] = 0.0
-                    self.vList[videoIndex]["quality"] = 0.0
-                else:
+                        # others (png)
+                        tagTitle = ""
+
+                streamInfo.append(StreamInfo(
+                    index = int(stream["index"]),
+                    codec_type = stream["codec_type"],
+                    codec_name = codecName,
+                    selected = True,
+                    language = tagLanguage,
+                    title = tagTitle,
+                ))
+
+                if stream['codec_type'] == 'video':
+                    videoStream.append(stream)
+            
+            # write info
+            video['streams'] = streamInfo
+            video['fileSize'] = int(probe['format']['size'])
+            # video
+            if video["type"] in self.vType:
+                # # warn more than 1 video stream
+                # if len(videoStream) > 1:
+                #     printC(
+                #         f'More than 1 video stream found in "{video["name"]}", '
+                #         f'only the first will be processed', "yellow"
+                #     )
+                try:
+                    videoStream = videoStream[0]
+                    video['width'] = int(videoStream['width'])
+                    video['height'] = int(videoStream['height'])
+                    num, denom = videoStream['r_frame_rate'].split('/')
+                    video['fps'] = round(float(num)/float(denom),2)
+                except:
                     printC(
-                        f'Uncovered type "{self.vList[videoIndex]["type"]}" at "{self.vList[videoIndex]["name"]}"',
-                        "red"
+                        f'"{video["name"]}" typed as video but has no video content',
+                        "yellow"
                     )
+                    video["type"] = "other"
+            # mp4
+            if video["type"] == "mp4":
+                video['duration'] = timedelta(seconds=float(videoStream['duration']))
+                video['bitRate'] = int(videoStream['bit_rate'])
+                video['nbFrames'] = int(videoStream['nb_frames'])
+                video["quality"] = round(
+                    video['bitRate']
+                    /(video['width']*video["height"]),1
+                )
+            # mkv
+            elif video["type"] == "mkv":
+                video['duration'] = timedelta(seconds=float(probe['format']['duration']))
+                video['bitRate'] = int(probe['format']['bit_rate'])
+                video['nbFrames'] = ceil(
+                    video['fps'] 
+                    * video['duration'].total_seconds()
+                )
+                video["quality"] = round(
+                    video['bitRate']
+                    /(video['width']*video["height"]),1
+                )
+            # picture
+            elif video["type"] in self.pType:
+                video['duration'] = timedelta(seconds=0)
+                video['bitRate'] = 0
+                video['nbFrames'] = 1
+                video['width'] = int(videoStream[0]['width'])
+                video['height'] = int(videoStream[0]['height'])
+                video['fps'] = 1.0
+                video["quality"] = 0.0
+            # audio
+            elif video["type"] in self.aType:
+                video['duration'] = timedelta(seconds=float(probe['format']['duration']))
+                video['bitRate'] = int(probe['format']['bit_rate'])
+                video['nbFrames'] = 0
+                video['width'] = 0
+                video['height'] = 0
+                video['fps'] = 0.0
+                video["quality"] = 0.0
+            # subtitle and other
+            elif video["type"] in self.sType + ["other"]:
+                video['duration'] = timedelta(seconds=0)
+                video['bitRate'] = 0
+                video['nbFrames'] = 0
+                video['width'] = 0
+                video['height'] = 0
+                video['fps'] = 0.0
+                video["quality"] = 0.0
+            else:
+                printC(
+                    f'Uncovered type "{video["type"]}" at "{video["name"]}"',
+                    "red"
+                )
+
+        except Exception as e:
+            printC(f'Unexpected erro "{e.with_traceback(None)}"', "red")
+            printC(f'Can not get video info of "{video["name"]}"', "red")
+            return False
 
-            except Exception as e:
-                printC(f'Unexpected erro "{e.with_traceback(None)}"', "red")
-                printC(f'Can not get video info of "{self.vList[videoIndex]["name"]}"', "red")
-                # delete errored video
-                self.vList.pop(videoIndex)
+        return True
 
-        print(f"Get {len(self.vList)} file info")
+    def _getFileStat(self, video:VideoInfo) -> tuple[int, int]:
+        """
+        Return video file's (size, modification time in ns), None if not reachable.\n
+        Use the one recorded by getVideo() scan if any.
+
+        Parameters:
+            video (VideoInfo):
+                element of vList
+        """
+        if "fileSize" in video and "modifiedTime" in video:
+            return video["fileSize"], video["modifiedTime"]
+        try:
+            fileStat = stat(video["path"])
+        except OSError:
+            return None
+        return fileStat.st_size, fileStat.st_mtime_ns
+
+    def _loadVideoInfo(self, video:VideoInfo) -> bool:
+        """
+        Set video's modifiedTime, and its info from self.probeCache.\n
+        Return False if not cached or file changed since cached.
+
+        Parameters:
+            video (VideoInfo):
+                element of vList
+        """
+        fileStat = self._getFileStat(video)
+        if fileStat is None:
+            return False
+        video["modifiedTime"] = fileStat[1]
+
+        if self.probeCache is None:
+            return False
+
+        info = self.probeCache.get(video["path"], *fileStat)
+        if info is None:
+            return False
+
+        for key in self.PROBE_CACHE_KEYS:
+            video[key] = info[key]
+        video["duration"] = timedelta(seconds=info["duration"])
+        video["streams"] = [StreamInfo(**stream) for stream in info["streams"]]
+        return True
+
+    def _saveVideoInfo(self, video:VideoInfo) -> None:
+        """
+        Write video's probed info into self.probeCache.
+
+        Parameters:
+            video (VideoInfo):
+                element of vList
+        """
+        if self.probeCache is None:
+            return
+
+        fileStat = self._getFileStat(video)
+        if fileStat is None:
+            return
+
+        # skip uncovered type, info not complete
+        if any(key not in video for key in self.PROBE_CACHE_KEYS):
+            return
+
+        info = {key:video[key] for key in self.PROBE_CACHE_KEYS}
+        info["duration"] = video["duration"].total_seconds()
+        info["streams"] = [dict(stream.items()) for stream in video["streams"]]
+        self.probeCache.set(video["path"], *fileStat, info)
 
 
     # ffmpeg encoder related
@@ -620,7 +1908,10 @@ class VideoScripy():
         videoName = video['name']
 
         videoFps = video['fps']
-        if substep == 2 and process == VideoProcess.interpolate.name:
+        if (
+            substep in [2, "segmentEncode", "segmentConcat"]
+            and process == VideoProcess.interpolate.name
+        ):
             videoFps = video["interpolateFps"]
 
         hwaccel = ''
@@ -666,7 +1957,78 @@ class VideoScripy():
 
         elif process in [VideoProcess.upscale.name, VideoProcess.interpolate.name]:
             
-            if substep == 0:
+            # decode to raw rgb frames on stdout
+            if substep == "pipeIn":
+                command = (
+                    f' ffmpeg'
+                    f' -i "{videoPath}"'
+                    f' -map 0:v:0'
+                    f' -r {videoFps}'
+                    f' -f rawvideo -pix_fmt rgb24'
+                    f' -loglevel error'
+                    f' pipe:1'
+                )
+            # encode raw rgb frames from stdin, streams of original video
+            elif substep == "pipeOut":
+                command = (
+                    f' ffmpeg'
+                    f' -f rawvideo -pix_fmt rgb24'
+                    f' -s {video["pipeWidth"]}x{video["pipeHeight"]}'
+                    f' -r {videoFps}'
+                    f' -i pipe:0'
+                    f' -i "{videoPath}"'
+                    f' -map 0:v -map 1:a? -map 1:s?'
+                    f' -loglevel error'
+                    f' -c:v copy -c:a copy -c:s copy'
+                    f' -c:v:0 {self.encoder} {video["compressBitRateParam"]}'
+                    f' -r {videoFps}'
+                    f' -y'
+                    f' "{self.path}\\{process}\\{videoName}"'
+                )
+            # frames of one segment, starting at a keyframe
+            elif substep == "segmentFrames":
+                # half a frame before, keyframe is kept despite float rounding
+                command = (
+                    f' ffmpeg'
+                    f' -ss {max(0.0, video["segmentStart"] - 0.5 / videoFps)}'
+                    f' -i "{videoPath}"'
+                    f' -frames:v {video["segmentFrames"]}'
+                    f' -map 0:v:0'
+                    f' -qscale:v 1 -qmin 1 -qmax 1 -y'
+                    f' -r {videoFps}'
+                    f' "{video["getFramesOutputPath"]}/frame%08d.jpg"'
+                )
+            # processed frames of one segment to video only
+            elif substep == "segmentEncode":
+                if process == VideoProcess.upscale.name:
+                    processOutputPath = video["upscaleOutputPath"]
+                    nbFrames = video["segmentFrames"]
+                else:
+                    processOutputPath = video["interpolateOutputPath"]
+                    nbFrames = video["interpolateFrame"]
+                command = (
+                    f' ffmpeg'
+                    f' -r {videoFps}'
+                    f' -i "{processOutputPath}/frame%08d.jpg"'
+                    f' -frames:v {nbFrames}'
+                    f' -c:v {self.encoder} {video["compressBitRateParam"]}'
+                    f' -r {videoFps}'
+                    f' -y'
+                    f' "{video["segmentOutputPath"]}"'
+                )
+            # lossless concatenation of segments, streams of original video
+            elif substep == "segmentConcat":
+                command = (
+                    f' ffmpeg'
+                    f' -f concat -safe 0'
+                    f' -i "{video["segmentListPath"]}"'
+                    f' -i "{videoPath}"'
+                    f' -map 0:v -map 1:a? -map 1:s?'
+                    f' -c copy'
+                    f' -y'
+                    f' "{process}\\{videoName}"'
+                )
+            elif substep == 0:
                 command = (
                     f' ffmpeg'
                     f' -i "{videoPath}"'
@@ -687,9 +2049,9 @@ class VideoScripy():
                 elif process == VideoProcess.interpolate.name:
                     processOutputPath = video["interpolateOutputPath"]
 
-                if substep == 1 and process == VideoProcess.upscale.name:
+                if substep in [1, "batch"] and process == VideoProcess.upscale.name:
                     command = (
-                        f' realesrgan-ncnn-vulkan.exe'
+                        f' {self.upscaleTool}'
                         f' -i "{video["getFramesOutputPath"]}"'
                         f' -o "{processOutputPath}"'
                     )
@@ -702,8 +2064,10 @@ class VideoScripy():
                     else:
                         printC(f'Unknown upscale factor "{upscaleFactor}"', "red")
                         return None
+                    # batch frames are lossless
+                    imageFormat = "png" if substep == "batch" else "jpg"
                     command += (
-                        f' -f jpg -g {gpuNumber}'
+                        f' -f {imageFormat} -g {gpuNumber}'
                     )
                 elif substep == 1 and process == VideoProcess.interpolate.name:
                     command = (
@@ -751,10 +2115,14 @@ class VideoScripy():
             self.killed = True
         
         if self.procAsync != []:
-            for procAsync in self.procAsync:
-                parent = psutil.Process(procAsync.pid)
-                for child in parent.children(recursive=True):
-                    child.kill()
+            # copy, pooled process remove themselves when done
+            for procAsync in list(self.procAsync):
+                try:
+                    parent = psutil.Process(procAsync.pid)
+                    for child in parent.children(recursive=True):
+                        child.kill()
+                except psutil.NoSuchProcess:
+                    pass
             self.killed = True
 
     def _runProc(self, command:str, processName='', silence=False) -> bool:
@@ -778,32 +2146,56 @@ class VideoScripy():
 
         printC(f'Running process : {processName}', "blue")
 
+        # staged processes run at once, one exit code file each
+        exitCodeFile = self.EXIT_CODE_FILE_NAME
+        if self.staging:
+            exitCodeFile = f'{get_ident()}_{self.EXIT_CODE_FILE_NAME}'
+
         commandWarped = (
             f' start "VideoScripy-{processName}" /I /min /wait /realtime'
             f' cmd /v:on /c " {self.path[0]}:'
             f' & cd {self.path}'
             f' & {command}'
-            f' & echo ^!errorLevel^! > {self.EXIT_CODE_FILE_NAME}"'
+            f' & echo ^!errorLevel^! > {exitCodeFile}"'
         )
 
-        self.killed = False
-        self.proc = subprocess.Popen(
+        self._resetKilled()
+        # do not start new process once killProc() called
+        if self.killed:
+            return False
+
+        proc = subprocess.Popen(
             commandWarped,
             shell=True,
             stdout=subprocess.PIPE,
             stderr=subprocess.STDOUT,
         )
-        self.proc.communicate()
-        self.proc = None
+        # staged processes are all visible to killProc()
+        if self.staging:
+            self.procAsync.append(proc)
+            proc.communicate()
+            self.procAsync.remove(proc)
+        else:
+            self.proc = proc
+            self.proc.communicate()
+            self.proc = None
 
         if not silence:
             processTime = time() - processTime
             processTime = timedelta(seconds=processTime)
             print(f"Took : {str(processTime)[:-3]}")
 
-        return self._checkExitCode(silence)
+        return self._checkExitCode(silence, exitCodeFile)
 
-    def _checkExitCode(self, silence=False) -> bool:
+    def _resetKilled(self) -> None:
+        """
+        Clear killed flag before a new process.\n
+        Kept while staging, one killProc() stops every stage.
+        """
+        if not self.staging:
+            self.killed = False
+
+    def _checkExitCode(self, silence=False, exitCodeFile:str=None) -> bool:
         """
         Open EXIT_CODE_FILE_NAME file to get process returned code.\n
         Return True if 0 or -1, else False.
@@ -811,9 +2203,14 @@ class VideoScripy():
         Parameters:
             silence (str):
                 don't print exit code check
+
+            exitCodeFile (str):
+                file name, None for EXIT_CODE_FILE_NAME
         """
+        if exitCodeFile is None:
+            exitCodeFile = self.EXIT_CODE_FILE_NAME
 
-        filePath = self.path+f'\\{self.EXIT_CODE_FILE_NAME}'
+        filePath = self.path+f'\\{exitCodeFile}'
 
         if not isfile(filePath):
             if not silence:
@@ -849,7 +2246,7 @@ class VideoScripy():
             command (str):
                 shell script command, _getCommand return command
         """
-        self.killed = False
+        self._resetKilled()
         self.procAsync.append(
             subprocess.Popen(
                 command,
@@ -874,6 +2271,128 @@ class VideoScripy():
         self.procAsync.clear()
         return result
 
+    def _runProcPoolIter(self, commands:list[str], maxWorkers:int=None):
+        """
+        Run shell scripts in hidden "cmd.exe", at most maxWorkers at once.\n
+        Yield (command index, {returnCode, stdout}) as soon as each process ends,
+        a slow one do not hold back the others.
+
+        Parameters:
+            commands ([str]):
+                shell script commands
+
+            maxWorkers (int):
+                concurrency limit, None to use self.probeWorkers
+        """
+        if maxWorkers is None:
+            maxWorkers = self.probeWorkers
+
+        self._resetKilled()
+        with ThreadPoolExecutor(max_workers=max(1, maxWorkers)) as executor:
+            futures = {
+                executor.submit(self._runProcPooled, command): index
+                for index, command in enumerate(commands)
+            }
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+
+    def _runProcPooled(self, command:str) -> ProcAsyncReturn:
+        """
+        Worker of _runProcPoolIter(), run one shell script till its end.\n
+        Return {returnCode, stdout}, returnCode is -1 if killProc() called before start.
+
+        Parameters:
+            command (str):
+                shell script command
+        """
+        # do not start new process once killProc() called
+        if self.killed:
+            return {"returnCode": -1, "stdout": b""}
+
+        proc = subprocess.Popen(
+            command,
+            shell=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        # keep it visible to killProc()
+        self.procAsync.append(proc)
+        out, _ = proc.communicate()
+        self.procAsync.remove(proc)
+
+        return {
+            "returnCode": proc.returncode,
+            "stdout": out,
+        }
+
+    def _runProcCsv(self, command:str, nbFields:int, onChunk, chunkSize:int=1 << 20) -> int:
+        """
+        Run shell script, read its csv stdout by chunk from the pipe,
+        whole output is never buffered.\n
+        Return process's return code, -1 if killProc() called before start.
+
+        Parameters:
+            command (str):
+                shell script command, must print nbFields fields per line
+
+            nbFields (int):
+                number of fields per line
+
+            onChunk (function):
+                called with each chunk's fields as bytes array of shape (lines, nbFields),
+                process is killed if it raises
+
+            chunkSize (int):
+                read size in byte
+        """
+        # do not start new process once killProc() called
+        if self.killed:
+            return -1
+
+        proc = subprocess.Popen(
+            command,
+            shell=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        # keep it visible to killProc()
+        self.procAsync.append(proc)
+
+        remain = b""
+        done = False
+        try:
+            while True:
+                data = proc.stdout.read(chunkSize)
+                if not data:
+                    break
+
+                # keep incomplete last line for next chunk
+                data = remain + data
+                lastLine = data.rfind(b"\n") + 1
+                remain = data[lastLine:]
+                # split on "," and line end, "\r\n" included
+                fields = data[:lastLine].replace(b",", b" ").split()
+                if fields:
+                    onChunk(np.array(fields).reshape(-1, nbFields))
+
+            if remain.strip():
+                onChunk(np.array(remain.replace(b",", b" ").split()).reshape(-1, nbFields))
+            done = True
+        finally:
+            # onChunk raised, nobody reads the pipe anymore
+            if not done:
+                try:
+                    parent = psutil.Process(proc.pid)
+                    for child in parent.children(recursive=True):
+                        child.kill()
+                    parent.kill()
+                except psutil.NoSuchProcess:
+                    pass
+            proc.stdout.close()
+            proc.wait()
+            self.procAsync.remove(proc)
+        return proc.returncode
+
     def _frameWatch(self, outDir:str, total:int) -> None:
         """
         Track video frame process with progress bar in while loop,
@@ -889,7 +2408,7 @@ class VideoScripy():
         self.stop_threads = False
         # wait 1s to avoid print overlap with "Running process"
         sleep(1)
-        alreadyProgressed = len(listdir(outDir))
+        alreadyProgressed = self._countFrames(outDir)
         restToProgress = total - alreadyProgressed
         print(f"Already progressed : {alreadyProgressed}/{total}")
         print(f"Remain to progress : {restToProgress}/{total}")
@@ -898,19 +2417,25 @@ class VideoScripy():
         with alive_bar(total) as bar:
             if alreadyProgressed != 0:
                 bar(alreadyProgressed, skipped=True)
-            while len(listdir(outDir)) < total:
+            while self._countFrames(outDir) < total:
                 sleep(1)
-                progressed = len(listdir(outDir)) - alreadyProgressed
+                progressed = self._countFrames(outDir) - alreadyProgressed
                 bar(progressed - progressedPrev)
                 progressedPrev = progressed
 
                 if self.stop_threads:
                     break
             
-            progressed = len(listdir(outDir)) - alreadyProgressed
+            progressed = self._countFrames(outDir) - alreadyProgressed
             bar(progressed - progressedPrev)
             progressedPrev = progressed
 
+    def _countFrames(self, outDir:str) -> int:
+        """
+        Return number of files in outDir, batch folder of _runFrameBatches() aside.
+        """
+        return len([entry for entry in scandir(outDir) if entry.is_file()])
+
     def _frameWatchStart(self, outDir:str, total:int) -> None:
         """
         Run _frameWatch() in a thread.
@@ -947,36 +2472,37 @@ class VideoScripy():
                 element of vList
         """
         getFramesOutputPath = video["getFramesOutputPath"]
+        dedupPath = f'{getFramesOutputPath}_dedup.json'
         # check if get frame is necessary
         if isdir(getFramesOutputPath):
 
-            # get number of frames, 3rd round
-            if isdir(f'{getFramesOutputPath}\\processed'):
-                obtainedFrames = (
-                    len(listdir(getFramesOutputPath)) - 1
-                    + len(listdir(f'{getFramesOutputPath}\\processed'))
-                )
-            # get number of frames, less than 3rd round
-            else:
-                obtainedFrames = len(listdir(getFramesOutputPath))
+            # get number of frames, batch folder of a stopped process aside
+            obtainedFrames = self._countFrames(getFramesOutputPath)
+
+            # removed duplicates are only listed, see _dedupFrames()
+            if isfile(dedupPath):
+                with open(dedupPath, encoding="utf-8") as file:
+                    obtainedFrames += len(json.load(file))
 
             # equal to what it should has, allow +- 1 frame difference
             if abs(obtainedFrames - video["nbFrames"]) <= 1:
                 printC("No need to get frames", "yellow")
-                self.killed = False
+                self._resetKilled()
                 return True
             else:
                 printC("Missing frames, regenerate frames needed", "yellow")
                 rmtree(getFramesOutputPath)
 
         # create new temporary frames folder
+        if isfile(dedupPath):
+            remove(dedupPath)
         mkdir(getFramesOutputPath)
 
         command = self._getCommand(video, process.name, substep=0)
         result = self._runProc(command, process.value[0])
 
         # check frames count
-        obtainedFrames = len(listdir(getFramesOutputPath))
+        obtainedFrames = self._countFrames(getFramesOutputPath)
         if obtainedFrames != video["nbFrames"]:
             printC(
                 f'Warning, obtained frames {obtainedFrames} '
@@ -989,59 +2515,654 @@ class VideoScripy():
         
         return result
 
-    def pre_compress(self, video:VideoInfo, width:int, height:int, quality:float) -> bool:
+    def _dedupFrames(self, video:VideoInfo) -> dict[str, str]:
         """
-        Compute compressBitRate and compressBitRateParam, to limit video bit rate\n
-        Return True if compression is needed else False
-        
+        Remove consecutive duplicate frames from getFramesOutputPath,
+        compared to the last kept frame, see dedupThreshold.\n
+        Removed frames are listed in "<getFramesOutputPath>_dedup.json",
+        read back by a continued process.\n
+        Return {duplicate frame name: kept frame name}
+
         Parameters:
             video (VideoInfo):
-                element of vList
-
-            width (int):
-                video width
-
-            height (int):
-                video height
-
-            quality (float):
-                video bit rate = width x height x quality
-        
+                element of vList, with getFramesOutputPath set
         """
-        # compute compression bit rate
-        compressBitRate = width * height * quality
-
-        print(f'{video["bitRate"]/1_000:_.0f} Kbits/s --> {compressBitRate/1_000:_.0f} Kbits/s')
+        getFramesOutputPath = video["getFramesOutputPath"]
+        dedupPath = f'{getFramesOutputPath}_dedup.json'
+        if isfile(dedupPath):
+            with open(dedupPath, encoding="utf-8") as file:
+                duplicates:dict[str, str] = json.load(file)
+            print(f'Duplicate frames : {len(duplicates)}')
+            return duplicates
 
-        video['compressBitRate'] = compressBitRate
-        video['compressBitRateParam'] = (
-            f' -maxrate:v {compressBitRate}'
-            f' -bufsize:v {compressBitRate*2} '
+        processTime = time()
+        frames = sorted(
+            entry.name for entry in scandir(getFramesOutputPath) if entry.is_file()
+        )
+        size = self.DEDUP_HASH_SIZE
+
+        def frameHash(frame:str):
+            path = join(getFramesOutputPath, frame)
+            if self.dedupThreshold == 0:
+                with open(path, "rb") as file:
+                    return hashlib.sha1(file.read()).digest()
+
+            # average hash, jpeg is decoded at reduced size
+            with Image.open(path) as image:
+                image.draft("L", (size, size))
+                pixels = np.asarray(image.convert("L").resize((size, size), Image.BILINEAR), dtype=np.float32)
+            return pixels > pixels.mean()
+
+        def isDuplicate(hash, keptHash) -> bool:
+            if self.dedupThreshold == 0:
+                return hash == keptHash
+            return np.count_nonzero(hash != keptHash) <= self.dedupThreshold
+
+        duplicates:dict[str, str] = {}
+        kept, keptHash = None, None
+        with ThreadPoolExecutor(max_workers=max(1, self.dedupWorkers)) as executor:
+            for frame, hash in zip(frames, executor.map(frameHash, frames)):
+                if kept is not None and isDuplicate(hash, keptHash):
+                    duplicates[frame] = kept
+                else:
+                    kept, keptHash = frame, hash
+
+        # listed before removed, a stopped dedup regenerates frames
+        with open(dedupPath, "w", encoding="utf-8") as file:
+            json.dump(duplicates, file)
+        for frame in duplicates:
+            remove(join(getFramesOutputPath, frame))
+
+        printC(
+            f'Duplicate frames : {len(duplicates)}/{len(frames)}'
+            f' ({len(duplicates)/max(len(frames), 1):.1%})',
+            "blue"
         )
+        processTime = time() - processTime
+        processTime = timedelta(seconds=processTime)
+        print(f"Took : {str(processTime)[:-3]}")
+        return duplicates
 
-        # check if compression needed
-        if round(video["quality"] - quality,1) < self.COMPRESS_TOLERENCE:
-            return False
-        else:
-            return True
+    def _redupFrames(self, outputPath:str, duplicates:dict[str, str]) -> None:
+        """
+        Put back duplicate frames removed by _dedupFrames() in outputPath,
+        as hard links to their kept processed frame, or copies if not supported.
 
+        Parameters:
+            outputPath (str):
+                processed frames folder
 
-    def _serial(func):
+            duplicates ({str: str}):
+                _dedupFrames() returned {duplicate frame name: kept frame name}
         """
-        Decorator performes serial processing\n
-        Append video:videoInfo on [1]th argument
+        for duplicate, kept in duplicates.items():
+            duplicatePath = join(outputPath, duplicate)
+            # linked to an earlier kept frame by a stopped process
+            if isfile(duplicatePath):
+                remove(duplicatePath)
+            self._linkFile(join(outputPath, kept), duplicatePath)
+
+    def _runFrameBatches(self, video:VideoInfo, process:VideoProcess, outputPath:str, batches:list[tuple[int, int, int, int, int, list[int]]]) -> bool:
         """
-        def wrapper(*args, **kwargs):
-            results:list[str] = []
+        Process frames batch by batch, a run of process substep 1 each,
+        on hard linked frames of getFramesOutputPath.\n
+        A batch is journaled in "<outputPath>_manifest.jsonl" once its frames are in outputPath,
+        a stopped process skips journaled batches, without listing outputPath.\n
+        Return True if all processes end correctly.
 
-            # pre append video argument
-            args = list(args)
-            args.insert(1, None)
+        Parameters:
+            video (VideoInfo):
+                element of vList, with getFramesOutputPath set
 
-            # args[0] == self
-            for index, video in enumerate(args[0].vList):
-                args[0].noticeProcessBegin()
-                # show current video
+            process (VideoProcess):
+                upscale or interpolate
+
+            outputPath (str):
+                processed frames folder
+
+            batches ([(int, int, int, int, int, [int])]):
+                first and last input frame, first and last kept output frame,
+                number of output frames of the run,
+                run output index of each kept output frame, None to keep output names
+        """
+        getFramesOutputPath = video["getFramesOutputPath"]
+        outputKey = f'{process.name}OutputPath'
+        manifestPath = f'{outputPath}_manifest.jsonl'
+        batchInputPath = join(getFramesOutputPath, 'batch')
+        batchOutputPath = join(outputPath, 'batch')
+        duplicates:dict[str, str] = video.get("duplicates", {})
+
+        completed = self._readManifest(manifestPath, outputPath)
+        done = len([batch for batch in batches if (batch[2], batch[3]) in completed])
+        if done != 0:
+            print(f'Continue {process.name}, {done}/{len(batches)} batches done')
+
+        result = True
+        for inputFirst, inputLast, outputFirst, outputLast, nbOutput, kept in batches:
+            if (outputFirst, outputLast) in completed:
+                continue
+
+            for folder in [batchInputPath, batchOutputPath]:
+                if isdir(folder):
+                    rmtree(folder)
+                mkdir(folder)
+            nbInput = 0
+            for index in range(inputFirst, inputLast + 1):
+                frame = f'frame{index:08d}.jpg'
+                # not a removed duplicate
+                if isfile(join(getFramesOutputPath, frame)):
+                    self._linkFile(join(getFramesOutputPath, frame), join(batchInputPath, frame))
+                    nbInput += 1
+
+            # batch folders and output frame number for this run only
+            video["getFramesOutputPath"] = batchInputPath
+            video[outputKey] = batchOutputPath
+            if process == VideoProcess.interpolate:
+                interpolateFrame = video["interpolateFrame"]
+                video["interpolateFrame"] = nbOutput
+            command = self._getCommand(video, process.name, substep=1)
+            video["getFramesOutputPath"] = getFramesOutputPath
+            video[outputKey] = outputPath
+            if process == VideoProcess.interpolate:
+                video["interpolateFrame"] = interpolateFrame
+
+            # only duplicates in batch
+            if nbInput != 0:
+                result = command is not None and self._runProc(command, process.value[1])
+                if self.killed or not result:
+                    break
+
+            # batch frames to their place in the whole sequence
+            frames = sorted(listdir(batchOutputPath))
+            if kept is None:
+                for frame in frames:
+                    replace(join(batchOutputPath, frame), join(outputPath, frame))
+            else:
+                for index, batchIndex in enumerate(kept):
+                    if batchIndex < len(frames):
+                        replace(join(batchOutputPath, frames[batchIndex]), join(outputPath, f'frame{outputFirst + index:08d}.jpg'))
+            self._redupFrames(outputPath, {
+                duplicate: kept for duplicate, kept in duplicates.items()
+                if inputFirst <= int(duplicate[5:13]) <= inputLast
+            })
+            self._writeManifest(manifestPath, outputPath, outputFirst, outputLast)
+
+        rmtree(batchInputPath, ignore_errors=True)
+        rmtree(batchOutputPath, ignore_errors=True)
+        return result
+
+    def _frameRangeStat(self, outputPath:str, first:int, last:int) -> tuple[int, int]:
+        """
+        Stat frames first to last of outputPath one by one.\n
+        Return (number of frames, total size)
+        """
+        nbFrames, size = 0, 0
+        for index in range(first, last + 1):
+            try:
+                size += stat(join(outputPath, f'frame{index:08d}.jpg')).st_size
+            except FileNotFoundError:
+                continue
+            nbFrames += 1
+        return nbFrames, size
+
+    def _readManifest(self, manifestPath:str, outputPath:str) -> set[tuple[int, int]]:
+        """
+        Read frame ranges journaled by _writeManifest().\n
+        Lines are written once their frames are, and fsynced, only the last range is checked,
+        dropped if one of its frames is missing or resized, processed again.\n
+        Return {(first frame, last frame)}
+        """
+        completed:set[tuple[int, int]] = set()
+        if not isfile(manifestPath):
+            return completed
+
+        entry = None
+        with open(manifestPath, encoding="utf-8") as file:
+            for line in file:
+                try:
+                    entry = json.loads(line)
+                # last line partially written
+                except json.JSONDecodeError:
+                    continue
+                completed.add((entry["first"], entry["last"]))
+
+        if entry is not None:
+            stats = self._frameRangeStat(outputPath, entry["first"], entry["last"])
+            if stats != (entry["frames"], entry["size"]):
+                completed.discard((entry["first"], entry["last"]))
+        return completed
+
+    def _writeManifest(self, manifestPath:str, outputPath:str, first:int, last:int) -> None:
+        """
+        Journal frames first to last of outputPath as completed,
+        with their number and total size.
+        """
+        nbFrames, size = self._frameRangeStat(outputPath, first, last)
+        with open(manifestPath, "a", encoding="utf-8") as file:
+            file.write(json.dumps({
+                "first": first, "last": last, "frames": nbFrames, "size": size,
+            })+"\n")
+            file.flush()
+            fsync(file.fileno())
+
+    def _linkFile(self, src:str, dst:str) -> None:
+        """
+        Hard link dst to src, copy if links are not supported.
+        """
+        try:
+            link(src, dst)
+        except OSError:
+            copyfile(src, dst)
+
+    def _getSegments(self, video:VideoInfo) -> list[tuple[float, float]]:
+        """
+        Split video into segments starting at keyframes,
+        each at least self.segmentSeconds long except the last one.\n
+        Return list of (start, duration) in second from the video start time, as -ss,
+        None if keyframes can not be read.
+
+        Parameters:
+            video (VideoInfo):
+                element of vList
+        """
+        keyFrames = self.getKeyFrames(video)
+        if keyFrames is None:
+            # packet flags only, no decoding
+            returnCode, ptsTime, _, isKey, _ = self._readPackets(video)
+            if returnCode != 0:
+                return None
+            keyFrames = np.sort(ptsTime[isKey])
+
+        # keyframe timestamps are absolute, -ss is from the start time
+        result = self._runProcPooled(
+            f' ffprobe -v error'
+            f' -i "{video["path"]}"'
+            f' -show_entries format=start_time'
+            f' -of csv=p=0'
+        )
+        try:
+            startTime = float(result["stdout"])
+        except ValueError:
+            startTime = 0.0
+        keyFrames = keyFrames - startTime
+
+        duration = video["duration"].total_seconds()
+        starts = [0.0]
+        for keyFrame in keyFrames:
+            if keyFrame - starts[-1] >= self.segmentSeconds and keyFrame < duration:
+                starts.append(float(keyFrame))
+        ends = starts[1:] + [duration]
+        return [(start, end - start) for start, end in zip(starts, ends)]
+
+    def _processSegments(self, video:VideoInfo, process:VideoProcess) -> bool:
+        """
+        Upscale or interpolate video segment by segment, see _getSegments():
+        get frames, process and encode one segment, remove its frames, then next one.\n
+        Encoded segments are kept in "<name>_<process>_segments" folder,
+        a stopped process resumes at its first unfinished segment.\n
+        Segments are losslessly concatenated with original audio and subtitle at the end.\n
+        Return True if all processes end correctly.
+
+        Parameters:
+            video (VideoInfo):
+                element of vList, with compressBitRateParam,
+                upscaleFactor or interpolateFps set
+        """
+        name = video["name"]
+        segmentFolder = self.path+f'\\{name}_{process.name}_segments'
+        if not isdir(segmentFolder):
+            mkdir(segmentFolder)
+        # not stopped by a previous killProc()
+        self._resetKilled()
+
+        # keep first split, segment files are numbered after it
+        segmentsPath = f'{segmentFolder}\\segments.json'
+        if isfile(segmentsPath):
+            print('Continue segments')
+            with open(segmentsPath, encoding="utf-8") as file:
+                segments = json.load(file)
+        else:
+            segments = self._getSegments(video)
+            if segments is None:
+                printC(f'Can not read keyframes of {name}', "red")
+                return False
+            with open(segmentsPath, "w", encoding="utf-8") as file:
+                json.dump(segments, file)
+        printC(f'{len(segments)} segments of ~{self.segmentSeconds}s', "blue")
+
+        getFramesOutputPath = f'{segmentFolder}\\tmp_frames'
+        processOutputPath = f'{segmentFolder}\\{process.name}_frames'
+        video["getFramesOutputPath"] = getFramesOutputPath
+        video["upscaleOutputPath"] = processOutputPath
+        video["interpolateOutputPath"] = processOutputPath
+
+        # whole video frame numbers, last segment ends on them
+        duration = video["duration"].total_seconds()
+        interpolateFrame = video.get("interpolateFrame", 0)
+        def frameAt(time:float, fps:float, total:int) -> int:
+            if time >= duration:
+                return total
+            return min(total, round(time * fps))
+
+        segmentPaths = []
+        for index, (start, segmentDuration) in enumerate(segments):
+            segmentPath = f'{segmentFolder}\\segment{index:05d}.{video["type"]}'
+            segmentPaths.append(segmentPath)
+
+            # finished before a stop
+            if isfile(segmentPath):
+                continue
+
+            print(f'Segment {index+1}/{len(segments)}')
+
+            # restart unfinished segment from scratch
+            for folder in [getFramesOutputPath, processOutputPath]:
+                if isdir(folder):
+                    rmtree(folder)
+                mkdir(folder)
+
+            # frame numbers from cumulative targets, rounding does not add up over segments
+            end = start + segmentDuration
+            video["segmentStart"] = start
+            video["segmentFrames"] = frameAt(end, video["fps"], video["nbFrames"]) - frameAt(start, video["fps"], video["nbFrames"])
+            command = self._getCommand(video, process.name, substep="segmentFrames")
+            result = self._runProc(command, process.value[0])
+            if self.killed or not result:
+                return False
+
+            if process == VideoProcess.interpolate:
+                video["interpolateFrame"] = (
+                    frameAt(end, video["interpolateFps"], interpolateFrame)
+                    - frameAt(start, video["interpolateFps"], interpolateFrame)
+                )
+                total = video["interpolateFrame"]
+            else:
+                total = len(listdir(getFramesOutputPath))
+
+            # frames watch, progress bars of staged videos would overlap
+            if not self.staging:
+                self._frameWatchStart(processOutputPath, total)
+            command = self._getCommand(video, process.name, substep=1)
+            result = command is not None and self._runProc(command, process.value[1])
+            # frames watch end
+            if not self.staging:
+                self._frameWatchStop()
+            if self.killed or not result:
+                return False
+
+            rmtree(getFramesOutputPath)
+
+            # encode aside, an existing segment is always complete
+            video["segmentOutputPath"] = f'{segmentPath}.tmp.{video["type"]}'
+            command = self._getCommand(video, process.name, substep="segmentEncode")
+            result = self._runProc(command, process.value[2])
+            if self.killed or not result:
+                return False
+            rename(video["segmentOutputPath"], segmentPath)
+
+            rmtree(processOutputPath)
+
+        # concat demuxer list, paths relative to list file
+        segmentListPath = f'{segmentFolder}\\segments.txt'
+        with open(segmentListPath, "w", encoding="utf-8") as file:
+            for segmentPath in segmentPaths:
+                file.write(f"file '{Path(segmentPath).name}'\n")
+        video["segmentListPath"] = segmentListPath
+
+        command = self._getCommand(video, process.name, substep="segmentConcat")
+        result = self._runProc(command, process.value[2])
+        if self.killed or not result:
+            return False
+
+        rmtree(segmentFolder)
+        return True
+
+    def _upscaleStream(self, video:VideoInfo) -> bool:
+        """
+        Upscale video without writing all its frames on disk:\n
+        decoder ffmpeg pipes raw frames, written by batch of self.upscaleBatchSize into a folder,
+        upscaled by self.upscaleTool, then piped into encoder ffmpeg.\n
+        Decoding, upscaling and encoding of consecutive batches overlap,
+        at most 4 batches are on disk.\n
+        Return True if all processes end correctly.
+
+        Parameters:
+            video (VideoInfo):
+                element of vList, with upscaleFactor and compressBitRateParam set
+        """
+        process = VideoProcess.upscale
+        # joined paths, stand-in tools can run it on any system
+        batchFolder = join(self.path, f'{video["name"]}_{process.name}_batches')
+        if isdir(batchFolder):
+            rmtree(batchFolder)
+        mkdir(batchFolder)
+
+        width = video["width"]
+        height = video["height"]
+        frameBytes = width * height * 3
+        # batch index, None at the end
+        upscaleQueue:Queue = Queue(maxsize=1)
+        encodeQueue:Queue = Queue(maxsize=1)
+        results = {"decode": True, "encode": True}
+        # set on upscaler or encoder error
+        stopEvent = Event()
+        # decoder and encoder, staged videos are not stopped with them
+        streamProcs:list[subprocess.Popen] = []
+
+        def stopped() -> bool:
+            return self.killed or stopEvent.is_set()
+
+        def put(queue:Queue, item) -> bool:
+            # give up once stopped, consumer may be gone
+            while not stopped():
+                try:
+                    queue.put(item, timeout=0.5)
+                    return True
+                except Full:
+                    pass
+            return False
+
+        def kill() -> None:
+            for proc in list(streamProcs):
+                try:
+                    parent = psutil.Process(proc.pid)
+                    for child in parent.children(recursive=True):
+                        child.kill()
+                    parent.kill()
+                except psutil.NoSuchProcess:
+                    pass
+
+        def get(queue:Queue):
+            while not stopped():
+                try:
+                    return queue.get(timeout=0.5)
+                except Empty:
+                    pass
+            return None
+
+        def decode() -> None:
+            command = self._getCommand(video, process.name, substep="pipeIn")
+            decoder = subprocess.Popen(
+                command,
+                shell=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+            # keep it visible to killProc()
+            self.procAsync.append(decoder)
+            streamProcs.append(decoder)
+
+            batch = 0
+            while not stopped():
+                inFolder = join(batchFolder, f'{batch}_in')
+                mkdir(inFolder)
+                nbFrames = 0
+                while nbFrames < self.upscaleBatchSize:
+                    frame = decoder.stdout.read(frameBytes)
+                    if len(frame) < frameBytes:
+                        break
+                    nbFrames += 1
+                    Image.frombuffer("RGB", (width, height), frame).save(
+                        join(inFolder, f'frame{nbFrames:08d}.png'),
+                        compress_level=1,
+                    )
+                if nbFrames == 0:
+                    rmtree(inFolder)
+                    break
+                if not put(upscaleQueue, batch):
+                    break
+                batch += 1
+
+            decoder.stdout.close()
+            decoder.wait()
+            self.procAsync.remove(decoder)
+            results["decode"] = decoder.returncode == 0
+            put(upscaleQueue, None)
+
+        def encode() -> None:
+            encoder = None
+            while True:
+                batch = get(encodeQueue)
+                if batch is None:
+                    break
+                outFolder = join(batchFolder, f'{batch}_out')
+                for frameName in sorted(listdir(outFolder)):
+                    with Image.open(join(outFolder, frameName)) as frame:
+                        # encoder size known from first upscaled frame
+                        if encoder is None:
+                            video["pipeWidth"], video["pipeHeight"] = frame.size
+                            encoder = subprocess.Popen(
+                                self._getCommand(video, process.name, substep="pipeOut"),
+                                shell=True,
+                                stdin=subprocess.PIPE,
+                                stdout=subprocess.DEVNULL,
+                                stderr=subprocess.DEVNULL,
+                            )
+                            self.procAsync.append(encoder)
+                            streamProcs.append(encoder)
+                        try:
+                            encoder.stdin.write(frame.convert("RGB").tobytes())
+                        except OSError:
+                            # encoder killed or failed, stop decoder and upscaler
+                            results["encode"] = False
+                            stopEvent.set()
+                            break
+                rmtree(outFolder)
+                if not results["encode"]:
+                    break
+
+            if encoder is not None:
+                try:
+                    encoder.stdin.close()
+                except OSError:
+                    pass
+                encoder.wait()
+                self.procAsync.remove(encoder)
+                results["encode"] = results["encode"] and encoder.returncode == 0
+            else:
+                results["encode"] = False
+            if not results["encode"]:
+                stopEvent.set()
+
+        printC(f'Running process : {process.name} (streaming)', "blue")
+        processTime = time()
+        self._resetKilled()
+        decodeThread = Thread(target=decode)
+        encodeThread = Thread(target=encode)
+        decodeThread.start()
+        encodeThread.start()
+
+        upscaled = True
+        with alive_bar(video["nbFrames"]) as bar:
+            while True:
+                batch = get(upscaleQueue)
+                if batch is None:
+                    break
+
+                # upscale batch folder into its output folder
+                video["getFramesOutputPath"] = join(batchFolder, f'{batch}_in')
+                video["upscaleOutputPath"] = join(batchFolder, f'{batch}_out')
+                mkdir(video["upscaleOutputPath"])
+                command = self._getCommand(video, process.name, substep="batch")
+                if command is None or self._runProcPooled(command)["returnCode"] != 0:
+                    upscaled = False
+                    # stop decoder and encoder
+                    stopEvent.set()
+                    kill()
+                    break
+
+                bar(len(listdir(video["getFramesOutputPath"])))
+                rmtree(video["getFramesOutputPath"])
+                if not put(encodeQueue, batch):
+                    break
+
+            put(encodeQueue, None)
+
+        decodeThread.join()
+        encodeThread.join()
+        rmtree(batchFolder, ignore_errors=True)
+
+        processTime = time() - processTime
+        processTime = timedelta(seconds=processTime)
+        print(f"Took : {str(processTime)[:-3]}")
+
+        if not upscaled:
+            return False
+        return results["decode"] and results["encode"]
+
+    def pre_compress(self, video:VideoInfo, width:int, height:int, quality:float) -> bool:
+        """
+        Compute compressBitRate and compressBitRateParam, to limit video bit rate\n
+        Return True if compression is needed else False
+        
+        Parameters:
+            video (VideoInfo):
+                element of vList
+
+            width (int):
+                video width
+
+            height (int):
+                video height
+
+            quality (float):
+                video bit rate = width x height x quality
+        
+        """
+        # compute compression bit rate
+        compressBitRate = width * height * quality
+
+        print(f'{video["bitRate"]/1_000:_.0f} Kbits/s --> {compressBitRate/1_000:_.0f} Kbits/s')
+
+        video['compressBitRate'] = compressBitRate
+        video['compressBitRateParam'] = (
+            f' -maxrate:v {compressBitRate}'
+            f' -bufsize:v {compressBitRate*2} '
+        )
+
+        # check if compression needed
+        if round(video["quality"] - quality,1) < self.COMPRESS_TOLERENCE:
+            return False
+        else:
+            return True
+
+
+    def _serial(func):
+        """
+        Decorator performes serial processing\n
+        Append video:videoInfo on [1]th argument
+        """
+        def wrapper(*args, **kwargs):
+            results:list[str] = []
+
+            # pre append video argument
+            args = list(args)
+            args.insert(1, None)
+
+            # args[0] == self
+            for index, video in enumerate(args[0].vList):
+                args[0].noticeProcessBegin()
+                # show current video
                 print(f'{index+1}/{len(args[0].vList)}'.center(20, '-'))
                 print(video["name"])
 
@@ -1049,6 +3170,8 @@ class VideoScripy():
                 args[1] = video
                 result = func(*args, **kwargs)
                 results.append(result)
+                # process parameters are not kept in catalog
+                video.clearScratch()
                 if result == "stop":
                     break
 
@@ -1058,21 +3181,174 @@ class VideoScripy():
             # complete results if stopped
             if len(results) < len(args[0].vList):
                 results += ["x"]*(len(args[0].vList)-len(results))
-            # complete results to multiple of 5
-            if len(results)%5 != 0:
-                results += [" "]*(5-len(results)%5)
-            # show SUMMARY
-            if len(results) != 0:
-                print("SUMMARY :", end='')
-                for index, result in enumerate(results):
-                    if index%5 == 0:
-                        print("\n"+"-"*36)
-                        print("|", end='')
-                    print(result.center(6,' ')+"|", end='')
-                print("\n"+"-"*36)
+            args[0]._printSummary(results)
                 
         return wrapper
 
+    def _parallel(workers:str):
+        """
+        Decorator performes parallel processing,
+        at most self.<workers> videos processed at once\n
+        Append video:videoInfo on [1]th argument
+
+        Parameters:
+            workers (str):
+                name of the attribute giving the concurrency limit
+        """
+        def decorator(func):
+            def wrapper(*args, **kwargs):
+                self:VideoScripy = args[0]
+                vList = self.vList
+                # not started videos stay "x" if stopped
+                results:list[str] = ["x"]*len(vList)
+
+                def run(index:int, video:VideoInfo) -> None:
+                    # do not start new video once killProc() called
+                    if self.killed:
+                        return
+                    # show started video
+                    print(f'{index+1}/{len(vList)}'.center(20, '-'))
+                    print(video["name"])
+
+                    results[index] = func(self, video, *args[1:], **kwargs)
+                    # process parameters are not kept in catalog
+                    video.clearScratch()
+
+                self.killed = False
+                self.noticeProcessBegin()
+                processTime = time()
+                with ThreadPoolExecutor(max_workers=max(1, getattr(self, workers))) as executor:
+                    # list() to raise worker exception
+                    list(executor.map(run, range(len(vList)), vList))
+                processTime = time() - processTime
+
+                self.noticeProcessEnd()
+                self.removeEmptyFolder()
+                self._printSummary(results)
+
+                # show throughput
+                processed = len([result for result in results if result != "x"])
+                printC(
+                    f'{processed} files in {str(timedelta(seconds=processTime))[:-3]}'
+                    f' ({processed/max(processTime, 1e-3):.2f} files/s)',
+                    "blue"
+                )
+
+            return wrapper
+        return decorator
+
+    def _printSummary(self, results:list[str]) -> None:
+        """
+        Print SUMMARY table of process results, 5 per row.
+
+        Parameters:
+            results ([str]):
+                process result of each video
+        """
+        # complete results to multiple of 5
+        if len(results)%5 != 0:
+            results = results + [" "]*(5-len(results)%5)
+        # show SUMMARY
+        if len(results) != 0:
+            print("SUMMARY :", end='')
+            for index, result in enumerate(results):
+                if index%5 == 0:
+                    print("\n"+"-"*36)
+                    print("|", end='')
+                print(result.center(6,' ')+"|", end='')
+            print("\n"+"-"*36)
+
+    def _runStages(self, stages:list, *args) -> None:
+        """
+        Staged processing, each video runs stages one after another,
+        different videos run different stages at once,
+        at most self.stageDepths[i] videos in stage i
+        and as many waiting for it, a stage waits when next one is full.\n
+        Videos get frames while previous ones are upscaled or interpolated,
+        and encoded, whole time gets close to the slowest stage alone.\n
+        Print SUMMARY as _serial() does.
+
+        Parameters:
+            stages ([function]):
+                first stage gets video and args, next ones video only,
+                each returns None to continue, else "end", "err", "skip" or "stop"
+
+            args:
+                process parameters
+        """
+        vList = self.vList
+        depths = [max(1, depth) for depth in self.stageDepths]
+        # not started videos stay "x" if stopped
+        results:list[str] = ["x"]*len(vList)
+        # video index queue of each stage, None to end a stage worker
+        queues = [Queue()] + [Queue(maxsize=depth) for depth in depths[1:]]
+
+        def work(stage:int) -> None:
+            while True:
+                index = queues[stage].get()
+                if index is None:
+                    return
+                # let next videos pass through once killProc() called
+                if self.killed:
+                    continue
+
+                video = vList[index]
+                # single print, stages print at once
+                print(
+                    f'{index+1}/{len(vList)} {stages[stage].__name__}'.center(40, '-')
+                    + f'\n{video["name"]}'
+                )
+                try:
+                    if stage == 0:
+                        result = stages[stage](video, *args)
+                    else:
+                        result = stages[stage](video)
+                except Exception as e:
+                    printC(f'{video["name"]} : {e}', "red")
+                    result = "err"
+
+                if result is None and stage+1 < len(stages):
+                    queues[stage+1].put(index)
+                else:
+                    results[index] = result
+                    # process parameters are not kept in catalog
+                    video.clearScratch()
+
+        self.killed = False
+        self.staging = True
+        self.noticeProcessBegin()
+        processTime = time()
+        workers = [
+            [Thread(target=work, args=(stage,)) for _ in range(depths[stage])]
+            for stage in range(len(stages))
+        ]
+        for stageWorkers in workers:
+            for worker in stageWorkers:
+                worker.start()
+
+        for index in range(len(vList)):
+            queues[0].put(index)
+        # end a stage once previous one ended
+        for stage, stageWorkers in enumerate(workers):
+            for _ in stageWorkers:
+                queues[stage].put(None)
+            for worker in stageWorkers:
+                worker.join()
+        self.staging = False
+        processTime = time() - processTime
+
+        self.noticeProcessEnd()
+        self.removeEmptyFolder()
+        self._printSummary(results)
+
+        # show throughput
+        processed = len([result for result in results if result != "x"])
+        printC(
+            f'{processed} files in {str(timedelta(seconds=processTime))[:-3]}'
+            f' ({processed/max(processTime, 1e-3):.2f} files/s)',
+            "blue"
+        )
+
     @_serial
     def compress(self, video:VideoInfo, quality:float=3.0) -> str:
         """
@@ -1227,12 +3503,51 @@ class VideoScripy():
             quality (float):
                 video bit rate = width x height x quality
         """
+        result = self._upscaleGetFrames(video, upscaleFactor, quality)
+        if result is not None:
+            return result
+
+        result = self._upscaleFrames(video)
+        if result is not None:
+            return result
+
+        return self._upscaleEncode(video)
+
+    def upscaleStaged(self, upscaleFactor:int=2, quality:float=3) -> None:
+        """
+        Same as upscale(), but get frames, upscale and encode
+        of different videos overlap, see _runStages(),
+        serial if self.upscaleStreaming or self.segmentSeconds
+
+        Parameters:
+            upscaleFactor (int):
+                2, 3 or 4
+            
+            quality (float):
+                video bit rate = width x height x quality
+        """
+        # streaming and segments run all steps in first stage, nothing to overlap,
+        # up to stageDepths[0] upscalers would run at once
+        if self.upscaleStreaming or self.segmentSeconds:
+            printC('Streaming or segment upscale is not staged, run serially', "yellow")
+            self.upscale(upscaleFactor, quality)
+            return
+
+        self._runStages(
+            [self._upscaleGetFrames, self._upscaleFrames, self._upscaleEncode],
+            upscaleFactor, quality,
+        )
+
+    def _upscaleGetFrames(self, video:VideoInfo, upscaleFactor:int, quality:float) -> str:
+        """
+        First stage of upscale(), pre compress then transform video to frames\n
+        Return None to continue, else "end", "err", "skip" or "stop"
+        """
 
         process = VideoProcess.upscale
         # create output folder
         outputFolder = self.path+f'\\{process.name}'
-        if not isdir(outputFolder):
-            mkdir(outputFolder)
+        makedirs(outputFolder, exist_ok=True)
             
         # skip not video or picture type
         if video["type"] not in self.vType + self.pType:
@@ -1257,7 +3572,7 @@ class VideoScripy():
         
         if video["type"] in self.pType:
             command = (
-                f' realesrgan-ncnn-vulkan.exe'
+                f' {self.upscaleTool}'
                 f' -i "{video["path"]}"'
                 f' -o "{process.name}\\{name}"'
                 f' -n realesr-animevideov3 -s {upscaleFactor}'
@@ -1278,6 +3593,25 @@ class VideoScripy():
 
 
         self.pre_compress(video, widthUpscale, heightUpscale, quality)
+        video["upscaleFactor"] = upscaleFactor
+
+        # frames only on disk by batch or by segment
+        if self.upscaleStreaming or self.segmentSeconds:
+            if self.upscaleStreaming:
+                result = self._upscaleStream(video)
+            else:
+                result = self._processSegments(video, process)
+
+            # stop whole process if killProc() called
+            if self.killed:
+                return "stop"
+            
+            # skip next steps if process not correctly ended
+            if not result:
+                return "err"
+
+            self.removeEmptyFolder(outputFolder)
+            return "end"
 
         getFramesOutputPath = self.path+f'\\{name}_tmp_frames'
         video["getFramesOutputPath"] = getFramesOutputPath
@@ -1292,48 +3626,47 @@ class VideoScripy():
         if not result:
             return "err"
 
-        upscaleOutputPath = self.path+f'\\{name}_{process.name}x{upscaleFactor}_frames'
-        # new upscaling
-        if not isdir(upscaleOutputPath):
-            print(f'New upscaling')
-            mkdir(upscaleOutputPath)
-        # continue upscaling
-        else:
-            print(f'Continue upscaling')
-            for _, _, files in walk(upscaleOutputPath):
+        # upscale each duplicate frame once
+        if self.upscaleDedup:
+            video["duplicates"] = self._dedupFrames(video)
 
-                # create processed folder
-                processedFolder = f'{getFramesOutputPath}\\processed'
-                if not isdir(processedFolder):
-                    mkdir(processedFolder)
+        return None
 
-                # move frame to processed folder except last two
-                for framesUpscaled in files[:-2]:
-                    try:
-                        rename(
-                            f'{getFramesOutputPath}\\{framesUpscaled}',
-                            f'{processedFolder}\\{framesUpscaled}',
-                        )
-                    # do nothing to already moved
-                    except FileNotFoundError:
-                        pass
+    def _upscaleFrames(self, video:VideoInfo) -> str:
+        """
+        Second stage of upscale(), upscale frames by journaled batch\n
+        Return None to continue, else "err" or "stop"
+        """
 
-                # remove last two upscaled frames
-                for lastTwoUpscaled in files[-2:]:
-                    remove(upscaleOutputPath+'\\'+lastTwoUpscaled)
+        process = VideoProcess.upscale
+        name = video['name']
+        nbFrames = video["nbFrames"]
+        getFramesOutputPath = video["getFramesOutputPath"]
 
-                break
+        upscaleOutputPath = self.path+f'\\{name}_{process.name}x{video["upscaleFactor"]}_frames'
+        makedirs(upscaleOutputPath, exist_ok=True)
+        video["upscaleOutputPath"] = upscaleOutputPath
+        duplicates:dict[str, str] = video.get("duplicates", {})
+
+        # upscaled frames keep their name
+        size = max(1, self.frameBatchSize)
+        batches = [
+            (first, last, first, last, last - first + 1, None)
+            for first in range(1, nbFrames + 1, size)
+            for last in [min(first + size - 1, nbFrames)]
+        ]
 
-        # frames watch
-        self._frameWatchStart(upscaleOutputPath, video["nbFrames"])
+        # frames watch, progress bars of staged videos would overlap
+        if not self.staging:
+            self._frameWatchStart(upscaleOutputPath, nbFrames)
 
-        video["upscaleOutputPath"] = upscaleOutputPath
-        video["upscaleFactor"] = upscaleFactor
-        command = self._getCommand(video, process.name, substep=1)
-        result = self._runProc(command, process.value[1])
+        processTime = time()
+        result = self._runFrameBatches(video, process, upscaleOutputPath, batches)
+        processTime = time() - processTime
         
         # frames watch end
-        self._frameWatchStop()
+        if not self.staging:
+            self._frameWatchStop()
 
         # stop whole process if killProc() called
         if self.killed:
@@ -1345,6 +3678,26 @@ class VideoScripy():
 
         # remove frames
         rmtree(getFramesOutputPath)
+
+        if duplicates:
+            remove(f'{getFramesOutputPath}_dedup.json')
+            # upscaling time per upscaled frame
+            saved = processTime * len(duplicates) / max(nbFrames - len(duplicates), 1)
+            printC(
+                f'{len(duplicates)}/{nbFrames} duplicate frames not upscaled'
+                f' ({len(duplicates)/max(nbFrames, 1):.1%}),'
+                f' about {str(timedelta(seconds=saved))[:-3]} saved',
+                "blue"
+            )
+        return None
+
+    def _upscaleEncode(self, video:VideoInfo) -> str:
+        """
+        Last stage of upscale(), upscaled frames to video\n
+        Return "end", "err" or "stop"
+        """
+
+        process = VideoProcess.upscale
         
         # upscaled frames to video
         command = self._getCommand(video, process.name, substep=2)
@@ -1359,9 +3712,13 @@ class VideoScripy():
             return "err"
         
         # remove upscaled frames
-        rmtree(upscaleOutputPath)
+        rmtree(video["upscaleOutputPath"])
+        # not written if no batch ran
+        manifestPath = f'{video["upscaleOutputPath"]}_manifest.jsonl'
+        if isfile(manifestPath):
+            remove(manifestPath)
 
-        self.removeEmptyFolder(outputFolder)
+        self.removeEmptyFolder(self.path+f'\\{process.name}')
         return "end"
 
     @_serial
@@ -1377,12 +3734,50 @@ class VideoScripy():
             quality (float):
                 video bit rate = width x height x quality
         """
+        result = self._interpolateGetFrames(video, fpsInterp, quality)
+        if result is not None:
+            return result
+
+        result = self._interpolateFrames(video)
+        if result is not None:
+            return result
+
+        return self._interpolateEncode(video)
+
+    def interpolateStaged(self, fpsInterp:float=30.0, quality:float=3) -> None:
+        """
+        Same as interpolate(), but get frames, interpolate and encode
+        of different videos overlap, see _runStages(),
+        serial if self.segmentSeconds
+
+        Parameters:
+            fps (float):
+                must > than original fps
+
+            quality (float):
+                video bit rate = width x height x quality
+        """
+        # segments run all steps in first stage, see upscaleStaged()
+        if self.segmentSeconds:
+            printC('Segment interpolate is not staged, run serially', "yellow")
+            self.interpolate(fpsInterp, quality)
+            return
+
+        self._runStages(
+            [self._interpolateGetFrames, self._interpolateFrames, self._interpolateEncode],
+            fpsInterp, quality,
+        )
+
+    def _interpolateGetFrames(self, video:VideoInfo, fpsInterp:float, quality:float) -> str:
+        """
+        First stage of interpolate(), pre compress then transform video to frames\n
+        Return None to continue, else "end", "err", "skip" or "stop"
+        """
         
         process = VideoProcess.interpolate
         # create output folder
         outputFolder = self.path+f'\\{process.name}'
-        if not isdir(outputFolder):
-            mkdir(outputFolder)
+        makedirs(outputFolder, exist_ok=True)
             
         # skip not video type
         if video["type"] not in self.vType:
@@ -1408,10 +3803,25 @@ class VideoScripy():
         print(f'{fps}fps --> {fpsInterp}fps')
 
         self.pre_compress(video, width, height, quality)
+        video['interpolateFps'] = fpsInterp
+
+        # frames only on disk by segment
+        if self.segmentSeconds:
+            result = self._processSegments(video, process)
+
+            # stop whole process if killProc() called
+            if self.killed:
+                return "stop"
+            
+            # skip next steps if process not correctly ended
+            if not result:
+                return "err"
+
+            self.removeEmptyFolder(outputFolder)
+            return "end"
         
         getFramesOutputPath = self.path+'\\{}_tmp_frames'.format(name)
         video["getFramesOutputPath"] = getFramesOutputPath
-        video['interpolateFps'] = fpsInterp
         result = self._getFrames(video, process)
 
         # stop whole process if killProc() called
@@ -1422,24 +3832,34 @@ class VideoScripy():
         if not result:
             return "err"
 
+        return None
+
+    def _interpolateFrames(self, video:VideoInfo) -> str:
+        """
+        Second stage of interpolate(), interpolate frames by journaled batch\n
+        Return None to continue, else "err" or "stop"
+        """
+
+        process = VideoProcess.interpolate
+        name = video['name']
+        nbFrames = video["nbFrames"]
+        interpolateFrame = video["interpolateFrame"]
+
         interpolateOutputPath = self.path+f'\\{name}_{process.name}_frames'
+        makedirs(interpolateOutputPath, exist_ok=True)
         video["interpolateOutputPath"] = interpolateOutputPath
 
-        # empty interpolate frames folder
-        if isdir(interpolateOutputPath):
-            rmtree(interpolateOutputPath)
-
-        # new frames interpolate
-        mkdir(interpolateOutputPath)
+        batches = self._interpolateBatches(nbFrames, interpolateFrame)
 
-        # frames watch
-        self._frameWatchStart(interpolateOutputPath,interpolateFrame)
+        # frames watch, progress bars of staged videos would overlap
+        if not self.staging:
+            self._frameWatchStart(interpolateOutputPath, interpolateFrame)
         
-        command = self._getCommand(video, process.name, substep=1)
-        result = self._runProc(command, process.value[1])
+        result = self._runFrameBatches(video, process, interpolateOutputPath, batches)
         
         # frame watch end
-        self._frameWatchStop()
+        if not self.staging:
+            self._frameWatchStop()
 
         # stop whole process if killProc() called
         if self.killed:
@@ -1450,7 +3870,60 @@ class VideoScripy():
             return "err"
 
         # remove frames
-        rmtree(getFramesOutputPath)
+        rmtree(video["getFramesOutputPath"])
+        return None
+
+    def _interpolateBatches(self, nbFrames:int, interpolateFrame:int) -> list[tuple[int, int, int, int, int, list[int]]]:
+        """
+        Split interpolation into runs of about self.frameBatchSize input frames,
+        each with self.INTERPOLATE_OVERLAP more input frames past its last kept output.\n
+        Output frame k of the whole sequence is at input frame k x nbFrames / interpolateFrame,
+        output j of a run of n input frames and m output frames at its first one + j x n / m.
+        m is rounded up, so each kept output is the run output nearest to its time,
+        at most half an output frame away.\n
+        Return batches of _runFrameBatches()
+
+        Parameters:
+            nbFrames (int):
+                number of input frames
+
+            interpolateFrame (int):
+                number of output frames
+        """
+        if nbFrames <= 0 or interpolateFrame <= 0:
+            return []
+
+        batches = []
+        size = max(1, self.frameBatchSize * interpolateFrame // nbFrames)
+        for outputFirst in range(0, interpolateFrame, size):
+            outputLast = min(outputFirst + size, interpolateFrame) - 1
+            # input frames around kept outputs, 0 based
+            inputFirst = outputFirst * nbFrames // interpolateFrame
+            inputLast = min(
+                nbFrames - 1,
+                -(-outputLast * nbFrames // interpolateFrame) + self.INTERPOLATE_OVERLAP,
+            )
+            nbInput = inputLast - inputFirst + 1
+            nbOutput = ceil(nbInput * interpolateFrame / nbFrames)
+            # nearest run output : round((k x nbFrames / interpolateFrame - inputFirst) x nbOutput / nbInput)
+            kept = [
+                min(
+                    nbOutput - 1,
+                    (2 * (k * nbFrames - inputFirst * interpolateFrame) * nbOutput + interpolateFrame * nbInput)
+                    // (2 * interpolateFrame * nbInput),
+                )
+                for k in range(outputFirst, outputLast + 1)
+            ]
+            batches.append((inputFirst + 1, inputLast + 1, outputFirst + 1, outputLast + 1, nbOutput, kept))
+        return batches
+
+    def _interpolateEncode(self, video:VideoInfo) -> str:
+        """
+        Last stage of interpolate(), interpolated frames to video\n
+        Return "end", "err" or "stop"
+        """
+
+        process = VideoProcess.interpolate
 
         # interpolate frames to video
         command = self._getCommand(video, process.name, substep=2)
@@ -1465,15 +3938,20 @@ class VideoScripy():
             return "err"
 
         # remove interpolated frames
-        rmtree(interpolateOutputPath)
+        rmtree(video["interpolateOutputPath"])
+        # not written if no batch ran
+        manifestPath = f'{video["interpolateOutputPath"]}_manifest.jsonl'
+        if isfile(manifestPath):
+            remove(manifestPath)
 
-        self.removeEmptyFolder(outputFolder)
+        self.removeEmptyFolder(self.path+f'\\{process.name}')
         return "end"
 
-    @_serial
-    def preview(self, video:VideoInfo, gridWidth:int=3, gridHeight:int=2) -> str:
+    @_parallel("previewWorkers")
+    def preview(self, video:VideoInfo, gridWidth:int=3, gridHeight:int=2, keyFrameOnly:bool=False) -> str:
         """
-        Generate a grid of images\n
+        Generate a grid of images, seeked and tiled by a single ffmpeg,
+        at most self.previewWorkers videos at once\n
         Return "end", "err", "skip" or "stop"
 
         Parameters:
@@ -1482,13 +3960,17 @@ class VideoScripy():
 
             gridHeight (int):
                 number of row
+
+            keyFrameOnly (bool):
+                faster but less accurate, show nearest keyframe of each timestamp,
+                only keyframes are decoded
         """
 
         process = VideoProcess.preview.name
         # create output folder
         outputFolder = self.path+f'\\{process}'
-        if not isdir(outputFolder):
-            mkdir(outputFolder)
+        # shared by parallel videos
+        makedirs(outputFolder, exist_ok=True)
 
         gridNb = gridWidth*gridHeight
             
@@ -1498,8 +3980,7 @@ class VideoScripy():
             return "skip"
 
         duration = video['duration'].total_seconds()
-        width = video['width']
-        height = video['height']
+        width, height = self._getPreviewTileSize(video, gridWidth, gridHeight)
 
         outputName = video['name'].replace(f".{video['type']}",".png")
         
@@ -1510,7 +3991,8 @@ class VideoScripy():
             chopTime = 0.233 * duration/(gridNb-1)
         else:
             chopTime = 0.233 * duration
-            
+
+        imgTimes = []
         for imgNb in range(gridNb):
             
             if imgNb == 0:
@@ -1519,54 +4001,547 @@ class VideoScripy():
                 imgTime = duration - chopTime
             else:
                 imgTime = chopTime + imgNb*(duration-2*chopTime)/(gridNb-1)
+            imgTimes.append(imgTime)
+
+        seekParam = ''
+        if keyFrameOnly:
+            # snap to nearest known keyframe, else seek lands on previous one
+            keyFrames = self.getKeyFrames(video)
+            if keyFrames is not None and keyFrames.size > 0:
+                right = np.clip(np.searchsorted(keyFrames, imgTimes), 1, keyFrames.size - 1)
+                left = right - 1
+                if keyFrames.size == 1:
+                    left = right = np.zeros(len(imgTimes), dtype=np.int64)
+                nearest = np.where(
+                    np.abs(keyFrames[left] - imgTimes) <= np.abs(keyFrames[right] - imgTimes),
+                    left, right
+                )
+                imgTimes = [max(0.0, float(keyFrame)) for keyFrame in keyFrames[nearest]]
+            seekParam = ' -skip_frame nokey -noaccurate_seek'
+
+        outputPath = f"{self.path}\\{process}\\{outputName}"
 
+        # one ffmpeg seeking each input, first frame of each are tiled
+        inputs = ''.join(
+            f'{seekParam} -ss {imgTime} -i "{video["path"]}"'
+            for imgTime in imgTimes
+        )
+        filters = ''.join(
+            f'[{imgNb}:v:0]trim=end_frame=1,setpts=PTS-STARTPTS,'
+            f'scale={width}:{height},setsar=1[v{imgNb}];'
+            for imgNb in range(gridNb)
+        )
+        filters += (
+            ''.join(f'[v{imgNb}]' for imgNb in range(gridNb))
+            + f'concat=n={gridNb}:v=1:a=0,tile={gridWidth}x{gridHeight}'
+        )
+        command = (
+            f' ffmpeg'
+            f'{inputs}'
+            f' -filter_complex "{filters}"'
+            f' -frames:v 1'
+            f' -update 1'
+            f' -y'
+            f' "{outputPath}"'
+        )
+
+        # cmd.exe can not run longer command, eg: big grid of long path
+        if len(command) > self.CMD_LENGTH_LIMIT:
+            result = self._previewPerImage(video, imgTimes, gridWidth, gridHeight, outputPath, seekParam)
+        else:
+            result = self._runProcPooled(command)["returnCode"] == 0
+        
+        # stop whole process if killProc() called
+        if self.killed:
+            return "stop"
+
+        if not result:
+            printC(f'Preview error at {video["name"]}', "red")
+            return "err"
+
+        processTime = time() - processTime
+        processTime = timedelta(seconds=processTime)
+        print(f"{video['name']} took :{str(processTime)[:-3]}")
+
+        # empty output folder removed once all videos done
+        return "end"
+
+    def _getPreviewTileSize(self, video:VideoInfo, gridWidth:int, gridHeight:int) -> tuple[int, int]:
+        """
+        Return (width, height) of preview() tiles,
+        downscaled so the grid fits in self.previewMaxSize, even for encoders.
+
+        Parameters:
+            video (VideoInfo):
+                element of vList
+
+            gridWidth (int):
+                number of column
+
+            gridHeight (int):
+                number of row
+        """
+        width = video['width']
+        height = video['height']
+        if self.previewMaxSize is None:
+            return width, height
+
+        ratio = self.previewMaxSize / max(width*gridWidth, height*gridHeight, 1)
+        if ratio >= 1:
+            return width, height
+        return max(2, int(width*ratio)//2*2), max(2, int(height*ratio)//2*2)
+
+    def _previewPerImage(self, video:VideoInfo, imgTimes:list[float], gridWidth:int, gridHeight:int, outputPath:str, seekParam:str='') -> bool:
+        """
+        Fallback of preview(), one ffmpeg per image into temporary png,
+        pasted by PIL and written one row of images at a time.\n
+        Return False if an image is missing.
+
+        Parameters:
+            video (VideoInfo):
+                element of vList
+
+            imgTimes ([float]):
+                timestamp of each image in second
+
+            gridWidth (int):
+                number of column
+
+            gridHeight (int):
+                number of row
+
+            outputPath (str):
+                grid image path
+
+            seekParam (str):
+                ffmpeg input parameters before -ss
+        """
+        process = VideoProcess.preview.name
+        width, height = self._getPreviewTileSize(video, gridWidth, gridHeight)
+
+        # temporary png are named after video, other videos run at once
+        imTempPaths = [
+            f"{self.path}\\{process}\\{video['name']}.{imgNb}.png"
+            for imgNb in range(len(imgTimes))
+        ]
+        for imgNb, imgTime in enumerate(imgTimes):
             command = (
                 f' ffmpeg'
+                f'{seekParam}'
                 f' -ss {imgTime}'
                 f' -i "{video["path"]}"'
+                f' -vf scale={width}:{height},setsar=1'
+                # keep a keyframe seeked before -ss, as the tiled preview
+                f' -fps_mode passthrough'
                 f' -frames:v 1'
                 f' -y'
-                f' "{self.path}\\{process}\\{imgNb}.png"'
+                f' "{imTempPaths[imgNb]}"'
             )
-            self._runProcAsync(command)
-        self._runProcAsyncWait()
+            self._runProcPooled(command)
         
-        # stop whole process if killProc() called
         if self.killed:
-            return "stop"
+            for imTempPath in imTempPaths:
+                if isfile(imTempPath):
+                    remove(imTempPath)
+            return False
 
-        newImageWidth = width*gridWidth
-        newImageHeight = height*gridHeight
-        newImage = Image.new('RGB', (newImageWidth,newImageHeight))
+        if not all(isfile(imTempPath) for imTempPath in imTempPaths):
+            for imTempPath in imTempPaths:
+                if isfile(imTempPath):
+                    remove(imTempPath)
+            return False
 
-        imgNb = 0
-        for ghCount in range(gridHeight):
-            for gwCount in range(gridWidth):
-                imTempPath = f"{self.path}\\{process}\\{imgNb}.png"
-                imgNb += 1
-                imTemp = Image.open(imTempPath)
-                newImage.paste(imTemp, (gwCount*width, ghCount*height))
+        def rows():
+            # one row of downscaled tiles in memory at once
+            for ghCount in range(gridHeight):
+                rowImage = Image.new('RGB', (width*gridWidth, height))
+                for gwCount in range(gridWidth):
+                    imTempPath = imTempPaths[ghCount*gridWidth + gwCount]
+                    with Image.open(imTempPath) as imTemp:
+                        if imTemp.size != (width, height):
+                            imTemp = imTemp.resize((width, height))
+                        rowImage.paste(imTemp, (gwCount*width, 0))
+                    remove(imTempPath)
+                yield rowImage.tobytes()
+
+        self._writePngRows(outputPath, width*gridWidth, height*gridHeight, rows())
+        return True
 
-        newImage.save(f"{self.path}\\{process}\\{outputName}")
+    def _writePngRows(self, outputPath:str, width:int, height:int, rows) -> None:
+        """
+        Write a RGB png from rows of pixels, compressed as they come,
+        the whole image is never in memory.
 
-        for imgNb in range(gridNb):
-            imTempPath = f"{self.path}\\{process}\\{imgNb}.png"
-            imgNb += 1
-            remove(imTempPath)
+        Parameters:
+            outputPath (str):
+                png path
 
-        processTime = time() - processTime
-        processTime = timedelta(seconds=processTime)
-        print(f"Took :{str(processTime)[:-3]}")
+            width (int):
+                image width
 
-        self.removeEmptyFolder(outputFolder)
-        return "end"
+            height (int):
+                image height
 
-    @_serial
-    def frame(self, video:VideoInfo) -> str:
+            rows (iterable of bytes):
+                RGB pixels of consecutive image rows, each a whole number of lines
+        """
+        def chunk(file, chunkType:bytes, data:bytes) -> None:
+            file.write(struct.pack(">I", len(data)))
+            file.write(chunkType + data)
+            file.write(struct.pack(">I", zlib.crc32(chunkType + data)))
+
+        lineSize = width*3
+        compressor = zlib.compressobj()
+        with open(outputPath, "wb") as file:
+            file.write(b'\x89PNG\r\n\x1a\n')
+            # 8 bit RGB, not interlaced
+            chunk(file, b'IHDR', struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+            for row in rows:
+                # each line starts with filter type none
+                data = b''.join(
+                    b'\x00' + row[start:start+lineSize]
+                    for start in range(0, len(row), lineSize)
+                )
+                compressed = compressor.compress(data)
+                if compressed:
+                    chunk(file, b'IDAT', compressed)
+            chunk(file, b'IDAT', compressor.flush())
+            chunk(file, b'IEND', b'')
+
+    def hasFrameInfo(self, video:VideoInfo) -> bool:
+        """
+        Return True if video's frame() results are set or in self.frameCache.
+
+        Parameters:
+            video (VideoInfo):
+                element of vList
+        """
+        if all(key in video for key in self.FRAME_CACHE_KEYS):
+            return True
+        if self.frameCache is None:
+            return False
+        fileStat = self._getFileStat(video)
+        return fileStat is not None and self.frameCache.has(video["path"], *fileStat)
+
+    def loadFrameInfo(self, video:VideoInfo) -> bool:
+        """
+        Set video's frame() results from self.frameCache.\n
+        Return False if not cached or file changed since cached.
+
+        Parameters:
+            video (VideoInfo):
+                element of vList
+        """
+        if self.frameCache is None:
+            return False
+        fileStat = self._getFileStat(video)
+        if fileStat is None:
+            return False
+
+        arrays = self.frameCache.get(video["path"], *fileStat)
+        if arrays is None:
+            return False
+
+        frameInfo = {key: {} for key in self.FRAME_CACHE_KEYS}
+        for name, array in arrays.items():
+            key, field = name.split(".", 1)
+            if key in frameInfo:
+                frameInfo[key][field] = array
+        # cached by an older version, missing results
+        if any(not fields for fields in frameInfo.values()):
+            return False
+
+        for key, fields in frameInfo.items():
+            video[key] = fields
+        self._setFrameStats(video)
+        # whole file result
+        if "frameEstimate" in video:
+            del video["frameEstimate"]
+        return True
+
+    def getKeyFrames(self, video:VideoInfo) -> np.ndarray:
+        """
+        Return video's keyframe timestamps in second from frame() results,
+        read from self.frameCache if not set or sampled.\n
+        Return None if frame() never run on whole video.
+
+        Parameters:
+            video (VideoInfo):
+                element of vList
+        """
+        # sampled frame() only has keyframes of its windows
+        if "frameGop" in video and "frameEstimate" not in video:
+            return video["frameGop"]["pts_time"]
+        if self.frameCache is None:
+            return None
+        fileStat = self._getFileStat(video)
+        if fileStat is None:
+            return None
+
+        # do not load whole packet arrays
+        arrays = self.frameCache.get(video["path"], *fileStat, prefix="frameGop.")
+        if not arrays or "frameGop.pts_time" not in arrays:
+            return None
+        return arrays["frameGop.pts_time"]
+
+    def _setFrameStats(self, video:VideoInfo) -> None:
+        """
+        Set video's frameStats from its frameBytePerPacket:
+        peak bit rate over each self.FRAME_PEAK_WINDOWS sliding window,
+        packet size at each self.FRAME_PERCENTILES.
+
+        Parameters:
+            video (VideoInfo):
+                element of vList, with frameBytePerPacket sorted by pts_time
+        """
+        ptsTime = video["frameBytePerPacket"]["pts_time"]
+        size = video["frameBytePerPacket"]["size"]
+        stats:dict[str, int] = {}
+
+        # bytes of packets in [pts_time, pts_time + window) starting at each packet
+        cumul = np.concatenate(([0], np.cumsum(size, dtype=np.int64)))
+        for window in self.FRAME_PEAK_WINDOWS:
+            end = np.searchsorted(ptsTime, ptsTime + window, side="left")
+            peak = (cumul[end] - cumul[:-1]).max() if size.size > 0 else 0
+            stats[f"peak{window}s"] = int(peak * 8 / window)
+
+        percentiles = (
+            np.percentile(size, self.FRAME_PERCENTILES)
+            if size.size > 0 else [0]*len(self.FRAME_PERCENTILES)
+        )
+        for percent, percentile in zip(self.FRAME_PERCENTILES, percentiles):
+            stats[f"p{percent}"] = int(percentile)
+
+        video["frameStats"] = stats
+
+    def _setFrameEstimate(self, video:VideoInfo, bounds:list[tuple[float, float]], duration:float) -> None:
         """
-        Get bitrate of each video frame,\n
-        results are stored in frameBytePerPacket and frameBytePerSecond\n
+        Set video's frameEstimate from a sampled frame(), with 95% confidence bounds:\n
+        bitRate and bitRateError, mean of windows' bit rate, corrected for finite duration\n
+        pXXLow and pXXHigh, packet size percentile order statistic bounds\n
+        frameStats peaks are lower bounds, not sampled parts may be higher
+
+        Parameters:
+            video (VideoInfo):
+                element of vList, with frameBytePerPacket sorted by pts_time
+
+            bounds ([(float, float)]):
+                sampled windows [start, end) in second
+
+            duration (float):
+                video duration in second
+        """
+        ptsTime = video["frameBytePerPacket"]["pts_time"]
+        size = video["frameBytePerPacket"]["size"]
+
+        # bit rate of each window
+        cumul = np.concatenate(([0], np.cumsum(size, dtype=np.int64)))
+        starts = np.array([bound[0] for bound in bounds])
+        ends = np.array([bound[1] for bound in bounds])
+        windowBytes = (
+            cumul[np.searchsorted(ptsTime, ends, side="left")]
+            - cumul[np.searchsorted(ptsTime, starts, side="left")]
+        )
+        windowBitRates = windowBytes * 8 / (ends - starts)
+
+        readRatio = min(1.0, float((ends - starts).sum() / duration)) if duration > 0 else 1.0
+        if len(bounds) > 1:
+            standardError = (
+                windowBitRates.std(ddof=1) / np.sqrt(len(bounds)) * np.sqrt(1 - readRatio)
+            )
+        else:
+            standardError = float("nan")
+        estimate:dict[str, float] = {
+            "windows": len(bounds),
+            "readRatio": readRatio,
+            "bitRate": float(windowBitRates.mean()),
+            "bitRateError": float(1.96 * standardError),
+        }
+
+        # distribution free bounds, rank of percentile +/- 1.96 sigma
+        sortedSize = np.sort(size)
+        nbPackets = sortedSize.size
+        for percent in self.FRAME_PERCENTILES:
+            ratio = percent / 100
+            rank = nbPackets * ratio
+            spread = 1.96 * np.sqrt(nbPackets * ratio * (1 - ratio))
+            if nbPackets > 0:
+                low = sortedSize[int(np.clip(np.floor(rank - spread), 0, nbPackets - 1))]
+                high = sortedSize[int(np.clip(np.ceil(rank + spread), 0, nbPackets - 1))]
+            else:
+                low = high = 0
+            estimate[f"p{percent}Low"] = float(low)
+            estimate[f"p{percent}High"] = float(high)
+
+        video["frameEstimate"] = estimate
+
+    def exportFrameStats(self, csvPath:str=None) -> str:
+        """
+        Write frameStats of vList's analysed videos into a csv file,
+        peak in bit/s, percentiles in byte, with sampled frame() estimate if any.\n
+        Return csv file path, None if no video analysed.
+
+        Parameters:
+            csvPath (str):
+                output file, None to write "frameStats.csv" in self.path
+        """
+        videos = [video for video in self.vList if "frameStats" in video]
+        if videos == []:
+            printC('No frame result to export', "yellow")
+            return None
+
+        if csvPath is None:
+            csvPath = self.path+'\\frameStats.csv'
+
+        statNames = list(videos[0]["frameStats"].keys())
+        with open(csvPath, "w", newline="", encoding="utf-8") as file:
+            writer = csv.writer(file)
+            writer.writerow(["name", "bitRate", *statNames, "estimatedBitRate", "estimatedBitRateError"])
+            for video in videos:
+                # empty if whole file scanned
+                frameEstimate = video.get("frameEstimate", {})
+                writer.writerow([
+                    video["name"],
+                    video["bitRate"],
+                    *[video["frameStats"][name] for name in statNames],
+                    frameEstimate.get("bitRate", ""),
+                    frameEstimate.get("bitRateError", ""),
+                ])
+
+        printC(f'Frame stats exported : {csvPath}', "green")
+        return csvPath
+
+    def _saveFrameInfo(self, video:VideoInfo) -> None:
+        """
+        Write video's frame() results into self.frameCache.
+
+        Parameters:
+            video (VideoInfo):
+                element of vList
+        """
+        if self.frameCache is None:
+            return
+        fileStat = self._getFileStat(video)
+        if fileStat is None:
+            return
+
+        arrays = {}
+        for key in self.FRAME_CACHE_KEYS:
+            for field, array in video[key].items():
+                arrays[f"{key}.{field}"] = array
+        self.frameCache.set(video["path"], *fileStat, arrays)
+
+    def _readPackets(self, video:VideoInfo, start:float=None, end:float=None, margin:float=5.0) -> tuple[int, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Read video packets whose picture timestamp is in [start, end) with ffprobe.\n
+        Return (return code, pts_time, size, is keyframe, size per second),
+        the first three arrays have one element per packet, not sorted,
+        size per second is indexed by second from 0.
+
+        Parameters:
+            video (VideoInfo):
+                element of vList
+
+            start (float):
+                window start in second, None to read from the beginning
+
+            end (float):
+                window end in second, None to read till the end
+
+            margin (float):
+                read seconds past end, to get packets decoded after end but shown before
+        """
+        duration = video["duration"].total_seconds()
+
+        # run probe, csv lines are "pts_time,size,flags"
+        command = (
+            f' ffprobe'
+            f' -i "{video["path"]}"'
+            f' -select_streams v:0'
+            f' -show_entries packet=pts_time,size,flags'
+            f' -of csv=p=0'
+        )
+        # read past end, packets are in decoding order
+        if start is not None or end is not None:
+            command += (
+                f' -read_intervals'
+                f' {"" if start is None else start}%{"" if end is None else end + margin}'
+            )
+        capacityRatio = (
+            ((end or duration) - (start or 0)) / duration if duration > 0 else 1
+        )
+
+        # packet arrays grow by doubling, start from frame count
+        capacity = max(1024, int(video.get("nbFrames", 0) * capacityRatio * 1.05))
+        ptsTime = np.empty(capacity, dtype=np.float64)
+        size = np.empty(capacity, dtype=np.int32)
+        isKey = np.empty(capacity, dtype=np.bool_)
+        sizePerSecond = np.zeros(max(1, ceil(end or duration)), dtype=np.int64)
+        nbPackets = 0
+
+        def onChunk(fields:np.ndarray) -> None:
+            nonlocal ptsTime, size, isKey, sizePerSecond, nbPackets
+
+            # convert str to value, drop packet without timestamp
+            chunkPtsTime = np.char.replace(fields[:, 0], b"N/A", b"nan").astype(np.float64)
+            chunkSize = fields[:, 1].astype(np.int32)
+            # flags are "K__" for keyframe
+            chunkIsKey = np.char.startswith(fields[:, 2], b"K")
+            # keep packet in [start, end) window only
+            hasPts = np.isfinite(chunkPtsTime)
+            if start is not None:
+                hasPts &= chunkPtsTime >= start
+            if end is not None:
+                hasPts &= chunkPtsTime < end
+            if not hasPts.all():
+                chunkPtsTime = chunkPtsTime[hasPts]
+                chunkSize = chunkSize[hasPts]
+                chunkIsKey = chunkIsKey[hasPts]
+
+            # grow packet arrays
+            last = nbPackets + chunkPtsTime.size
+            if last > ptsTime.size:
+                capacity = max(last, ptsTime.size * 2)
+                ptsTime = np.resize(ptsTime, capacity)
+                size = np.resize(size, capacity)
+                isKey = np.resize(isKey, capacity)
+            ptsTime[nbPackets:last] = chunkPtsTime
+            size[nbPackets:last] = chunkSize
+            isKey[nbPackets:last] = chunkIsKey
+            nbPackets = last
+
+            # per packet to per second, packet counted in the second it starts
+            second = np.floor(np.maximum(chunkPtsTime, 0)).astype(np.int64)
+            chunkPerSecond = np.bincount(second, weights=chunkSize).astype(np.int64)
+            if chunkPerSecond.size > sizePerSecond.size:
+                sizePerSecond = np.concatenate((
+                    sizePerSecond,
+                    np.zeros(chunkPerSecond.size - sizePerSecond.size, dtype=np.int64),
+                ))
+            sizePerSecond[:chunkPerSecond.size] += chunkPerSecond
+
+        returnCode = self._runProcCsv(command, 3, onChunk)
+        return returnCode, ptsTime[:nbPackets], size[:nbPackets], isKey[:nbPackets], sizePerSecond
+
+    @_parallel("frameWorkers")
+    def frame(self, video:VideoInfo, windows:int=1, sample:int=0) -> str:
+        """
+        Get bitrate of each video frame and keyframes,
+        at most self.frameWorkers videos scanned at once,\n
+        results are stored in frameBytePerPacket, frameBytePerSecond and frameGop as numpy arrays,
+        with peak bit rate and percentiles in frameStats\n
         Return "end", "err", "skip" or "stop"
+
+        Parameters:
+            windows (int):
+                split a long video into time windows scanned with -read_intervals,
+                at most self.probeWorkers at once,
+                each window at least self.FRAME_WINDOW_MIN seconds
+
+            sample (int):
+                quick estimate, only scan this number of short windows spread over the video,
+                self.frameSampleRatio of the duration in total,
+                error bounds are stored in frameEstimate, 0 to scan the whole video
         """
 
         # skip not video type
@@ -1576,107 +4551,117 @@ class VideoScripy():
         
         processTime = time()
 
+        # already analysed and file unchanged
+        if self.loadFrameInfo(video):
+            printC(f'{video["name"]} loaded from frame cache', "green")
+            return "end"
+
         # print(video["duration"], "x", video["fps"])
         # print(
         #     "=>", video["duration"].total_seconds()*video["fps"],
         #     "=", video["nbFrames"]
         # )
 
-        # run probe
-        command = (
-            f' ffprobe'
-            f' -i "{video["path"]}"'
-            f' -select_streams v:0'
-            f' -show_entries packet=pts_time,size'
-            f' -of json'
-        )
-        printC(f'Running process : frame', "blue")
-        self._runProcAsync(command)
+        duration = video["duration"].total_seconds()
+        if sample > 0:
+            # one window centered in each of sample equal parts of the duration
+            windowLength = duration * min(1, self.frameSampleRatio) / sample
+            windows = sample
+            bounds = [
+                (
+                    (index + 0.5) * duration / sample - windowLength / 2,
+                    (index + 0.5) * duration / sample + windowLength / 2,
+                )
+                for index in range(sample)
+            ]
+            margin = min(5.0, windowLength)
+        else:
+            # split duration into windows, first and last are open ended
+            windows = max(1, min(windows, int(duration // self.FRAME_WINDOW_MIN)))
+            bounds = [
+                (duration * index / windows, duration * (index + 1) / windows)
+                for index in range(windows)
+            ]
+            bounds[0] = (None, bounds[0][1])
+            bounds[-1] = (bounds[-1][0], None)
+            margin = 5.0
 
-        # wait and retrieve results
-        result = self._runProcAsyncWait()[0]
+        printC(f'Running process : frame', "blue")
+        # at most self.probeWorkers ffprobe per video, frameWorkers videos run at once
+        with ThreadPoolExecutor(max_workers=max(1, min(windows, self.probeWorkers))) as executor:
+            results = list(executor.map(
+                lambda bound: self._readPackets(video, *bound, margin=margin),
+                bounds
+            ))
 
         # stop whole process if killProc() called
         if self.killed:
             return "stop"
         
         # skip next steps if process not correctly ended
-        if result['returnCode'] != 0:
+        if any(returnCode != 0 for returnCode, *_ in results):
             printC(f'FFprobe error at {video["name"]}', "red")
             return "err"
-        
-        # convert stdout to json format
-        result = (
-            json.loads(result['stdout'].decode('utf-8'))
-        )
 
-        # get info
-        packet_data = result["packets"]
-        
-        # convert str to value
-        for p_d in packet_data:
-            p_d["pts_time"] = float(p_d["pts_time"])
-            p_d["size"] = int(p_d["size"])
-
-        # sort by picture timestamp
-        packet_data = sorted(packet_data, key=lambda x : x["pts_time"])
-        
-        # check sort
-        pts_time_prev = float('-inf')
-        for p_d in packet_data:
-            if p_d["pts_time"] - pts_time_prev < 0:
-                printC(
-                    f'wrong'
-                    f'{p_d["pts_time"]} {pts_time_prev}'
-                    f'{p_d["pts_time"] - pts_time_prev}'
-                    f'{p_d["pts_time"] - pts_time_prev < 0}'
-                    f'{video["name"]}',
-                    "red"
-                )
-                return "err"
-            pts_time_prev = p_d["pts_time"]
-        
-        # per packet to per second
-        second_data = []
-        switch_time = 1
-        size_cumul = 0
-        for p_d in packet_data:
-
-            if p_d["pts_time"] >= switch_time:
-                switch_time += 1
-                second_data.append({
-                    "pts_time": p_d["pts_time"],
-                    "size" : size_cumul
-                })
-                size_cumul = 0
-            else:
-                size_cumul += p_d["size"]
-
-        if size_cumul > 0:
-            second_data.append({
-                "pts_time": p_d["pts_time"],
-                "size" : size_cumul
-            })
-
-        # re-struct data
-        packet_data_new = {}
-        packet_data_new["pts_time"] = [x["pts_time"] for x in packet_data]
-        packet_data_new["size"] = [x["size"] for x in packet_data]
-        second_data_new = {}
-        second_data_new["pts_time"] = [x["pts_time"] for x in second_data]
-        second_data_new["size"] = [x["size"] for x in second_data]
-
-        # float to datetime
-        packet_data_new["pts_time"] = [self.DAY_ZERO + timedelta(seconds=f) for f in packet_data_new["pts_time"]]
-        second_data_new["pts_time"] = [self.DAY_ZERO + timedelta(seconds=f) for f in second_data_new["pts_time"]]
+        # merge windows, they do not overlap
+        ptsTime = np.concatenate([result[1] for result in results])
+        size = np.concatenate([result[2] for result in results])
+        isKey = np.concatenate([result[3] for result in results])
+        sizePerSecond = np.zeros(max(result[4].size for result in results), dtype=np.int64)
+        for *_, windowPerSecond in results:
+            sizePerSecond[:windowPerSecond.size] += windowPerSecond
+        nbPackets = ptsTime.size
+
+        # sort by picture timestamp, if not already monotonic
+        if ptsTime.size > 1 and (np.diff(ptsTime) < 0).any():
+            order = np.argsort(ptsTime, kind="stable")
+            ptsTime = ptsTime[order]
+            size = size[order]
+            isKey = isKey[order]
+
+        # drop trailing empty seconds, timestamped at second end
+        if nbPackets > 0:
+            sizePerSecond = sizePerSecond[:int(max(ptsTime[-1], 0)) + 1]
+        else:
+            sizePerSecond = sizePerSecond[:0]
+        ptsTimePerSecond = np.arange(1, sizePerSecond.size + 1, dtype=np.float64)
+
+        # keep fully sampled seconds only
+        if sample > 0:
+            covered = np.zeros(sizePerSecond.size, dtype=np.bool_)
+            for start, end in bounds:
+                covered[max(0, ceil(start)):max(0, int(end))] = True
+            sizePerSecond = sizePerSecond[covered]
+            ptsTimePerSecond = ptsTimePerSecond[covered]
+
+        # group packets from each keyframe to the next one, in presentation order,
+        # packets before first keyframe are not part of any gop
+        keyIndex = np.flatnonzero(isKey)
+        gop:FrameGop = {
+            "pts_time": ptsTime[keyIndex],
+            "length": np.diff(np.append(keyIndex, nbPackets)).astype(np.int32),
+            "size": (
+                np.add.reduceat(size.astype(np.int64), keyIndex)
+                if keyIndex.size > 0 else np.zeros(0, dtype=np.int64)
+            ),
+        }
 
-        # write info
-        video["frameBytePerPacket"] = packet_data_new
-        video["frameBytePerSecond"] = second_data_new
+        # write info, datetime conversion left to the plot
+        video["frameBytePerPacket"] = {"pts_time": ptsTime, "size": size}
+        video["frameBytePerSecond"] = {"pts_time": ptsTimePerSecond, "size": sizePerSecond}
+        video["frameGop"] = gop
+        self._setFrameStats(video)
+        if sample > 0:
+            # partial result is not cached
+            self._setFrameEstimate(video, bounds, duration)
+        else:
+            if "frameEstimate" in video:
+                del video["frameEstimate"]
+            self._saveFrameInfo(video)
         
         processTime = time() - processTime
         processTime = timedelta(seconds=processTime)
-        print(f"Took : {str(processTime)[:-3]}")
+        print(f"{video['name']} took : {str(processTime)[:-3]}")
 
         return "end"
 
@@ -8,11 +8,12 @@ from threading import Timer
 
 # dependencies
 from dash import Dash, dcc, html
-from dash import no_update, ctx, callback, ALL, MATCH
+from dash import no_update, ctx, callback, ALL, MATCH, Patch
 from dash.dependencies import Input, Output, State
 from dash.exceptions import PreventUpdate
 import dash_bootstrap_components as dbc
 import plotly.graph_objects as go
+import numpy as np
 from tkinter import Tk, filedialog
 
 # own class
@@ -31,12 +32,16 @@ os.environ["PATH"] += os.pathsep.join(addPath)
 IP = "localhost"
 PORT = "8848"
 
-# extend VideoInfo
-class VideoInfo(VideoInfo):
-    selected: bool
-
 vs = VideoScripy()
 allVideoList:list[VideoInfo] = []
+# path of allVideoList, rescan incrementally if unchanged
+scannedPath:str = None
+# videos probed so far by the running scan, None if no scan running
+scanningList:list[VideoInfo] = None
+# number of scanningList items shown, -1 if list_videos not cleared yet
+scanningShown:int = -1
+# generation of the last started scan, client's store_scanToken is the last one shown whole
+scanToken:int = 0
 processes = [p.name for p in VideoProcess]
 videoSizesDict = [
     {"label":"240p/SD", "width":426, "height":240},
@@ -96,6 +101,24 @@ langDict = [
     {"label": "German | deutsch",
      "value": "deu"}, #ger
 ]
+previewSeekDict = [
+    {"label": "ACCURATE",
+     "value": False},
+    {"label": "KEYFRAME (fast)",
+     "value": True},
+]
+stagedDict = [
+    {"label": "SERIAL",
+     "value": False},
+    {"label": "STAGED (overlap)",
+     "value": True},
+]
+frameStatsDict = [
+    {"label": "NO EXPORT",
+     "value": False},
+    {"label": "EXPORT frameStats.csv",
+     "value": True},
+]
 encoderDict = [
     {"label": "H265",
      "value": True},
@@ -133,6 +156,16 @@ app.layout = html.Div(
                 n_intervals=0,
                 disabled=True,
             ),
+            dcc.Interval(
+                id="interval_scan",
+                interval=0.5 * 1000,
+                n_intervals=0,
+                disabled=True,
+            ),
+            dcc.Store(
+                id="store_scanToken",
+                data=0,
+            ),
             dbc.Tooltip(
                 "SCAN atleast once to RUN",
                 id="tooltip_run",
@@ -608,6 +641,58 @@ def interpolateInputUI():
         ),
     ]
 
+def stagedInputUI():
+    return [
+        html.Div(
+            "videos",
+            className="div_text_simple",
+            disable_n_clicks=True,
+        ),
+        dbc.Tooltip(
+            "STAGED gets frames of next videos while upscaling or interpolating, "
+            "frames of several videos are on disk at once",
+            target={"type": "input", "id": "staged"},
+            delay={"show": 500, "hide": 0},
+        ),
+        dcc.Dropdown(
+            stagedDict,
+            value=False,
+            id={"type": "input", "id": "staged"},
+            searchable=False,
+            clearable=False,
+            persistence_type="local",
+            persistence=True,
+            className="dcc_dropdown",
+            style={"width":"180px"},
+        ),
+    ]
+
+def frameInputUI():
+    return [
+        html.Div(
+            "stats",
+            className="div_text_simple",
+            disable_n_clicks=True,
+        ),
+        dbc.Tooltip(
+            "EXPORT writes frameStats.csv of analysed videos "
+            "into the videos folder",
+            target={"type": "input", "id": "exportFrameStats"},
+            delay={"show": 500, "hide": 0},
+        ),
+        dcc.Dropdown(
+            frameStatsDict,
+            value=False,
+            id={"type": "input", "id": "exportFrameStats"},
+            searchable=False,
+            clearable=False,
+            persistence_type="local",
+            persistence=True,
+            className="dcc_dropdown",
+            style={"width":"180px"},
+        ),
+    ]
+
 def previewInputUI():
     return [
         html.Div(
@@ -650,6 +735,28 @@ def previewInputUI():
             ],
             direction="horizontal",
         ),
+        html.Div(
+            "seek",
+            className="div_text_simple",
+            disable_n_clicks=True,
+        ),
+        dbc.Tooltip(
+            "KEYFRAME is much faster on long videos, "
+            "images are taken at nearest keyframe",
+            target={"type": "input", "id": "previewKeyFrame"},
+            delay={"show": 500, "hide": 0},
+        ),
+        dcc.Dropdown(
+            previewSeekDict,
+            value=False,
+            id={"type": "input", "id": "previewKeyFrame"},
+            searchable=False,
+            clearable=False,
+            persistence_type="local",
+            persistence=True,
+            className="dcc_dropdown",
+            style={"width":"180px"},
+        ),
     ]
 
 def getFrameResult() -> list:
@@ -657,7 +764,7 @@ def getFrameResult() -> list:
 
     hasResult = False
     for video in allVideoList:
-        if video["selected"] and "frameBytePerPacket" in video:
+        if video["selected"] and vs.hasFrameInfo(video):
             hasResult = True
             break
     
@@ -666,7 +773,7 @@ def getFrameResult() -> list:
     else:
         results = []
         for index, video in enumerate(allVideoList):
-            if video["selected"] and "frameBytePerPacket" in video:
+            if video["selected"] and vs.hasFrameInfo(video):
                 results.append(
                     html.Button(
                         children=video["name"],
@@ -873,25 +980,26 @@ def update_div_processParamUI(selectedProcess:str):
         processParamUI.extend([
             *upscaleInputUI(),
             *qualityInputUI(),
+            *stagedInputUI(),
         ])
     elif selectedProcess == VideoProcess.interpolate.name:
         processParamUI.extend([
             *interpolateInputUI(),
             *qualityInputUI(),
+            *stagedInputUI(),
         ])
     elif selectedProcess == VideoProcess.preview.name:
         processParamUI.extend([
             *previewInputUI(),
         ])
     elif selectedProcess == VideoProcess.frame.name:
-        processParamUI = [
+        processParamUI.extend([
+            *frameInputUI(),
             html.H6(
                 f"{selectedProcess.capitalize()} results :",
                 disable_n_clicks=True,
                 className="ch_h6_title",
             ),
-        ]
-        processParamUI.extend([
             *frameResultUI(),
         ])
     elif selectedProcess == VideoProcess.stream.name:
@@ -930,6 +1038,12 @@ def update_div_FrameResultUI(clicks):
 
 
 
+def toDatetime(ptsTime:np.ndarray) -> np.ndarray:
+    """
+    Convert picture timestamps in second to datetime64 from vs.DAY_ZERO, for plot axis.
+    """
+    return np.datetime64(vs.DAY_ZERO, "ns") + (ptsTime * 1e9).astype("timedelta64[ns]")
+
 def getFrameModalBody(videoIndex):
     global allVideoList
 
@@ -943,13 +1057,13 @@ def getFrameModalBody(videoIndex):
     fig = go.Figure(
         data=[
             go.Scattergl(
-                x=allVideoList[videoIndex]["frameBytePerPacket"]["pts_time"],
+                x=toDatetime(allVideoList[videoIndex]["frameBytePerPacket"]["pts_time"]),
                 y=allVideoList[videoIndex]["frameBytePerPacket"]["size"],
                 name="Per Packet",
                 **scatterProp,
             ),
             go.Scattergl(
-                x=allVideoList[videoIndex]["frameBytePerSecond"]["pts_time"],
+                x=toDatetime(allVideoList[videoIndex]["frameBytePerSecond"]["pts_time"]),
                 y=allVideoList[videoIndex]["frameBytePerSecond"]["size"],
                 name="Per Second",
                 **scatterProp,
@@ -990,6 +1104,15 @@ def getFrameModalBody(videoIndex):
         line_color="green",
         annotation_text=f'bitrate: {videoBitrate:_.0f} byte/s',
     )
+    # per second series is comparable to 1s window peak only
+    if "peak1s" in allVideoList[videoIndex]["frameStats"]:
+        peakBitrate = allVideoList[videoIndex]["frameStats"]["peak1s"]/8
+        fig.add_hline(
+            y=peakBitrate,
+            line_dash="dash",
+            line_color="red",
+            annotation_text=f'peak 1s: {peakBitrate:_.0f} byte/s',
+        )
     return dcc.Graph(
         id="graph",
         figure=fig,
@@ -1001,6 +1124,28 @@ def getFrameModalBody(videoIndex):
         },
     )
 
+def getFrameModalFooter(videoIndex):
+    global allVideoList
+
+    frameStats = allVideoList[videoIndex]["frameStats"]
+    texts = []
+    for name, value in frameStats.items():
+        # peak in bit/s, percentile in byte
+        if name.startswith("peak"):
+            texts.append(f'{name}: {value/8:_.0f} byte/s')
+        else:
+            texts.append(f'{name}: {value:_.0f} byte')
+
+    # sampled result, peaks are lower bounds
+    if "frameEstimate" in allVideoList[videoIndex]:
+        frameEstimate = allVideoList[videoIndex]["frameEstimate"]
+        texts.append(
+            f'estimated from {frameEstimate["readRatio"]:.1%} : '
+            f'bitrate {frameEstimate["bitRate"]/8:_.0f} '
+            f'± {frameEstimate["bitRateError"]/8:_.0f} byte/s'
+        )
+    return " | ".join(texts)
+
 @callback(
     Output('modal_frame', 'is_open'),
     Output('modal_frame_title', 'children'),
@@ -1016,7 +1161,13 @@ def openFrameModal(n_clicks):
         if click is not None:
             videoIndex = int(ctx.triggered_id["id"].split(" ")[0])
             videoName = allVideoList[videoIndex]["name"]
-            return True, videoName, getFrameModalBody(videoIndex), ""
+            # load analysed before restart
+            if (
+                "frameBytePerPacket" not in allVideoList[videoIndex]
+                and not vs.loadFrameInfo(allVideoList[videoIndex])
+            ):
+                return True, videoName, "Frame result not found, run frame again", ""
+            return True, videoName, getFrameModalBody(videoIndex), getFrameModalFooter(videoIndex)
     
     raise PreventUpdate
 
@@ -1291,15 +1442,55 @@ def getVideoItem(video:VideoInfo, index:int, prefix:str=""):
         overlay_style={"visibility":"visible","opacity":0.5},
     )
 
+def patchVideoItems(diff:ScanDiff) -> Patch:
+    """
+    Apply rescan diff to allVideoList, keeping its order and selection.\n
+    Return the video items patch, only changed and shifted items are regenerated.
+    """
+    global allVideoList
+
+    videoItems = Patch()
+
+    # replace modified in place
+    indexByPath = {video["path"]: index for index, video in enumerate(allVideoList)}
+    for video in diff["modified"]:
+        index = indexByPath[video["path"]]
+        video["selected"] = allVideoList[index]["selected"]
+        allVideoList[index] = video
+        videoItems[index] = getVideoItem(video,index)
+
+    # remove deleted, items after the first removed one get new index
+    removedPaths = {video["path"] for video in diff["removed"]}
+    firstRemoved = len(allVideoList)
+    for index, video in enumerate(allVideoList):
+        if video["path"] in removedPaths:
+            firstRemoved = index
+            break
+    if firstRemoved < len(allVideoList):
+        for _ in range(firstRemoved, len(allVideoList)):
+            del videoItems[firstRemoved]
+        allVideoList = [video for video in allVideoList if video["path"] not in removedPaths]
+        for index in range(firstRemoved, len(allVideoList)):
+            videoItems.append(getVideoItem(allVideoList[index],index))
+
+    # append new
+    for video in diff["added"]:
+        video["selected"] = True
+        allVideoList.append(video)
+        videoItems.append(getVideoItem(video,len(allVideoList)-1))
+
+    return videoItems
+
 @callback(
     Output('button_runProcess', 'disabled', allow_duplicate=True),
     Output('button_scanFiles', 'children', allow_duplicate=True),
     Output('tooltip_run', 'children', allow_duplicate=True),
     Output('list_videos', 'children', allow_duplicate=True),
+    Output('store_scanToken', 'data'),
     Input('button_scanFiles', 'n_clicks'),
     running=[
-        (Output('list_videos', 'children'), None, None),
         (Output('interval_log', 'n_intervals'), 0, 0),
+        (Output('interval_scan', 'disabled'), False, True),
 
         (Output({"type": "spec", "id": "button_refreshStream"}, 'n_clicks'), 0, 0),
         (Output({"type": "spec", "id": "button_refreshFrame"}, 'n_clicks'), 0, 0),
@@ -1309,13 +1500,29 @@ def getVideoItem(video:VideoInfo, index:int, prefix:str=""):
     prevent_initial_call=True,
 )
 def scanFiles(_):
-    global vs, allVideoList
+    global vs, allVideoList, scannedPath, scanningList, scanningShown, scanToken
+
+    # rescan same path, only changed videos are probed and updated
+    if allVideoList != [] and scannedPath == vs.path:
+        diff = vs.rescanVideo(previous=allVideoList)
+        if diff is not None:
+            if diff["added"] == diff["removed"] == diff["modified"] == []:
+                return False, no_update, "Ready to RUN", no_update, no_update
+            return False, no_update, "Ready to RUN", patchVideoItems(diff), no_update
     
+    # show videos while probing, see showScanningVideos()
+    scanToken += 1
     if vs.getVideo():
-        vs.getVideoInfo()
+        scanningShown = -1
+        scanningList = []
+        for video in vs.iterVideoInfo():
+            video["selected"] = True
+            scanningList.append(video)
+        scanningList = None
 
     # record scanned video, for selection and sort purpose
     allVideoList = vs.vList
+    scannedPath = vs.path
 
     # add video select state
     for video in allVideoList:
@@ -1326,7 +1533,39 @@ def scanFiles(_):
     for index, video in enumerate(allVideoList):
         videoItems.append(getVideoItem(video,index))
 
-    return False, no_update, "Ready to RUN", videoItems
+    # whole list shown, later progressive updates of this scan are dropped
+    return False, no_update, "Ready to RUN", videoItems, scanToken
+
+@callback(
+    Output('list_videos', 'children', allow_duplicate=True),
+    Input('interval_scan', 'n_intervals'),
+    State('store_scanToken', 'data'),
+    prevent_initial_call=True,
+)
+def showScanningVideos(_, shownToken):
+    global scanningList, scanningShown
+
+    # skip if no scan running, client has its whole list or nothing new
+    videos = scanningList
+    token = scanToken
+    if videos is None or shownToken == token or scanningShown == len(videos):
+        raise PreventUpdate
+
+    nbShown = len(videos)
+    # first probed videos replace previous list
+    if scanningShown == -1:
+        videoItems = [getVideoItem(video,index) for index, video in enumerate(videos[:nbShown])]
+    # append newly probed videos
+    else:
+        videoItems = Patch()
+        for index in range(scanningShown, nbShown):
+            videoItems.append(getVideoItem(videos[index],index))
+
+    # scan finished or restarted meanwhile, its whole list is already sent
+    if scanningList is not videos or scanToken != token:
+        return no_update
+    scanningShown = nbShown
+    return videoItems
 
 @callback(
     Output({'type':'video', 'index': MATCH}, 'color'),
@@ -1488,11 +1727,7 @@ def sortVideoList(sortBy):
     
     # special sort
     if sortBy == "w x h":
-        for index in range(len(allVideoList)):
-            allVideoList[index]["w x h"] = (
-                allVideoList[index]["width"] * allVideoList[index]["height"]
-            )
-        allVideoList.sort(key= lambda video: video['w x h'],)
+        allVideoList.sort(key= lambda video: video['width'] * video['height'],)
     # normal sort
     else:
         allVideoList.sort(key= lambda video: video[sortBy],)
@@ -1797,6 +2032,12 @@ def runProcess(_, selectedProcess, inputValues):
             previewCol = value["value"]
         elif value["id"]["id"] == "previewRow":
             previewRow = value["value"]
+        elif value["id"]["id"] == "previewKeyFrame":
+            previewKeyFrame = value["value"]
+        elif value["id"]["id"] == "staged":
+            staged = value["value"]
+        elif value["id"]["id"] == "exportFrameStats":
+            exportFrameStats = value["value"]
         # set stream metadata for stream process
         elif len(value["id"]["id"].split(" ")) == 3:
             [vIndex, sIndex, metaData] = value["id"]["id"].split(" ")
@@ -1822,13 +2063,21 @@ def runProcess(_, selectedProcess, inputValues):
     elif selectedProcess == VideoProcess.resize.name:
         vs.resize(videoWidth, videoHeight, videoQuality)
     elif selectedProcess == VideoProcess.upscale.name:
-        vs.upscale(upscaleFactor, videoQuality)
+        if staged:
+            vs.upscaleStaged(upscaleFactor, videoQuality)
+        else:
+            vs.upscale(upscaleFactor, videoQuality)
     elif selectedProcess == VideoProcess.interpolate.name:
-        vs.interpolate(videoFPS, videoQuality)
+        if staged:
+            vs.interpolateStaged(videoFPS, videoQuality)
+        else:
+            vs.interpolate(videoFPS, videoQuality)
     elif selectedProcess == VideoProcess.preview.name:
-        vs.preview(previewCol, previewRow)
+        vs.preview(previewCol, previewRow, previewKeyFrame)
     elif selectedProcess == VideoProcess.frame.name:
         vs.frame()
+        if exportFrameStats:
+            vs.exportFrameStats()
     elif selectedProcess == VideoProcess.stream.name:
         vs.stream()
     else:
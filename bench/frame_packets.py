@@ -0,0 +1,172 @@
+"""
+Time frame() packet analysis on a synthetic long file, former dict path against numpy.\n
+The file is a 10 second 60 fps testsrc clip looped without re-encoding,
+2 hours give 432k packets.
+The former path decodes ffprobe json into one dict per packet,
+sorts and bins them in Python and makes one datetime per packet.
+
+    python bench/frame_packets.py [--hours 2] [--fps 60]
+"""
+import sys
+import subprocess
+from argparse import ArgumentParser
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from datetime import timedelta
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from VideoScripy import VideoScripy, VideoInfo, printC, jsonLoads
+
+
+def makeLongFile(folder:Path, hours:float, fps:int) -> Path:
+    """
+    Encode a 10 second testsrc clip, loop it by stream copy to hours.
+
+    Parameters:
+        folder (Path):
+            output folder
+
+        hours (float):
+            duration
+
+        fps (int):
+            frame rate
+    """
+    short = folder / "short.mp4"
+    subprocess.run(
+        [
+            "ffmpeg", "-v", "error", "-y",
+            "-f", "lavfi", "-i", f'testsrc=duration=10:size=64x36:rate={fps}',
+            "-c:v", "libx264", "-preset", "ultrafast", "-g", str(fps),
+            str(short),
+        ],
+        check=True,
+    )
+    long = folder / "long.mp4"
+    subprocess.run(
+        [
+            "ffmpeg", "-v", "error", "-y",
+            "-stream_loop", str(max(0, round(hours * 360) - 1)), "-i", str(short),
+            "-c", "copy", str(long),
+        ],
+        check=True,
+    )
+    return long
+
+
+def frameDict(vs:VideoScripy, path:Path) -> tuple[float, float, int]:
+    """
+    Former frame() analysis, return (ffprobe seconds, analysis seconds, number of packets).
+
+    Parameters:
+        vs (VideoScripy):
+            DAY_ZERO is read
+
+        path (Path):
+            video file
+    """
+    processTime = perf_counter()
+    result = subprocess.run(
+        [
+            "ffprobe", "-v", "error", "-i", str(path),
+            "-select_streams", "v:0", "-show_entries", "packet=pts_time,size", "-of", "json",
+        ],
+        capture_output=True, check=True,
+    )
+    probeTime = perf_counter() - processTime
+
+    processTime = perf_counter()
+    packet_data = jsonLoads(result.stdout)["packets"]
+
+    # convert str to value
+    for p_d in packet_data:
+        p_d["pts_time"] = float(p_d["pts_time"])
+        p_d["size"] = int(p_d["size"])
+
+    # sort by picture timestamp
+    packet_data = sorted(packet_data, key=lambda x : x["pts_time"])
+
+    # check sort
+    pts_time_prev = float('-inf')
+    for p_d in packet_data:
+        if p_d["pts_time"] - pts_time_prev < 0:
+            raise RuntimeError("packets not sorted")
+        pts_time_prev = p_d["pts_time"]
+
+    # per packet to per second
+    second_data = []
+    switch_time = 1
+    size_cumul = 0
+    for p_d in packet_data:
+        if p_d["pts_time"] >= switch_time:
+            switch_time += 1
+            second_data.append({"pts_time": p_d["pts_time"], "size" : size_cumul})
+            size_cumul = 0
+        else:
+            size_cumul += p_d["size"]
+    if size_cumul > 0:
+        second_data.append({"pts_time": p_d["pts_time"], "size" : size_cumul})
+
+    # re-struct data, float to datetime
+    packet_data_new = {
+        "pts_time": [vs.DAY_ZERO + timedelta(seconds=x["pts_time"]) for x in packet_data],
+        "size": [x["size"] for x in packet_data],
+    }
+    second_data_new = {
+        "pts_time": [vs.DAY_ZERO + timedelta(seconds=x["pts_time"]) for x in second_data],
+        "size": [x["size"] for x in second_data],
+    }
+    analysisTime = perf_counter() - processTime
+
+    return probeTime, analysisTime, len(packet_data_new["size"])
+
+
+def main() -> None:
+    parser = ArgumentParser(description="frame() packet analysis benchmark")
+    parser.add_argument("--hours", type=float, default=2)
+    parser.add_argument("--fps", type=int, default=60)
+    args = parser.parse_args()
+
+    vs = VideoScripy()
+    vs.probeCache = None
+    vs.frameCache = None
+
+    with TemporaryDirectory() as folder:
+        path = makeLongFile(Path(folder), args.hours, args.fps)
+        vs.vList = [VideoInfo(
+            type = "mp4",
+            path = str(path),
+            name = path.name,
+            duration = timedelta(hours=args.hours),
+            nbFrames = int(args.hours * 3600 * args.fps),
+        )]
+
+        # csv ffprobe alone, lower bound of frame()
+        processTime = perf_counter()
+        subprocess.run(
+            [
+                "ffprobe", "-v", "error", "-i", str(path),
+                "-select_streams", "v:0", "-show_entries", "packet=pts_time,size,flags", "-of", "csv=p=0",
+            ],
+            stdout=subprocess.DEVNULL, check=True,
+        )
+        csvTime = perf_counter() - processTime
+
+        probeTime, analysisTime, nbPackets = frameDict(vs, path)
+
+        processTime = perf_counter()
+        vs.frame()
+        frameTime = perf_counter() - processTime
+        video = vs.vList[0]
+        if video["frameBytePerPacket"]["size"].size != nbPackets:
+            printC(f'{video["frameBytePerPacket"]["size"].size} packets against {nbPackets}', "red")
+
+    print()
+    printC(f'{args.hours} h at {args.fps} fps, {nbPackets} packets', "blue")
+    print(f'{"dict":>5} | ffprobe json {probeTime:6.2f} s | analysis {analysisTime:6.2f} s | total {probeTime + analysisTime:6.2f} s')
+    print(f'{"numpy":>5} | ffprobe csv  {csvTime:6.2f} s | frame() streamed, total {frameTime:6.2f} s')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Time frame() on multi-hour files with windows parallel -read_intervals scans.\n
+Files are a 10 second 60 fps testsrc clip looped without re-encoding.
+probeWorkers is set to windows, so all windows of the file run at once.
+Each windowed result is checked against the serial one.
+
+    python bench/frame_windows.py [--hours 1,3] [--windows 1,2,4,8]
+"""
+import sys
+import subprocess
+from argparse import ArgumentParser
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from datetime import timedelta
+from os import cpu_count
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from VideoScripy import VideoScripy, VideoInfo, printC
+
+
+def makeLongFile(folder:Path, hours:float) -> Path:
+    """
+    Encode a 10 second 60 fps testsrc clip, loop it by stream copy to hours.
+
+    Parameters:
+        folder (Path):
+            output folder
+
+        hours (float):
+            duration
+    """
+    short = folder / "short.mp4"
+    if not short.exists():
+        subprocess.run(
+            [
+                "ffmpeg", "-v", "error", "-y",
+                "-f", "lavfi", "-i", "testsrc=duration=10:size=64x36:rate=60",
+                "-c:v", "libx264", "-preset", "ultrafast", "-g", "60",
+                str(short),
+            ],
+            check=True,
+        )
+    long = folder / f'long_{hours}h.mp4'
+    subprocess.run(
+        [
+            "ffmpeg", "-v", "error", "-y",
+            "-stream_loop", str(max(0, round(hours * 360) - 1)), "-i", str(short),
+            "-c", "copy", str(long),
+        ],
+        check=True,
+    )
+    return long
+
+
+def main() -> None:
+    parser = ArgumentParser(description="frame() windows benchmark")
+    parser.add_argument("--hours", default="1,3")
+    parser.add_argument("--windows", default="1,2,4,8")
+    args = parser.parse_args()
+
+    vs = VideoScripy()
+    vs.probeCache = None
+    vs.frameCache = None
+
+    results = []
+    with TemporaryDirectory() as folder:
+        for hours in [float(hours) for hours in args.hours.split(",")]:
+            path = makeLongFile(Path(folder), hours)
+            video = VideoInfo(
+                type = "mp4",
+                path = str(path),
+                name = path.name,
+                duration = timedelta(hours=hours),
+                nbFrames = int(hours * 3600 * 60),
+            )
+            vs.vList = [video]
+
+            serial = None
+            for windows in [int(windows) for windows in args.windows.split(",")]:
+                vs.probeWorkers = windows
+                processTime = perf_counter()
+                vs.frame(windows=windows)
+                processTime = perf_counter() - processTime
+
+                result = {key: video[key] for key in vs.FRAME_CACHE_KEYS}
+                if serial is None:
+                    serial = result
+                same = all(
+                    np.array_equal(result[key][field], serial[key][field])
+                    for key in serial for field in serial[key]
+                )
+                results.append((hours, windows, processTime, video["frameBytePerPacket"]["size"].size, same))
+
+    print()
+    printC(f'{cpu_count()} cores', "blue")
+    serialTime = {}
+    for hours, windows, processTime, nbPackets, same in results:
+        serialTime.setdefault(hours, processTime)
+        print(
+            f'{hours:4} h | {nbPackets:>8} packets | windows {windows:>2} | '
+            f'{processTime:6.2f} s | x{serialTime[hours] / processTime:4.2f} | '
+            f'{"same as serial" if same else "DIFFERS from serial"}'
+        )
+
+
+if __name__ == "__main__":
+    main()
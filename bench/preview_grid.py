@@ -0,0 +1,108 @@
+"""
+Time a 4x4 preview() grid, single ffmpeg select and tile against the former per image path.\n
+The video is a 1080p testsrc clip looped without re-encoding.
+CMD_LENGTH_LIMIT 0 makes preview() fall back to _previewPerImage(),
+one ffmpeg and one temporary png per tile pasted by PIL.
+Both grids are compared pixel by pixel.
+
+    python bench/preview_grid.py [--minutes 20] [--grid 4x4] [--repeat 3]
+"""
+import sys
+import subprocess
+from argparse import ArgumentParser
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from os import cpu_count
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from VideoScripy import VideoScripy, VideoInfo, VideoProcess, printC
+
+
+def makeVideo(folder:Path, minutes:float) -> Path:
+    """
+    Encode a 30 second 1080p testsrc clip, loop it by stream copy to minutes.
+
+    Parameters:
+        folder (Path):
+            output folder
+
+        minutes (float):
+            duration
+    """
+    short = folder / "short.mp4"
+    subprocess.run(
+        [
+            "ffmpeg", "-v", "error", "-y",
+            "-f", "lavfi", "-i", "testsrc2=duration=30:size=1920x1080:rate=30",
+            "-c:v", "libx264", "-preset", "ultrafast", "-g", "250",
+            str(short),
+        ],
+        check=True,
+    )
+    long = folder / "video.mp4"
+    subprocess.run(
+        [
+            "ffmpeg", "-v", "error", "-y",
+            "-stream_loop", str(max(0, round(minutes * 2) - 1)), "-i", str(short),
+            "-c", "copy", str(long),
+        ],
+        check=True,
+    )
+    return long
+
+
+def main() -> None:
+    parser = ArgumentParser(description="preview() grid benchmark")
+    parser.add_argument("--minutes", type=float, default=20)
+    parser.add_argument("--grid", default="4x4")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    gridWidth, gridHeight = [int(size) for size in args.grid.split("x")]
+
+    vs = VideoScripy()
+    vs.probeCache = None
+    vs.frameCache = None
+    cmdLengthLimit = vs.CMD_LENGTH_LIMIT
+
+    results = []
+    with TemporaryDirectory() as folder:
+        path = makeVideo(Path(folder), args.minutes)
+        vs.path = folder
+        vs.vList = [VideoInfo(type="mp4", path=str(path), name=path.name)]
+        vs.getVideoInfo()
+        outputPath = f"{vs.path}\\{VideoProcess.preview.name}\\{path.stem}.png"
+
+        for keyFrameOnly in [False, True]:
+            grids = []
+            for label, limit in [("per image", 0), ("single", cmdLengthLimit)]:
+                vs.CMD_LENGTH_LIMIT = limit
+                times = []
+                for _ in range(args.repeat):
+                    processTime = perf_counter()
+                    vs.preview(gridWidth, gridHeight, keyFrameOnly)
+                    times.append(perf_counter() - processTime)
+                with Image.open(outputPath) as grid:
+                    grids.append(np.asarray(grid.convert("RGB"), dtype=np.int16))
+                results.append((keyFrameOnly, label, min(times), grids[-1].shape))
+
+            perImage, single = grids
+            if perImage.shape == single.shape:
+                results.append((keyFrameOnly, "mean abs diff", float(np.abs(perImage - single).mean()), None))
+            else:
+                printC(f'grid size {single.shape} against {perImage.shape}', "red")
+
+    print()
+    printC(f'{args.grid} grid of a {args.minutes} min 1080p video, best of {args.repeat}, {cpu_count()} cores', "blue")
+    for keyFrameOnly, label, value, shape in results:
+        if shape is None:
+            print(f'keyFrameOnly {keyFrameOnly!s:>5} | {label:>13} | {value:.2f} / 255')
+        else:
+            print(f'keyFrameOnly {keyFrameOnly!s:>5} | {label:>13} | {value:6.2f} s | {shape[1]}x{shape[0]}')
+
+
+if __name__ == "__main__":
+    main()
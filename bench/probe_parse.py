@@ -0,0 +1,135 @@
+"""
+Time ffprobe output decode per file on stream-heavy mkv samples.\n
+Compare the former full -show_format -show_streams document decoded by json
+with the -show_entries PROBE_ENTRIES document decoded by json and orjson,
+then _setVideoInfo() on it. Samples have many audio, subtitle and attachment streams.
+
+    python bench/probe_parse.py [--tracks 8,32,64] [--repeat 200]
+"""
+import sys
+import json
+import subprocess
+from argparse import ArgumentParser
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from VideoScripy import VideoScripy, VideoInfo, printC
+
+try:
+    from orjson import loads as orjsonLoads
+except ImportError:
+    orjsonLoads = None
+
+
+def makeSample(folder:Path, nbTracks:int) -> Path:
+    """
+    Encode a 2 second mkv with one video stream and nbTracks audio,
+    subtitle and attachment streams each.
+
+    Parameters:
+        folder (Path):
+            output folder
+
+        nbTracks (int):
+            number of audio, subtitle and attachment streams
+    """
+    subtitle = folder / "subtitle.srt"
+    subtitle.write_text("1\n00:00:00,000 --> 00:00:01,000\nsubtitle\n")
+    attachment = folder / "attachment.txt"
+    attachment.write_text("attachment\n" * 64)
+
+    command = [
+        "ffmpeg", "-v", "error", "-y",
+        "-f", "lavfi", "-i", "testsrc=duration=2:size=320x240:rate=30",
+        "-f", "lavfi", "-i", "sine=duration=2",
+        "-i", str(subtitle),
+        "-map", "0:v",
+    ]
+    for index in range(nbTracks):
+        command += [
+            "-map", "1:a", "-map", "2:s",
+            f'-metadata:s:a:{index}', f'language=a{index:02d}',
+            f'-metadata:s:a:{index}', f'handler_name=audio track {index}',
+            f'-metadata:s:s:{index}', f'language=s{index:02d}',
+        ]
+    for index in range(nbTracks):
+        command += [
+            "-attach", str(attachment),
+            f'-metadata:s:t:{index}', "mimetype=text/plain",
+            f'-metadata:s:t:{index}', f'filename=attachment_{index}.txt',
+        ]
+    sample = folder / f'sample_{nbTracks}.mkv'
+    command += ["-c:v", "libx264", "-preset", "ultrafast", "-c:a", "aac", "-c:s", "srt", str(sample)]
+    subprocess.run(command, check=True)
+    return sample
+
+
+def timePerCall(function, repeat:int) -> float:
+    """
+    Return mean seconds of function() over repeat calls.
+
+    Parameters:
+        function (callable):
+            without argument
+
+        repeat (int):
+            number of calls
+    """
+    processTime = perf_counter()
+    for _ in range(repeat):
+        function()
+    return (perf_counter() - processTime) / repeat
+
+
+def main() -> None:
+    parser = ArgumentParser(description="ffprobe output decode benchmark")
+    parser.add_argument("--tracks", default="8,32,64")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    vs = VideoScripy()
+    vs.probeCache = None
+
+    results = []
+    with TemporaryDirectory() as folder:
+        for nbTracks in [int(nbTracks) for nbTracks in args.tracks.split(",")]:
+            sample = makeSample(Path(folder), nbTracks)
+
+            full = subprocess.run(
+                ["ffprobe", "-v", "error", "-i", str(sample), "-show_format", "-show_streams", "-of", "json"],
+                capture_output=True, check=True,
+            ).stdout
+            entries = subprocess.run(
+                ["ffprobe", "-v", "error", "-i", str(sample), "-show_entries", vs.PROBE_ENTRIES, "-of", "json=compact=1"],
+                capture_output=True, check=True,
+            ).stdout
+
+            rows = [
+                ("full json", len(full), timePerCall(lambda: json.loads(full), args.repeat)),
+                ("entries json", len(entries), timePerCall(lambda: json.loads(entries), args.repeat)),
+            ]
+            if orjsonLoads is not None:
+                rows.append(("entries orjson", len(entries), timePerCall(lambda: orjsonLoads(entries), args.repeat)))
+            else:
+                printC("orjson not installed, skipped", "yellow")
+
+            # info set from the reduced document
+            probe = json.loads(entries)
+            def setVideoInfo():
+                if not vs._setVideoInfo(VideoInfo(type="mkv", path=str(sample), name=sample.name), probe):
+                    raise RuntimeError(f'_setVideoInfo() failed on {sample.name}')
+            rows.append(("_setVideoInfo", len(entries), timePerCall(setVideoInfo, args.repeat)))
+
+            results.append((nbTracks, len(probe["streams"]), rows))
+
+    print()
+    for nbTracks, nbStreams, rows in results:
+        printC(f'{nbTracks} tracks of each kind, {nbStreams} streams', "blue")
+        for label, size, processTime in rows:
+            print(f'{label:>14} | {size:>7} bytes | {processTime * 1e6:8.1f} us/file')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Time getVideoInfo() on a few hundred synthetic clips at different probeWorkers.\n
+Clips are ffmpeg testsrc copies, alternately mp4 and mkv.
+"unbounded" starts one ffprobe per clip at once, as getVideoInfo() used to.
+
+    python bench/probe_pool.py [--clips 300] [--sizes 1,2,4,8,16]
+"""
+import sys
+import subprocess
+from argparse import ArgumentParser
+from pathlib import Path
+from shutil import copyfile
+from tempfile import TemporaryDirectory
+from time import time
+from datetime import timedelta
+from os import cpu_count
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from VideoScripy import VideoScripy, VideoInfo, printC
+
+
+def makeClips(folder:Path, nbClips:int) -> list[Path]:
+    """
+    Encode one 2 second testsrc clip per container, copy them nbClips times.
+
+    Parameters:
+        folder (Path):
+            output folder
+
+        nbClips (int):
+            number of clips
+    """
+    sources = []
+    for fileFormat in ["mp4", "mkv"]:
+        source = folder / f'source.{fileFormat}'
+        subprocess.run(
+            [
+                "ffmpeg", "-v", "error", "-y",
+                "-f", "lavfi", "-i", "testsrc=duration=2:size=640x360:rate=30",
+                "-f", "lavfi", "-i", "sine=duration=2",
+                "-c:v", "libx264", "-preset", "ultrafast", "-c:a", "aac",
+                str(source),
+            ],
+            check=True,
+        )
+        sources.append(source)
+
+    clips = []
+    for index in range(nbClips):
+        source = sources[index % 2]
+        clip = folder / f'clip_{index:04d}{source.suffix}'
+        copyfile(source, clip)
+        clips.append(clip)
+    return clips
+
+
+def run(vs:VideoScripy, clips:list[Path], backend:str, workers:int) -> float:
+    """
+    Probe all clips, return elapsed seconds.
+
+    Parameters:
+        vs (VideoScripy):
+            without cache
+
+        clips ([Path]):
+            clip paths
+
+        backend (str):
+            "ffprobe" or "native"
+
+        workers (int):
+            probeWorkers
+    """
+    vs.vList = [
+        VideoInfo(type=clip.suffix[1:], path=str(clip), name=clip.name)
+        for clip in clips
+    ]
+    vs.probeBackend = backend
+    vs.probeWorkers = workers
+
+    processTime = time()
+    vs.getVideoInfo()
+    processTime = time() - processTime
+
+    if len(vs.vList) != len(clips):
+        printC(f'{len(clips) - len(vs.vList)} clips not probed', "red")
+    return processTime
+
+
+def main() -> None:
+    parser = ArgumentParser(description="getVideoInfo() probe pool benchmark")
+    parser.add_argument("--clips", type=int, default=300)
+    parser.add_argument("--sizes", default="1,2,4,8,16")
+    args = parser.parse_args()
+
+    vs = VideoScripy()
+    vs.probeCache = None
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    rows = [("ffprobe", size, str(size)) for size in sizes]
+    rows.append(("ffprobe", args.clips, "unbounded"))
+    rows.append(("native", cpu_count() or 1, str(cpu_count() or 1)))
+
+    with TemporaryDirectory() as folder:
+        clips = makeClips(Path(folder), args.clips)
+
+        results = []
+        for backend, workers, label in rows:
+            processTime = run(vs, clips, backend, workers)
+            results.append((backend, label, processTime))
+
+    print()
+    printC(f'{args.clips} clips, {cpu_count()} cores', "blue")
+    for backend, label, processTime in results:
+        print(
+            f'{backend:>8} | workers {label:>9} | '
+            f'{str(timedelta(seconds=processTime))[:-3]} | '
+            f'{args.clips / processTime:8.1f} files/s'
+        )
+
+
+if __name__ == "__main__":
+    main()
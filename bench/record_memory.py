@@ -0,0 +1,124 @@
+"""
+Measure memory of 100k vList records with tracemalloc, plain dict against VideoInfo.\n
+Each record has the probed catalog fields and 3 streams.
+"after job" records also got the scratch fields a compress run sets,
+kept by a dict, removed by VideoInfo.clearScratch().
+Field values are built before measuring, only the records are counted.
+
+    python bench/record_memory.py [--records 100000]
+"""
+import sys
+import tracemalloc
+from argparse import ArgumentParser
+from pathlib import Path
+from datetime import timedelta
+from time import perf_counter
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from VideoScripy import VideoInfo, StreamInfo, printC
+
+
+def makeValues(nbRecords:int) -> list[tuple]:
+    """
+    Return per record distinct path, name and duration.
+
+    Parameters:
+        nbRecords (int):
+            number of records
+    """
+    return [
+        (
+            f'D:\\videos\\{index // 1000:03d}\\clip_{index:06d}.mp4',
+            f'{index // 1000:03d}__clip_{index:06d}.mp4',
+            timedelta(seconds=60 + index % 3600),
+        )
+        for index in range(nbRecords)
+    ]
+
+
+def makeRecords(values:list[tuple], record:type, stream:type, afterJob:bool) -> list:
+    """
+    Return one record per values element.
+
+    Parameters:
+        values ([tuple]):
+            makeValues() output
+
+        record (type):
+            dict or VideoInfo
+
+        stream (type):
+            dict or StreamInfo
+
+        afterJob (bool):
+            set then clear scratch fields
+    """
+    records = []
+    for path, name, duration in values:
+        video = record(
+            type = "mp4",
+            path = path,
+            name = name,
+            duration = duration,
+            bitRate = 8_000_000,
+            quality = 0.5,
+            width = 1920,
+            height = 1080,
+            fps = 29.97,
+            nbFrames = 1798,
+            streams = [
+                stream(index=0, codec_type="video", codec_name="h264", selected=True, language="und", title=""),
+                stream(index=1, codec_type="audio", codec_name="aac", selected=True, language="eng", title=""),
+                stream(index=2, codec_type="subtitle", codec_name="mov_text", selected=True, language="eng", title=""),
+            ],
+            fileSize = 120_000_000,
+            modifiedTime = 1_700_000_000_000_000_000,
+        )
+        if afterJob:
+            video["compressBitRateParam"] = "-b:v 4000000"
+            video["w x h"] = "1920x1080"
+            video["getFramesOutputPath"] = path + "_frames"
+            if isinstance(video, VideoInfo):
+                video.clearScratch()
+        records.append(video)
+    return records
+
+
+def main() -> None:
+    parser = ArgumentParser(description="vList record memory benchmark")
+    parser.add_argument("--records", type=int, default=100_000)
+    args = parser.parse_args()
+
+    values = makeValues(args.records)
+
+    results = []
+    for label, record, stream, afterJob in [
+        ("dict", dict, dict, False),
+        ("VideoInfo", VideoInfo, StreamInfo, False),
+        ("dict after job", dict, dict, True),
+        ("VideoInfo after job", VideoInfo, StreamInfo, True),
+    ]:
+        # build time without tracemalloc overhead
+        processTime = perf_counter()
+        records = makeRecords(values, record, stream, afterJob)
+        processTime = perf_counter() - processTime
+        del records
+
+        tracemalloc.start()
+        records = makeRecords(values, record, stream, afterJob)
+        size, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del records
+        results.append((label, size, peak, processTime))
+
+    print()
+    printC(f'{args.records} records', "blue")
+    for label, size, peak, processTime in results:
+        print(
+            f'{label:>19} | {size / 2**20:7.1f} MiB | peak {peak / 2**20:7.1f} MiB | '
+            f'{size / args.records:6.0f} bytes/record | build {processTime:.2f} s'
+        )
+
+
+if __name__ == "__main__":
+    main()
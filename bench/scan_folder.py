@@ -0,0 +1,148 @@
+"""
+Time getVideo() against the former os.walk() scan on a generated tree of 100k files.\n
+The tree is 10 x 10 x 10 folders of 100 empty files, mp4, mkv, png and txt,
+10 x 10 middle folders hold 100 more files each, so a depth 2 scan finds some,
+and each top folder has a self generated "upscale" folder.
+
+    python bench/scan_folder.py [--files 100000] [--workers 1,4,16] [--root <folder>]
+"""
+import sys
+from argparse import ArgumentParser
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import time
+from datetime import timedelta
+from os import walk, makedirs, sep
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from VideoScripy import VideoScripy, printC
+
+
+FILE_TYPES = ["mp4", "mkv", "png", "txt"]
+
+
+def makeTree(root:Path, nbFiles:int) -> None:
+    """
+    Create 1000 leaf folders and 100 middle folders of nbFiles/1000 empty files.
+
+    Parameters:
+        root (Path):
+            tree root
+
+        nbFiles (int):
+            number of files
+    """
+    perFolder = max(1, nbFiles // 1000)
+    for top in range(10):
+        skipped = root / f'{top}' / "upscale"
+        makedirs(skipped)
+        for index in range(perFolder):
+            (skipped / f'frame_{index:04d}.png').touch()
+
+        for middle in range(10):
+            folder = root / f'{top}' / f'{middle}'
+            makedirs(folder)
+            for index in range(perFolder):
+                (folder / f'file_{index:04d}.{FILE_TYPES[index % 4]}').touch()
+
+            for leaf in range(10):
+                folder = root / f'{top}' / f'{middle}' / f'{leaf}'
+                makedirs(folder)
+                for index in range(perFolder):
+                    (folder / f'file_{index:04d}.{FILE_TYPES[index % 4]}').touch()
+
+
+def walkScan(vs:VideoScripy, folderDepthLimit:int) -> list[dict]:
+    """
+    Former getVideo(), os.walk() the whole tree then filter by depth.
+
+    Parameters:
+        vs (VideoScripy):
+            path, scanType and folderSkip are read
+
+        folderDepthLimit (int):
+            limit the scan depth, -1 for no limit
+    """
+    vList = []
+    for root, _, files in walk(vs.path):
+        # get current root's depth
+        currentDepth = len(root.replace(vs.path,"").split(sep))-1
+
+        # skip too deep folder
+        if currentDepth > folderDepthLimit and folderDepthLimit != -1:
+            continue
+        # skip folder
+        skip = False
+        for folderSkip in vs.folderSkip:
+            if Path(root).name == folderSkip:
+                skip = True
+                break
+        if skip:
+            continue
+
+        # get videos
+        for file in files:
+            # skip not supported type
+            fileFormat = file.split(".")[-1].lower()
+            if fileFormat not in vs.scanType:
+                continue
+            # check &
+            if "&" in root+sep+file:
+                continue
+            vList.append({
+                "type" : fileFormat,
+                "path" : root+sep+file,
+                "name" : (root+sep+file).replace(vs.path+sep,'').replace(sep,'__')
+            })
+
+        # stop scan for perfomance
+        if folderDepthLimit == 0:
+            break
+
+    vList.sort(key= lambda video: video['name'])
+    return vList
+
+
+def main() -> None:
+    parser = ArgumentParser(description="getVideo() folder scan benchmark")
+    parser.add_argument("--files", type=int, default=100_000)
+    parser.add_argument("--workers", default="1,4,16")
+    parser.add_argument("--root", default=None, help="existing folder to create the tree in, e.g. on a NAS")
+    args = parser.parse_args()
+
+    vs = VideoScripy()
+    vs.probeCache = None
+
+    with TemporaryDirectory(dir=args.root) as folder:
+        processTime = time()
+        makeTree(Path(folder), args.files)
+        print(f"Tree took : {str(timedelta(seconds=time() - processTime))[:-3]}")
+        vs.path = folder
+
+        results = []
+        for folderDepthLimit in [-1, 2]:
+            processTime = time()
+            expected = walkScan(vs, folderDepthLimit)
+            results.append(("os.walk", "-", folderDepthLimit, time() - processTime, len(expected)))
+
+            for workers in [int(workers) for workers in args.workers.split(",")]:
+                vs.scanWorkers = workers
+                processTime = time()
+                vs.getVideo(folderDepthLimit)
+                results.append(("scandir", workers, folderDepthLimit, time() - processTime, len(vs.vList)))
+
+                # same files, same order
+                if [video["path"] for video in vs.vList] != [video["path"] for video in expected]:
+                    printC(f'getVideo({folderDepthLimit}) differs from os.walk', "red")
+
+    print()
+    printC(f'{args.files} files', "blue")
+    for walker, workers, folderDepthLimit, processTime, nbFiles in results:
+        print(
+            f'{walker:>7} | workers {workers:>2} | depth {folderDepthLimit:>2} | '
+            f'{str(timedelta(seconds=processTime))[:-3]} | {nbFiles} files'
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import VideoScripy as V
+
+
+@pytest.fixture
+def vs(tmp_path, monkeypatch) -> V.VideoScripy:
+    """
+    VideoScripy on CPU without GPU and tool checks,
+    path and caches in tmp_path
+    """
+    probeCache, frameCache = V.ProbeCache, V.FrameCache
+    monkeypatch.setattr(V.VideoScripy, "checkGPUs", lambda self: None)
+    monkeypatch.setattr(V.VideoScripy, "checkTools", lambda self: None)
+    monkeypatch.setattr(V, "ProbeCache", lambda dbPath: probeCache(str(tmp_path / "probeCache.db")))
+    monkeypatch.setattr(V, "FrameCache", lambda dirPath: frameCache(str(tmp_path / "frameCache")))
+
+    vs = V.VideoScripy()
+    vs.path = str(tmp_path)
+    return vs
@@ -0,0 +1,136 @@
+import json
+import shutil
+import struct
+import subprocess
+
+import pytest
+
+import VideoScripy as V
+
+
+def box(boxType:bytes, *payloads:bytes) -> bytes:
+    payload = b''.join(payloads)
+    return struct.pack('>I4s', 8 + len(payload), boxType) + payload
+
+
+def mp4(movieTimescale:int=1000, mediaTimescale:int=12800, sizeBox:bytes=b'stsz') -> bytes:
+    """
+    Minimal 320x240 25fps h264 mp4 header of 50 frames, no mdat
+    """
+    sampleEntry = struct.pack('>I4s6xH16xHH50x', 86, b'avc1', 1, 320, 240)
+    if sizeBox == b'stsz':
+        sizes = struct.pack('>4xII', 0, 50) + struct.pack('>50I', *[1000]*50)
+    else:
+        # stz2, 16 bits field size
+        sizes = struct.pack('>4x3xBI', 16, 50) + struct.pack('>50H', *[1000]*50)
+    stbl = box(
+        b'stbl',
+        box(b'stsd', struct.pack('>4xI', 1), sampleEntry),
+        box(b'stts', struct.pack('>4xIII', 1, 50, 512)),
+        box(sizeBox, sizes),
+    )
+    mdia = box(
+        b'mdia',
+        box(b'mdhd', struct.pack('>4x8xIIH2x', mediaTimescale, 25600, 0x55C4)),
+        box(b'hdlr', struct.pack('>4x4x4s12x', b'vide'), b'VideoHandler\x00'),
+        box(b'minf', stbl),
+    )
+    moov = box(
+        b'moov',
+        box(b'mvhd', struct.pack('>4x8xII80x', movieTimescale, 2 * movieTimescale)),
+        box(b'trak', mdia),
+    )
+    return box(b'ftyp', b'isom', struct.pack('>I', 512), b'isomavc1') + moov
+
+
+def probe(tmp_path, data:bytes) -> dict:
+    path = tmp_path / "clip.mp4"
+    path.write_bytes(data)
+    return V.ContainerProbe.probe(str(path))
+
+
+def test_mp4(tmp_path):
+    result = probe(tmp_path, mp4())
+    assert result["format"]["duration"] == "2.0"
+    stream, = result["streams"]
+    assert stream["codec_type"] == "video"
+    assert stream["codec_name"] == "h264"
+    assert (stream["width"], stream["height"]) == (320, 240)
+    assert stream["r_frame_rate"] == "12800/512"
+    assert stream["nb_frames"] == "50"
+    assert stream["tags"] == {"language": "und", "handler_name": "VideoHandler"}
+
+
+@pytest.mark.parametrize("data", [
+    mp4(sizeBox=b'stz2'),
+    mp4(movieTimescale=0),
+    mp4(mediaTimescale=0),
+    mp4()[:-20],
+    b'\x1a\x45\xdf\xa3' + bytes(60),
+], ids=["stz2", "movie timescale 0", "media timescale 0", "truncated", "empty mkv"])
+def test_odd_file_falls_back(tmp_path, data):
+    assert probe(tmp_path, data) is None
+
+
+# conformance with ffprobe, on files made by ffmpeg
+SAMPLES = {
+    "h264_aac.mp4": (
+        '-f lavfi -i testsrc=size=320x240:rate=25:duration=2'
+        ' -f lavfi -i sine=duration=2'
+        ' -c:v libx264 -c:a aac'
+        ' -metadata:s:a:0 language=jpn -metadata:s:a:0 handler_name=Japanese'
+    ),
+    "hevc_subtitle.mp4": (
+        '-f lavfi -i testsrc=size=256x144:rate=30000/1001:duration=2'
+        ' -f lavfi -i sine=duration=2 -i {srt}'
+        ' -map 0 -map 1 -map 2 -c:v libx265 -tag:v hvc1 -c:a aac -c:s mov_text'
+        ' -metadata:s:s:0 language=fre'
+    ),
+    "h264_opus_srt.mkv": (
+        '-f lavfi -i testsrc=size=320x180:rate=24:duration=2'
+        ' -f lavfi -i sine=duration=2 -i {srt}'
+        ' -map 0 -map 1 -map 2 -c:v libx264 -c:a libopus -c:s srt'
+        ' -metadata:s:a:0 language=eng -metadata:s:a:0 HANDLER_NAME=Commentary'
+    ),
+    "hevc_aac_ass.mkv": (
+        '-f lavfi -i testsrc=size=320x240:rate=25:duration=2'
+        ' -f lavfi -i sine=duration=2 -f lavfi -i sine=frequency=880:duration=2 -i {srt}'
+        ' -map 0 -map 1 -map 2 -map 3 -c:v libx265 -c:a aac -c:s ass'
+        ' -metadata:s:a:1 language=jpn -metadata:s:s:0 language=chi'
+    ),
+}
+
+
+@pytest.mark.skipif(
+    shutil.which("ffmpeg") is None or shutil.which("ffprobe") is None,
+    reason="ffmpeg and ffprobe not on PATH",
+)
+@pytest.mark.parametrize("name", SAMPLES)
+def test_same_info_as_ffprobe(vs, tmp_path, name):
+    srt = tmp_path / "sub.srt"
+    srt.write_text("1\n00:00:00,000 --> 00:00:01,000\nhello\n")
+    path = tmp_path / name
+    subprocess.run(
+        ["ffmpeg", "-loglevel", "error", *SAMPLES[name].format(srt=srt).split(), "-y", str(path)],
+        check=True,
+    )
+
+    ffprobe = json.loads(subprocess.run(
+        ["ffprobe", "-i", str(path), "-show_entries", vs.PROBE_ENTRIES, "-of", "json=compact=1"],
+        check=True, capture_output=True,
+    ).stdout)
+    native = V.ContainerProbe.probe(str(path))
+    assert native is not None
+
+    videos = []
+    for probed in [ffprobe, native]:
+        video = V.VideoInfo(name=name, path=str(path), type=path.suffix[1:])
+        assert vs._setVideoInfo(video, probed)
+        videos.append(video)
+    expected, actual = videos
+
+    assert [dict(s.items()) for s in actual["streams"]] == [dict(s.items()) for s in expected["streams"]]
+    for key in ["type", "width", "height", "fps", "nbFrames", "fileSize"]:
+        assert actual[key] == expected[key], key
+    assert actual["duration"].total_seconds() == pytest.approx(expected["duration"].total_seconds(), abs=1e-3)
+    assert actual["bitRate"] == pytest.approx(expected["bitRate"], rel=1e-3)
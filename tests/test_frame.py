@@ -0,0 +1,110 @@
+import os
+import shutil
+import sys
+import subprocess
+
+import numpy as np
+import pytest
+
+import VideoScripy as V
+
+
+def gopVideo(tmp_path) -> V.VideoInfo:
+    path = tmp_path / "clip.mp4"
+    path.write_bytes(b'')
+    video = V.VideoInfo(name="clip.mp4", path=str(path), type="mp4")
+    video["frameGop"] = {
+        "pts_time": np.array([600.0, 602.0, 604.0]),
+        "length": np.array([48, 48, 48]),
+        "size": np.array([1, 1, 1]),
+    }
+    return video
+
+
+def test_key_frames(vs, tmp_path):
+    video = gopVideo(tmp_path)
+    assert list(vs.getKeyFrames(video)) == [600.0, 602.0, 604.0]
+
+
+def test_key_frames_sampled(vs, tmp_path):
+    # sampled frame() keyframes are only those of its windows
+    video = gopVideo(tmp_path)
+    video["frameEstimate"] = {}
+    assert vs.getKeyFrames(video) is None
+
+    # whole video result of frameCache instead
+    pts = np.arange(0, 1200, 2.0)
+    vs.frameCache.set(str(video["path"]), *vs._getFileStat(video), {"frameGop.pts_time": pts})
+    assert np.array_equal(vs.getKeyFrames(video), pts)
+
+
+def test_frame_cache_tmp(vs, monkeypatch):
+    cache = vs.frameCache
+    cachePath = cache._cachePath("clip.mp4")
+
+    # failed write leaves no .tmp
+    def fail(file, **arrays):
+        file.write(b'partial')
+        raise OSError("disk full")
+    with monkeypatch.context() as patch, pytest.raises(OSError):
+        patch.setattr(V.np, "savez", fail)
+        cache.set("clip.mp4", 1, 1, {"size": np.arange(4)})
+    assert not any(entry.name.endswith(".tmp") for entry in os.scandir(cache.dirPath))
+
+    # orphan .tmp removed once old, kept while it may be written
+    stale, fresh = f"{cachePath}.1.tmp", f"{cachePath}.2.tmp"
+    for tempPath in [stale, fresh]:
+        with open(tempPath, "wb") as file:
+            file.write(b'partial')
+    os.utime(stale, (0, 0))
+    cache.set("clip.mp4", 1, 1, {"size": np.arange(4)})
+    assert not os.path.isfile(stale)
+    assert os.path.isfile(fresh)
+    assert np.array_equal(cache.get("clip.mp4", 1, 1)["size"], np.arange(4))
+
+
+def test_csv_process_killed_on_error(vs):
+    # endless csv output, stopped by onChunk error
+    command = f'"{sys.executable}" -c "while True: print(\'1,2\')"'
+    procs = []
+
+    def onChunk(fields):
+        procs.extend(vs.procAsync)
+        raise ValueError("bad chunk")
+
+    with pytest.raises(ValueError):
+        vs._runProcCsv(command, 2, onChunk)
+    assert vs.procAsync == []
+    assert procs and all(proc.poll() is not None for proc in procs)
+@pytest.mark.skipif(
+    shutil.which("ffmpeg") is None or shutil.which("ffprobe") is None,
+    reason="ffmpeg and ffprobe not on PATH",
+)
+@pytest.mark.parametrize("name", ["clip.mp4", "clip.mkv"])
+def test_windows_same_as_serial(vs, tmp_path, name):
+    # b-frames are shown before their decode order, window edges not on a second
+    path = tmp_path / name
+    subprocess.run(
+        [
+            "ffmpeg", "-loglevel", "error",
+            "-f", "lavfi", "-i", "testsrc=size=160x90:rate=25:duration=12",
+            "-c:v", "libx264", "-bf", "3", "-g", "30", "-y", str(path),
+        ],
+        check=True,
+    )
+    vs.frameCache = None
+    vs.FRAME_WINDOW_MIN = 1
+    vs.vList = [V.VideoInfo(name=name, path=str(path), type=path.suffix[1:])]
+    vs.getVideoInfo()
+    video = vs.vList[0]
+
+    results = []
+    for windows in [1, 5]:
+        vs.frame(windows=windows)
+        results.append({key: video[key] for key in vs.FRAME_CACHE_KEYS + ["frameStats"]})
+    serial, windowed = results
+
+    for key in vs.FRAME_CACHE_KEYS:
+        for field in serial[key]:
+            assert np.array_equal(windowed[key][field], serial[key][field]), f'{key}.{field}'
+    assert windowed["frameStats"] == serial["frameStats"]
@@ -0,0 +1,77 @@
+from math import ceil
+from os import makedirs
+from os.path import join
+
+import pytest
+
+import VideoScripy as V
+
+
+def writeFrames(outputPath:str, first:int, last:int, size:int=10) -> None:
+    # output folder created as _upscaleFrames() does
+    makedirs(outputPath, exist_ok=True)
+    for index in range(first, last + 1):
+        with open(join(outputPath, f'frame{index:08d}.jpg'), "wb") as file:
+            file.write(bytes(size))
+
+
+def test_manifest(vs, tmp_path, monkeypatch):
+    outputPath = str(tmp_path / "clip_upscale_frames")
+    manifestPath = f'{outputPath}_manifest.jsonl'
+    for first, last in [(1, 100), (101, 200), (201, 300)]:
+        writeFrames(outputPath, first, last)
+        vs._writeManifest(manifestPath, outputPath, first, last)
+    with open(manifestPath, "a") as file:
+        file.write('{"first": 301, "la')
+
+    stats = []
+    stat = V.stat
+    monkeypatch.setattr(V, "stat", lambda path: stats.append(path) or stat(path))
+    assert vs._readManifest(manifestPath, outputPath) == {(1, 100), (101, 200), (201, 300)}
+    # only last range checked
+    assert len(stats) == 100
+
+
+def test_manifest_last_range_changed(vs, tmp_path):
+    outputPath = str(tmp_path / "clip_upscale_frames")
+    manifestPath = f'{outputPath}_manifest.jsonl'
+    for first, last in [(1, 100), (101, 200)]:
+        writeFrames(outputPath, first, last)
+        vs._writeManifest(manifestPath, outputPath, first, last)
+
+    writeFrames(outputPath, 150, 150, size=5)
+    assert vs._readManifest(manifestPath, outputPath) == {(1, 100)}
+
+
+@pytest.mark.parametrize("nbFrames, interpolateFrame", [(43157, 108000), (1439, 3601), (25, 61), (1000, 1000)])
+def test_interpolate_batches(vs, nbFrames, interpolateFrame):
+    batches = vs._interpolateBatches(nbFrames, interpolateFrame)
+    assert len(batches) == ceil(interpolateFrame / max(1, vs.frameBatchSize * interpolateFrame // nbFrames))
+
+    outputs = []
+    for inputFirst, inputLast, outputFirst, outputLast, nbOutput, kept in batches:
+        nbInput = inputLast - inputFirst + 1
+        assert len(kept) == outputLast - outputFirst + 1
+        assert kept == sorted(set(kept)) and kept[-1] < nbOutput
+        # kept run output at most half an output frame from its time in the whole sequence
+        for index, batchIndex in enumerate(kept):
+            wholeTime = (outputFirst - 1 + index) * nbFrames / interpolateFrame
+            batchTime = inputFirst - 1 + batchIndex * nbInput / nbOutput
+            assert abs(wholeTime - batchTime) <= nbFrames / interpolateFrame / 2 + 1e-9
+        outputs += range(outputFirst, outputLast + 1)
+    assert outputs == list(range(1, interpolateFrame + 1))
+
+
+def test_interpolate_single_batch(vs):
+    # one run is the whole sequence, all its outputs kept
+    vs.frameBatchSize = 10**6
+    assert vs._interpolateBatches(1439, 3601) == [(1, 1439, 1, 3601, 3601, list(range(3601)))]
+    assert vs._interpolateBatches(0, 0) == []
+
+
+def test_count_frames(vs, tmp_path):
+    # batch folder of _runFrameBatches() is not a frame
+    outputPath = str(tmp_path / "clip_upscale_frames")
+    writeFrames(outputPath, 1, 3)
+    makedirs(join(outputPath, "batch"))
+    assert vs._countFrames(outputPath) == 3
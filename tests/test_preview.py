@@ -0,0 +1,48 @@
+import shutil
+import subprocess
+
+import numpy as np
+import pytest
+from PIL import Image
+
+import VideoScripy as V
+
+
+def test_write_png_rows(vs, tmp_path):
+    # rows of several lines, compressed as they come
+    pixels = np.random.default_rng(0).integers(0, 256, (90, 160, 3), dtype=np.uint8)
+    path = str(tmp_path / "grid.png")
+    vs._writePngRows(path, 160, 90, (pixels[row:row+30].tobytes() for row in range(0, 90, 30)))
+    with Image.open(path) as image:
+        assert image.mode == "RGB"
+        assert np.array_equal(np.asarray(image), pixels)
+
+
+@pytest.mark.skipif(
+    shutil.which("ffmpeg") is None or shutil.which("ffprobe") is None,
+    reason="ffmpeg and ffprobe not on PATH",
+)
+def test_per_image_same_as_single(vs, tmp_path):
+    path = tmp_path / "clip.mp4"
+    subprocess.run(
+        [
+            "ffmpeg", "-loglevel", "error",
+            "-f", "lavfi", "-i", "testsrc=size=160x90:rate=25:duration=10",
+            "-c:v", "libx264", "-g", "25", "-y", str(path),
+        ],
+        check=True,
+    )
+    vs.vList = [V.VideoInfo(type="mp4", path=str(path), name=path.name)]
+    vs.getVideoInfo()
+    outputPath = f'{vs.path}\\{V.VideoProcess.preview.name}\\clip.png'
+
+    grids = []
+    for limit in [vs.CMD_LENGTH_LIMIT, 0]:
+        vs.CMD_LENGTH_LIMIT = limit
+        vs.preview(3, 2)
+        with Image.open(outputPath) as grid:
+            grids.append(np.asarray(grid.convert("RGB"), dtype=np.int16))
+    single, perImage = grids
+    assert perImage.shape == single.shape == (180, 480, 3)
+    assert np.abs(perImage - single).mean() < 2
+    assert not list(tmp_path.glob("*.png.*")) and not list(tmp_path.glob("*.0.png"))
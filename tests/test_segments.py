@@ -0,0 +1,48 @@
+import shutil
+import subprocess
+from datetime import timedelta
+
+import pytest
+
+import VideoScripy as V
+
+
+@pytest.mark.skipif(
+    shutil.which("ffmpeg") is None or shutil.which("ffprobe") is None,
+    reason="ffmpeg and ffprobe not on PATH",
+)
+def test_segment_frames(vs, tmp_path):
+    # keyframes every 1.2s from a 5s start time, 250 frames
+    path = tmp_path / "clip.mp4"
+    subprocess.run(
+        [
+            "ffmpeg", "-loglevel", "error",
+            "-f", "lavfi", "-i", "testsrc=size=160x90:rate=25:duration=10",
+            "-c:v", "libx264", "-g", "30", "-output_ts_offset", "5", "-y", str(path),
+        ],
+        check=True,
+    )
+    vs.frameCache = None
+    vs.segmentSeconds = 2
+    video = V.VideoInfo(
+        name="clip.mp4", path=str(path), type="mp4",
+        duration=timedelta(seconds=10), fps=25.0, nbFrames=250,
+        compressBitRateParam="",
+    )
+
+    segments = vs._getSegments(video)
+    assert [round(start, 3) for start, _ in segments] == [0.0, 2.4, 4.8, 7.2, 9.6]
+    assert sum(duration for _, duration in segments) == pytest.approx(10)
+
+    # each segment cut gives its frames from its keyframe, none lost or doubled
+    frames = []
+    for index, (start, duration) in enumerate(segments):
+        outputPath = tmp_path / f'frames{index}'
+        outputPath.mkdir()
+        video["getFramesOutputPath"] = str(outputPath)
+        video["segmentStart"] = start
+        video["segmentFrames"] = round((start + duration) * 25) - round(start * 25)
+        command = vs._getCommand(video, V.VideoProcess.upscale.name, substep="segmentFrames")
+        subprocess.run(command, shell=True, check=True, capture_output=True)
+        frames.append(len(list(outputPath.iterdir())))
+    assert frames == [60, 60, 60, 60, 10]
@@ -0,0 +1,141 @@
+import shlex
+import subprocess
+import sys
+from os import listdir
+from threading import Thread
+
+import pytest
+
+import VideoScripy as V
+
+# upscaled batch is larger than a pipe buffer
+WIDTH, HEIGHT, NB_FRAMES = 64, 32, 40
+
+DECODER = f'''
+import sys
+for index in range({NB_FRAMES}):
+    sys.stdout.buffer.write(bytes([index]) * {WIDTH * HEIGHT * 3})
+'''
+
+# upscaler stand-in, realesrgan-ncnn-vulkan -i inFolder -o outFolder
+UPSCALER = '''
+import sys
+from os import listdir
+from PIL import Image
+inFolder, outFolder, returnCode = sys.argv[1], sys.argv[2], int(sys.argv[3])
+if returnCode != 0:
+    sys.exit(returnCode)
+for name in listdir(inFolder):
+    with Image.open(f"{inFolder}/{name}") as frame:
+        frame.resize((frame.width * 2, frame.height * 2)).save(f"{outFolder}/{name}")
+'''
+
+# encoder stand-in, count received bytes
+ENCODER = '''
+import sys
+outPath, returnCode = sys.argv[1], int(sys.argv[2])
+if returnCode != 0:
+    sys.exit(returnCode)
+with open(outPath, "w") as file:
+    file.write(str(len(sys.stdin.buffer.read())))
+'''
+
+
+def script(tmp_path, name:str, source:str, *args) -> str:
+    path = tmp_path / f'{name}.py'
+    path.write_text(source)
+    return " ".join(shlex.quote(str(arg)) for arg in [sys.executable, path, *args])
+
+
+@pytest.fixture
+def stream(vs, tmp_path, monkeypatch):
+    """
+    Run _upscaleStream() with stand-in decoder, upscaler and encoder,
+    return (result, encoded bytes or None)
+    """
+    if sys.platform == "win32":
+        pytest.skip("stand-in commands are quoted for a POSIX shell")
+
+    outPath = tmp_path / "encoded.txt"
+    video = V.VideoInfo(
+        name="clip.mp4", path=str(tmp_path / "clip.mp4"), type="mp4",
+        width=WIDTH, height=HEIGHT, nbFrames=NB_FRAMES,
+    )
+    vs.upscaleBatchSize = 8
+
+    def run(upscalerCode:int=0, encoderCode:int=0):
+        def getCommand(video, process, substep=''):
+            if substep == "pipeIn":
+                return script(tmp_path, "decoder", DECODER)
+            if substep == "batch":
+                return script(
+                    tmp_path, "upscaler", UPSCALER,
+                    video["getFramesOutputPath"], video["upscaleOutputPath"], upscalerCode,
+                )
+            if substep == "pipeOut":
+                return script(tmp_path, "encoder", ENCODER, outPath, encoderCode)
+        monkeypatch.setattr(vs, "_getCommand", getCommand)
+
+        results = []
+        # daemon, a hanging stream does not hold pytest
+        thread = Thread(target=lambda: results.append(vs._upscaleStream(video)), daemon=True)
+        thread.start()
+        thread.join(timeout=30)
+        assert not thread.is_alive(), "streaming upscale hangs"
+        encoded = int(outPath.read_text()) if outPath.exists() else None
+        return results[0], encoded
+
+    return run
+
+
+def test_upscale_stream(vs, stream, tmp_path):
+    result, encoded = stream()
+    assert result
+    assert encoded == NB_FRAMES * WIDTH * 2 * HEIGHT * 2 * 3
+    # batch folders removed
+    assert [name for name in listdir(tmp_path) if "batches" in name] == []
+    assert vs.procAsync == []
+
+
+def test_upscale_stream_encoder_error(vs, stream):
+    result, encoded = stream(encoderCode=1)
+    assert not result
+    assert encoded is None
+    assert not vs.killed
+    assert vs.procAsync == []
+
+
+def test_upscale_stream_upscaler_error(vs, stream):
+    result, _ = stream(upscalerCode=1)
+    assert not result
+    assert not vs.killed
+    assert vs.procAsync == []
+
+
+def test_upscale_stream_upscaler_error_staged(vs, stream):
+    # process of another staged video
+    other = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+    vs.procAsync.append(other)
+    vs.staging = True
+    try:
+        result, _ = stream(upscalerCode=1)
+        assert not result
+        assert not vs.killed
+        assert other.poll() is None
+        assert vs.procAsync == [other]
+    finally:
+        vs.staging = False
+        other.kill()
+        other.wait()
+
+
+@pytest.mark.parametrize("streaming, segmentSeconds", [(True, None), (False, 60)])
+def test_upscale_staged_serial(vs, monkeypatch, streaming, segmentSeconds):
+    # whole job in first stage, upscaled serially instead
+    calls = []
+    monkeypatch.setattr(vs, "upscale", lambda *args: calls.append(args))
+    monkeypatch.setattr(vs, "_runStages", lambda *args: calls.append("staged"))
+    vs.upscaleStreaming = streaming
+    vs.segmentSeconds = segmentSeconds
+    vs.upscaleStaged(2, 3)
+    assert calls == [(2, 3)]